@@ -1,7 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
 
+    def ready(self):
+        # Recargar el conjunto de usuarios habilitados cuando cambia un usuario
+        from .autenticacion import usuarios_habilitados
+        from .models import Usuario
+        post_save.connect(usuarios_habilitados.invalidar, sender=Usuario,
+                          dispatch_uid='usuarios_habilitados_save', weak=False)
+        post_delete.connect(usuarios_habilitados.invalidar, sender=Usuario,
+                            dispatch_uid='usuarios_habilitados_delete', weak=False)
+
+        # Invalidación de la caché de roles/permisos
+        from .permisos import conectar_senales
+        conectar_senales()
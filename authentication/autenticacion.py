@@ -0,0 +1,92 @@
+"""
+Autenticación JWT sin consulta a la base de datos por request
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import UsuarioToken
+
+
+class UsuariosHabilitados:
+    """
+    Conjunto en memoria (por proceso) de los ids de usuarios habilitados
+
+    Se recarga con una sola consulta cada JWT_USUARIOS_REFRESCO_SEGUNDOS y de
+    inmediato en este proceso cuando se guarda o elimina un usuario. Un id que
+    no está en el conjunto (usuario nuevo o revocado desde otro proceso) se
+    verifica contra la base de datos, así que un usuario desactivado o
+    eliminado deja de autenticarse a más tardar en el siguiente refresco.
+    """
+
+    def __init__(self):
+        self._ids = frozenset()
+        self._cargado_en = None
+        self._lock = threading.Lock()
+
+    @property
+    def refresco(self):
+        return getattr(settings, 'JWT_USUARIOS_REFRESCO_SEGUNDOS', 60)
+
+    @staticmethod
+    def _filtro_habilitados():
+        return Q(is_active=True, activo=True)
+
+    def _recargar(self):
+        with self._lock:
+            if self._cargado_en is not None and time.monotonic() - self._cargado_en < self.refresco:
+                return
+            User = get_user_model()
+            self._ids = frozenset(
+                User.objects.filter(self._filtro_habilitados()).values_list('pk', flat=True)
+            )
+            self._cargado_en = time.monotonic()
+
+    def contiene(self, user_id):
+        if self._cargado_en is None or time.monotonic() - self._cargado_en >= self.refresco:
+            self._recargar()
+        if user_id in self._ids:
+            return True
+
+        User = get_user_model()
+        if User.objects.filter(self._filtro_habilitados(), pk=user_id).exists():
+            with self._lock:
+                self._ids = self._ids | {user_id}
+            return True
+        return False
+
+    def invalidar(self, **kwargs):
+        self._cargado_en = None
+
+
+usuarios_habilitados = UsuariosHabilitados()
+
+
+class JWTSinConsultaAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticación JWT que construye el usuario desde los claims del token
+    (user_id, username, rol, activo) en lugar de hacer SELECT en usuarios
+
+    La revocación se verifica contra usuarios_habilitados (en memoria). Los
+    tokens emitidos antes de incluir los claims se validan como antes,
+    cargando el usuario desde la base de datos.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('El token no contiene la identificación del usuario')
+
+        if 'rol' not in validated_token:
+            return JWTAuthentication.get_user(self, validated_token)
+
+        if not validated_token.get('activo', True) or \
+                not usuarios_habilitados.contiene(validated_token[api_settings.USER_ID_CLAIM]):
+            raise AuthenticationFailed('Usuario inactivo o inexistente', code='user_inactive')
+
+        return UsuarioToken(validated_token)
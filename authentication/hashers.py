@@ -0,0 +1,48 @@
+"""
+Hashers de contraseñas con costo configurable desde settings
+
+Conservan el mismo 'algorithm' que los hashers de Django, por lo que los
+hashes existentes siguen siendo válidos. Cuando cambian los parámetros (o el
+hasher preferido en PASSWORD_HASHERS), must_update() devuelve True y Django
+vuelve a hashear la contraseña en el siguiente login exitoso.
+
+Settings:
+- PASSWORD_ARGON2_TIME_COST, PASSWORD_ARGON2_MEMORY_COST (KiB), PASSWORD_ARGON2_PARALLELISM
+- PASSWORD_BCRYPT_ROUNDS
+- PASSWORD_PBKDF2_ITERACIONES
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+)
+
+
+class Argon2ConfigurablePasswordHasher(Argon2PasswordHasher):
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
+
+
+class BCryptSHA256ConfigurablePasswordHasher(BCryptSHA256PasswordHasher):
+
+    @property
+    def rounds(self):
+        return getattr(settings, 'PASSWORD_BCRYPT_ROUNDS', BCryptSHA256PasswordHasher.rounds)
+
+
+class PBKDF2ConfigurablePasswordHasher(PBKDF2PasswordHasher):
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERACIONES', PBKDF2PasswordHasher.iterations)
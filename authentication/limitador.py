@@ -0,0 +1,67 @@
+"""
+Limitador de intentos de login (token bucket) respaldado por la caché
+
+Cada clave (IP o username) tiene una cubeta con 'capacidad' fichas que se
+recargan a razón de 'por_minuto' fichas por minuto; cada intento consume una.
+Se verifica antes de autenticar, así una ráfaga de intentos se rechaza sin
+ejecutar el hash de la contraseña.
+
+Nota: la lectura y escritura en caché no son atómicas; con varios workers
+concurrentes el límite es aproximado, lo cual es suficiente para frenar floods.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def consumir(clave, capacidad, por_minuto):
+    """
+    Consume una ficha de la cubeta
+
+    Returns:
+        (permitido, segundos hasta la siguiente ficha)
+    """
+    por_segundo = por_minuto / 60
+    ahora = time.time()
+    fichas, ultimo = cache.get(clave) or (capacidad, ahora)
+    fichas = min(capacidad, fichas + (ahora - ultimo) * por_segundo)
+
+    if fichas < 1:
+        return False, math.ceil((1 - fichas) / por_segundo)
+
+    # La entrada expira cuando la cubeta ya estaría llena de nuevo
+    cache.set(clave, (fichas - 1, ahora), math.ceil(capacidad / por_segundo) + 1)
+    return True, 0
+
+
+def obtener_ip(request):
+    if getattr(settings, 'LOGIN_CONFIAR_X_FORWARDED_FOR', False):
+        reenviada = request.META.get('HTTP_X_FORWARDED_FOR')
+        if reenviada:
+            return reenviada.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def verificar_login(request, username):
+    """
+    Aplica los límites por IP y por username configurados en LOGIN_LIMITE_IP
+    y LOGIN_LIMITE_USUARIO (tuplas (capacidad, fichas por minuto))
+
+    Returns:
+        segundos que debe esperar el cliente, o 0 si el intento está permitido
+    """
+    capacidad, por_minuto = getattr(settings, 'LOGIN_LIMITE_IP', (100, 30))
+    permitido, espera = consumir(f'login:ip:{obtener_ip(request)}', capacidad, por_minuto)
+    if not permitido:
+        return espera
+
+    if username:
+        usuario = hashlib.md5(str(username).strip().lower().encode()).hexdigest()
+        capacidad, por_minuto = getattr(settings, 'LOGIN_LIMITE_USUARIO', (5, 5))
+        permitido, espera = consumir(f'login:usuario:{usuario}', capacidad, por_minuto)
+        if not permitido:
+            return espera
+    return 0
@@ -0,0 +1,62 @@
+"""
+Comando de Django para eliminar los refresh tokens expirados
+Uso: python manage.py compactar_tokens [--lote 5000] [--pausa 0.1]
+
+Pensado para ejecutarse periódicamente (cron). Borra los tokens emitidos y
+en lista negra cuyo expires_at ya pasó, por lotes pequeños (cada uno en su
+propia transacción) para no mantener bloqueos largos sobre las tablas.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = 'Elimina por lotes los refresh tokens expirados (emitidos y en lista negra)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Cantidad de tokens por lote (por defecto 5000)',
+        )
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0.1,
+            help='Segundos de espera entre lotes (por defecto 0.1)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo contar los tokens expirados',
+        )
+
+    def handle(self, *args, **options):
+        ahora = timezone.now()
+        expirados = OutstandingToken.objects.filter(expires_at__lt=ahora)
+
+        if options['dry_run']:
+            self.stdout.write(f'{expirados.count()} tokens expirados para eliminar')
+            return
+
+        eliminados = 0
+        while True:
+            # Usa el índice sobre expires_at (migración authentication 0004)
+            ids = list(expirados.order_by('expires_at').values_list('id', flat=True)[:options['lote']])
+            if not ids:
+                break
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                OutstandingToken.objects.filter(id__in=ids).delete()
+            eliminados += len(ids)
+            self.stdout.write(f'  {eliminados} tokens eliminados...')
+            if len(ids) < options['lote']:
+                break
+            time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {eliminados} tokens expirados eliminados'))
@@ -1,14 +1,58 @@
 """
 Comando de Django para migrar usuarios existentes desde PostgreSQL a Django
-Uso: python manage.py migrate_users
+Uso: python manage.py migrate_users [--dry-run] [--checkpoint archivo] [--lote 1000]
+
+La tabla de origen se lee por bloques ordenados por id (keyset), la
+existencia de cada bloque se verifica con una sola consulta y los usuarios
+nuevos se insertan con bulk_create. Los hashes bcrypt existentes se
+conservan con el formato 'bcrypt$<hash>' de BCryptPasswordHasher, de modo
+que los usuarios pueden entrar con su contraseña actual (Django la
+re-hashea con el algoritmo preferido en el primer login).
 """
-from django.core.management.base import BaseCommand
-from django.db import connection
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
 from django.contrib.auth import get_user_model
-import bcrypt
+from django.contrib.auth.hashers import identify_hasher, make_password
 
 User = get_user_model()
 
+ROLES_VALIDOS = {rol for rol, _ in User.ROL_CHOICES}
+PREFIJOS_BCRYPT = ('$2a$', '$2b$', '$2y$')
+
+
+def convertir_hash(password_hash):
+    """
+    Convierte el hash heredado a un formato que Django pueda verificar
+
+    - bcrypt ($2a$/$2b$/$2y$): se envuelve como 'bcrypt$<hash>' sin re-hashear
+    - hashes que Django ya reconoce: se conservan
+    - otros: None (el usuario queda sin contraseña utilizable)
+    """
+    if not password_hash:
+        return None
+    if password_hash.startswith(PREFIJOS_BCRYPT):
+        return f'bcrypt${password_hash}'
+    try:
+        identify_hasher(password_hash)
+    except ValueError:
+        return None
+    return password_hash
+
+
+def _inicializar_proceso():
+    # Con el método 'spawn' el proceso hijo no hereda la configuración de Django
+    import django
+    django.setup()
+
+
+def _hashear(password):
+    return make_password(password)
+
 
 class Command(BaseCommand):
     help = 'Migra usuarios existentes desde la tabla usuarios de PostgreSQL a Django'
@@ -19,116 +63,178 @@ class Command(BaseCommand):
             action='store_true',
             help='Resetear contraseñas de usuarios migrados (requerirá cambio en primer login)',
         )
+        parser.add_argument(
+            '--password-temporal',
+            default='Cambiar123!',
+            help='Contraseña temporal usada con --reset-passwords (por defecto Cambiar123!)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar lo que se migraría sin escribir en la base de datos',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Archivo donde se guarda el último id migrado para poder reanudar',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Cantidad de usuarios por lote (por defecto 1000)',
+        )
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos para hashear contraseñas temporales (por defecto, núcleos disponibles)',
+        )
+        parser.add_argument(
+            '--tabla-origen',
+            default='usuarios',
+            help='Tabla heredada de la que se leen los usuarios (por defecto usuarios)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Iniciando migración de usuarios...'))
-        
-        reset_passwords = options['reset_passwords']
-        
-        with connection.cursor() as cursor:
-            # Verificar si la tabla existe
-            cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'usuarios'
-                );
-            """)
-            
-            table_exists = cursor.fetchone()[0]
-            
-            if not table_exists:
-                self.stdout.write(
-                    self.style.WARNING('La tabla "usuarios" no existe. Saltando migración.')
-                )
-                return
-            
-            # Obtener todos los usuarios
-            cursor.execute("""
-                SELECT id, username, email, password_hash, rol, activo 
-                FROM usuarios
-            """)
-            
-            users = cursor.fetchall()
-            self.stdout.write(f'Encontrados {len(users)} usuarios para migrar.')
-            
-            migrated = 0
-            skipped = 0
-            errors = 0
-            
-            for user_data in users:
-                user_id, username, email, password_hash, rol, activo = user_data
-                
-                try:
-                    # Verificar si el usuario ya existe
-                    if User.objects.filter(username=username).exists():
-                        self.stdout.write(
-                            self.style.WARNING(f'Usuario {username} ya existe. Saltando...')
-                        )
-                        skipped += 1
-                        continue
-                    
-                    # Crear el usuario
-                    user = User(
-                        username=username,
-                        email=email or f'{username}@framasa.com',
-                        rol=rol or 'vendedor',
-                        activo=activo if activo is not None else True,
-                        is_active=activo if activo is not None else True,
-                    )
-                    
-                    # Manejar la contraseña
-                    if reset_passwords:
-                        # Establecer una contraseña temporal que el usuario debe cambiar
-                        user.set_password('Cambiar123!')
-                        user.save()
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'Usuario {username} creado con contraseña temporal: Cambiar123!'
-                            )
-                        )
-                    else:
-                        # Intentar usar el hash existente
-                        # Nota: Django usa PBKDF2, pero si las contraseñas fueron creadas con bcrypt,
-                        # necesitarás resetearlas o usar un método de autenticación personalizado
-                        user.set_password('temp_password_needs_reset')
-                        user.save()
-                        # Actualizar directamente el password_hash en la base de datos
-                        # Esto es un workaround - idealmente deberías resetear las contraseñas
-                        cursor.execute("""
-                            UPDATE auth_user 
-                            SET password = %s 
-                            WHERE id = %s
-                        """, [password_hash, user.id])
-                        
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'Usuario {username} migrado. NOTA: Puede necesitar resetear contraseña.'
-                            )
-                        )
-                    
-                    migrated += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(f'✓ Usuario {username} migrado exitosamente')
-                    )
-                    
-                except Exception as e:
-                    errors += 1
-                    self.stdout.write(
-                        self.style.ERROR(f'✗ Error al migrar usuario {username}: {str(e)}')
-                    )
-            
-            self.stdout.write(self.style.SUCCESS('\n' + '='*50))
-            self.stdout.write(self.style.SUCCESS(f'Migración completada:'))
-            self.stdout.write(self.style.SUCCESS(f'  - Migrados: {migrated}'))
-            self.stdout.write(self.style.SUCCESS(f'  - Omitidos: {skipped}'))
-            self.stdout.write(self.style.SUCCESS(f'  - Errores: {errors}'))
-            
-            if not reset_passwords:
-                self.stdout.write(
-                    self.style.WARNING(
-                        '\nNOTA: Las contraseñas pueden no funcionar correctamente porque '
-                        'Django usa PBKDF2 y las contraseñas originales pueden usar bcrypt. '
-                        'Considera usar --reset-passwords para establecer contraseñas temporales.'
-                    )
+
+        tabla = options['tabla_origen']
+        if not tabla.replace('_', '').isalnum():
+            raise CommandError(f'Nombre de tabla inválido: {tabla}')
+        if tabla not in connection.introspection.table_names():
+            self.stdout.write(
+                self.style.WARNING(f'La tabla "{tabla}" no existe. Saltando migración.')
+            )
+            return
+
+        reset_passwords = self.reset_passwords = options['reset_passwords']
+        dry_run = options['dry_run']
+        checkpoint = Path(options['checkpoint']) if options['checkpoint'] else None
+        ultimo_id = int(checkpoint.read_text().strip() or 0) if checkpoint and checkpoint.exists() else 0
+        if ultimo_id:
+            self.stdout.write(f'Reanudando desde el id {ultimo_id} ({checkpoint})')
+
+        self.migrados = self.omitidos = self.sin_password = 0
+        # Usernames/emails ya vistos en esta ejecución (duplicados en la tabla de origen)
+        self.vistos = set()
+
+        executor = None
+        if reset_passwords and not dry_run and options['procesos'] > 1:
+            executor = ProcessPoolExecutor(max_workers=options['procesos'], initializer=_inicializar_proceso)
+
+        try:
+            while True:
+                filas = self.leer_lote(tabla, ultimo_id, options['lote'])
+                if not filas:
+                    break
+                nuevos = self.preparar_lote(filas)
+                if reset_passwords:
+                    self.asignar_password_temporal(nuevos, options['password_temporal'], executor, dry_run)
+
+                ultimo_id = filas[-1][0]
+                insertados = len(nuevos)
+                if not dry_run:
+                    insertados = self.insertar(nuevos)
+                    # El checkpoint se guarda solo después de confirmar el lote
+                    if checkpoint:
+                        checkpoint.write_text(str(ultimo_id))
+
+                self.migrados += insertados
+                self.stdout.write(f'  Lote hasta id {ultimo_id}: {insertados} nuevos')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS('\n' + '='*50))
+        self.stdout.write(self.style.SUCCESS(
+            'Simulación completada (no se escribió nada):' if dry_run else 'Migración completada:'
+        ))
+        self.stdout.write(self.style.SUCCESS(f'  - Migrados: {self.migrados}'))
+        self.stdout.write(self.style.SUCCESS(f'  - Omitidos (ya existían): {self.omitidos}'))
+        if self.sin_password:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'  - Sin contraseña utilizable (hash no reconocido): {self.sin_password}. '
+                    'Usa --reset-passwords o create_user para asignarles una.'
                 )
+            )
+        if reset_passwords:
+            self.stdout.write(
+                self.style.WARNING(f'\nContraseña temporal asignada: {options["password_temporal"]}')
+            )
+
+    def leer_lote(self, tabla, ultimo_id, tamano):
+        """Siguiente bloque de la tabla de origen (paginación por id, sin OFFSET)"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT id, username, email, password_hash, rol, activo FROM {tabla} '
+                'WHERE id > %s ORDER BY id LIMIT %s',
+                [ultimo_id, tamano]
+            )
+            return cursor.fetchall()
+
+    def preparar_lote(self, filas):
+        """Construye los usuarios que no existen (una consulta para todo el lote)"""
+        usernames = {fila[1] for fila in filas}
+        emails = {fila[2] or f'{fila[1]}@framasa.com' for fila in filas}
+        existentes = set()
+        for username, email in User.objects.filter(
+            Q(username__in=usernames) | Q(email__in=emails)
+        ).values_list('username', 'email'):
+            existentes.add(username)
+            existentes.add(email)
+
+        nuevos = []
+        for _, username, email, password_hash, rol, activo in filas:
+            email = email or f'{username}@framasa.com'
+            if username in existentes or email in existentes or username in self.vistos or email in self.vistos:
+                self.omitidos += 1
+                continue
+            self.vistos.update((username, email))
+
+            activo = activo if activo is not None else True
+            user = User(
+                username=username,
+                email=email,
+                rol=rol if rol in ROLES_VALIDOS else 'vendedor',
+                activo=activo,
+                is_active=activo,
+            )
+            password = convertir_hash(password_hash)
+            if password:
+                user.password = password
+            else:
+                user.set_unusable_password()
+                if not self.reset_passwords:
+                    self.sin_password += 1
+            nuevos.append(user)
+        return nuevos
+
+    def insertar(self, usuarios):
+        """
+        Inserta el lote y devuelve cuántas filas se crearon realmente
+
+        Con ignore_conflicts, bulk_create devuelve todos los objetos aunque se
+        omitan los que chocan con un usuario creado después de preparar_lote;
+        por eso se cuentan los usernames del lote antes y después.
+        """
+        if not usuarios:
+            return 0
+        del_lote = User.objects.filter(username__in=[user.username for user in usuarios])
+        with transaction.atomic():
+            antes = del_lote.count()
+            User.objects.bulk_create(usuarios, ignore_conflicts=True)
+            insertados = del_lote.count() - antes
+        self.omitidos += len(usuarios) - insertados
+        return insertados
 
+    def asignar_password_temporal(self, usuarios, password, executor, dry_run):
+        """Hashea la contraseña temporal (PBKDF2, costoso en CPU) en paralelo"""
+        if dry_run or not usuarios:
+            return
+        if executor is None:
+            hashes = [make_password(password) for _ in usuarios]
+        else:
+            hashes = executor.map(_hashear, [password] * len(usuarios), chunksize=32)
+        for user, encoded in zip(usuarios, hashes):
+            user.password = encoded
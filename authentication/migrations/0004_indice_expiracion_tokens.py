@@ -0,0 +1,21 @@
+"""
+Índice sobre expires_at de los refresh tokens emitidos (token_blacklist)
+para que compactar_tokens y la carga de la lista negra no recorran la tabla
+"""
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_alter_usuario_managers_alter_usuario_date_joined_and_more'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS idx_outstandingtoken_expires_at '
+            'ON token_blacklist_outstandingtoken (expires_at)',
+            reverse_sql='DROP INDEX IF EXISTS idx_outstandingtoken_expires_at',
+        ),
+    ]
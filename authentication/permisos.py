@@ -0,0 +1,175 @@
+"""
+Resolución cacheada de rol, grupos y permisos por usuario
+
+Los datos de cada usuario se cargan una vez (rol, activo, grupos y permisos
+efectivos) y se guardan en caché. La invalidación es versionada:
+
+- Cambios en un Usuario (o en sus grupos/permisos) eliminan solo su entrada.
+- Cambios en Group o en los permisos de un grupo incrementan una versión
+  global; las entradas con otra versión se descartan al leerlas.
+
+Leer los permisos de un usuario cuesta una sola lectura de caché
+(get_many de la versión y la entrada) y ninguna consulta a la base de datos.
+
+La invalidación llega a todos los workers solo con una caché compartida
+(REDIS_URL). Con la LocMemCache por defecto cada proceso tiene su propia
+copia: un cambio de rol o un permiso revocado se aplica de inmediato en el
+proceso que hizo el cambio y en los demás cuando su entrada expira, a más
+tardar PERMISOS_CACHE_TIMEOUT segundos después. Con varios workers configure
+REDIS_URL o baje PERMISOS_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework.permissions import BasePermission, SAFE_METHODS
+
+CLAVE_VERSION = 'permisos:version'
+ROLES_ADMINISTRADOR = ('admin',)
+
+
+def _clave_usuario(user_id):
+    return f'permisos:usuario:{user_id}'
+
+
+def _timeout():
+    return getattr(settings, 'PERMISOS_CACHE_TIMEOUT', 300)
+
+
+def cargar_permisos(user_id):
+    """Consulta rol, grupos y permisos del usuario (sin caché)"""
+    User = get_user_model()
+    usuario = User.objects.filter(pk=user_id).values('rol', 'activo', 'is_active', 'is_superuser').first()
+    if usuario is None:
+        return None
+
+    grupos = list(Group.objects.filter(user__id=user_id).values_list('name', flat=True))
+    permisos = Permission.objects.filter(user__id=user_id) | Permission.objects.filter(group__user__id=user_id)
+    permisos = {
+        f'{app_label}.{codename}'
+        for app_label, codename in permisos.values_list('content_type__app_label', 'codename').distinct()
+    }
+    return {
+        'rol': usuario['rol'] or 'vendedor',
+        'activo': usuario['activo'] and usuario['is_active'],
+        'is_superuser': usuario['is_superuser'],
+        'grupos': grupos,
+        'permisos': permisos,
+    }
+
+
+def obtener_permisos(user_id):
+    """
+    Devuelve {'rol', 'activo', 'is_superuser', 'grupos', 'permisos'} del
+    usuario desde caché, o None si el usuario no existe
+    """
+    clave = _clave_usuario(user_id)
+    valores = cache.get_many([CLAVE_VERSION, clave])
+    version = valores.get(CLAVE_VERSION)
+    if version is None:
+        version = 1
+        cache.add(CLAVE_VERSION, version, None)
+
+    entrada = valores.get(clave)
+    if entrada is not None and entrada['version'] == version:
+        return entrada['datos']
+
+    datos = cargar_permisos(user_id)
+    cache.set(clave, {'version': version, 'datos': datos}, _timeout())
+    return datos
+
+
+def tiene_permiso(user_id, *permisos):
+    """True si el usuario tiene todos los permisos ('app_label.codename')"""
+    datos = obtener_permisos(user_id)
+    if not datos or not datos['activo']:
+        return False
+    if datos['is_superuser']:
+        return True
+    return all(permiso in datos['permisos'] for permiso in permisos)
+
+
+def invalidar_usuario(user_id):
+    cache.delete(_clave_usuario(user_id))
+
+
+def invalidar_todos():
+    """Incrementa la versión global; las entradas existentes quedan obsoletas"""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, 2, None)
+
+
+def _usuario_modificado(sender, instance, **kwargs):
+    invalidar_usuario(instance.pk)
+
+
+def _relacion_usuario_modificada(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, get_user_model()):
+        invalidar_usuario(instance.pk)
+    else:
+        # Cambio hecho desde el grupo/permiso (group.user_set.add(...))
+        invalidar_todos()
+
+
+def _grupo_modificado(sender, **kwargs):
+    action = kwargs.get('action')
+    if action is None or action.startswith('post_'):
+        invalidar_todos()
+
+
+def conectar_senales():
+    User = get_user_model()
+    post_save.connect(_usuario_modificado, sender=User, dispatch_uid='permisos_usuario_save')
+    post_delete.connect(_usuario_modificado, sender=User, dispatch_uid='permisos_usuario_delete')
+    m2m_changed.connect(_relacion_usuario_modificada, sender=User.groups.through,
+                        dispatch_uid='permisos_usuario_grupos')
+    m2m_changed.connect(_relacion_usuario_modificada, sender=User.user_permissions.through,
+                        dispatch_uid='permisos_usuario_permisos')
+    post_save.connect(_grupo_modificado, sender=Group, dispatch_uid='permisos_grupo_save')
+    post_delete.connect(_grupo_modificado, sender=Group, dispatch_uid='permisos_grupo_delete')
+    m2m_changed.connect(_grupo_modificado, sender=Group.permissions.through,
+                        dispatch_uid='permisos_grupo_permisos')
+    post_delete.connect(_grupo_modificado, sender=Permission, dispatch_uid='permisos_permiso_delete')
+
+
+class PermisoPorRol(BasePermission):
+    """
+    Permiso de DRF basado en el rol y los permisos cacheados del usuario
+
+    Atributos opcionales del ViewSet:
+    - roles_permitidos: roles que pueden usar el ViewSet (por defecto todos)
+    - roles_escritura: roles que pueden usar métodos no seguros (POST, PUT,
+      PATCH, DELETE); por defecto los mismos de roles_permitidos
+    - permisos_requeridos: permisos 'app_label.codename' exigidos, como
+      tupla o como dict {accion: tupla}
+
+    Los superusuarios y el rol 'admin' tienen acceso completo.
+    """
+    message = 'No tiene permisos para realizar esta acción.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+
+        datos = obtener_permisos(user.pk)
+        if not datos or not datos['activo']:
+            return False
+        if datos['is_superuser'] or datos['rol'] in ROLES_ADMINISTRADOR:
+            return True
+
+        roles = getattr(view, 'roles_permitidos', None)
+        if request.method not in SAFE_METHODS:
+            roles = getattr(view, 'roles_escritura', roles)
+        if roles is not None and datos['rol'] not in roles:
+            return False
+
+        requeridos = getattr(view, 'permisos_requeridos', ())
+        if isinstance(requeridos, dict):
+            requeridos = requeridos.get(getattr(view, 'action', None), ())
+        return all(permiso in datos['permisos'] for permiso in requeridos)
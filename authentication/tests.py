@@ -0,0 +1,444 @@
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import bcrypt
+from django.contrib.auth.models import Group, Permission
+from django.contrib.auth.hashers import identify_hasher
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .management.commands.migrate_users import Command as MigrateUsers
+from .autenticacion import JWTSinConsultaAuthentication, UsuariosHabilitados
+from .models import Usuario
+from .permisos import PermisoPorRol, obtener_permisos
+from .tokens import JTIsRevocados, UsuarioRefreshToken
+
+
+class RefreshTokenTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Usuario.objects.create_user('vendedor', password='clave-segura-1', rol='vendedor')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        response = self.client.post('/api/auth/login/', {'username': 'vendedor', 'password': 'clave-segura-1'})
+        self.assertEqual(response.status_code, 200)
+        self.token = response.data['token']
+        self.refresh_token = response.data['refresh_token']
+
+    def refrescar(self, refresh_token=None):
+        return APIClient().post('/api/auth/refresh/', {'refresh_token': refresh_token or self.refresh_token})
+
+    def logout(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        response = self.client.post('/api/auth/logout/', {'refresh_token': self.refresh_token})
+        self.assertEqual(response.status_code, 200)
+
+    def otro_proceso(self):
+        """Conjunto de otro worker: se cargó antes de la revocación y aún no se recarga"""
+        conjunto = JTIsRevocados()
+        conjunto._cargado_en = time.monotonic()
+        return conjunto
+
+    def test_refresh_valido_antes_del_logout(self):
+        response = self.refrescar()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['token'])
+
+    def test_rotacion_devuelve_un_refresh_nuevo_valido(self):
+        response = self.refrescar()
+
+        self.assertEqual(response.status_code, 200)
+        nuevo = response.data['refresh_token']
+        self.assertNotEqual(nuevo, self.refresh_token)
+        self.assertEqual(self.refrescar(nuevo).status_code, 200)
+
+    def test_refresh_rotado_no_se_puede_reutilizar(self):
+        self.assertEqual(self.refrescar().status_code, 200)
+
+        response = self.refrescar()
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.data['success'])
+
+    def test_refresh_rechazado_despues_del_logout(self):
+        self.logout()
+
+        response = self.refrescar()
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.data['success'])
+
+    def test_refresh_rotado_rechazado_en_otro_proceso_sin_cache_compartida(self):
+        # Con LocMemCache la marca en caché no llega a otros workers: se consulta la base de datos
+        otro_proceso = self.otro_proceso()
+        self.assertEqual(self.refrescar().status_code, 200)
+        # La LocMemCache del otro worker no tiene la marca de este
+        cache.clear()
+
+        with mock.patch('authentication.tokens.jtis_revocados', otro_proceso):
+            response = self.refrescar()
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_rechazado_en_otro_proceso_con_cache_compartida(self):
+        otro_proceso = self.otro_proceso()
+        jti = UsuarioRefreshToken(self.refresh_token, verify=False)['jti']
+
+        with mock.patch('authentication.tokens.cache_compartida', return_value=True):
+            self.logout()
+            # La marca en la caché compartida basta, sin consultar la lista negra
+            with self.assertNumQueries(0):
+                self.assertTrue(otro_proceso.contiene(jti))
+            with mock.patch('authentication.tokens.jtis_revocados', otro_proceso):
+                response = self.refrescar()
+
+        self.assertEqual(response.status_code, 401)
+
+
+class LoginTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Usuario.objects.create_user('vendedor', password='clave-segura-1', rol='vendedor')
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, username='vendedor', password='clave-segura-1', ip='10.0.0.1', **kwargs):
+        return APIClient().post(
+            '/api/auth/login/', {'username': username, 'password': password}, REMOTE_ADDR=ip, **kwargs
+        )
+
+    def test_cuerpo_que_no_es_objeto_devuelve_400(self):
+        for cuerpo in (['vendedor', 'clave-segura-1'], 'vendedor'):
+            with self.subTest(cuerpo=cuerpo):
+                response = APIClient().post('/api/auth/login/', cuerpo, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.data['success'])
+
+    @override_settings(LOGIN_LIMITE_IP=(3, 1))
+    def test_limite_por_ip_responde_429_con_retry_after(self):
+        for i in range(3):
+            self.assertEqual(self.login(username=f'usuario{i}', password='x').status_code, 400)
+
+        response = self.login()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        # Otra IP no comparte la cubeta
+        self.assertEqual(self.login(ip='10.0.0.2').status_code, 200)
+
+    @override_settings(LOGIN_LIMITE_USUARIO=(2, 1))
+    def test_limite_por_usuario_aplica_desde_cualquier_ip(self):
+        self.login(password='x', ip='10.0.0.1')
+        self.login(password='x', ip='10.0.0.2')
+
+        response = self.login(ip='10.0.0.3')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_limite_por_ip_por_defecto_admite_un_turno_detras_de_nat(self):
+        for i in range(50):
+            Usuario.objects.create_user(f'turno{i}', password='clave-segura-1')
+
+        estados = {self.login(username=f'turno{i}').status_code for i in range(50)}
+
+        self.assertEqual(estados, {200})
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'authentication.hashers.PBKDF2ConfigurablePasswordHasher',
+    'authentication.hashers.Argon2ConfigurablePasswordHasher',
+])
+class RehashLoginTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self):
+        return APIClient().post('/api/auth/login/', {'username': 'vendedor', 'password': 'clave-segura-1'})
+
+    def hash_actual(self):
+        return Usuario.objects.get(username='vendedor').password
+
+    @override_settings(PASSWORD_PBKDF2_ITERACIONES=1000)
+    def crear_usuario(self):
+        Usuario.objects.create_user('vendedor', password='clave-segura-1')
+
+    def test_cambio_de_costo_rehashea_en_el_login(self):
+        self.crear_usuario()
+        self.assertEqual(self.hash_actual().split('$')[1], '1000')
+
+        with self.settings(PASSWORD_PBKDF2_ITERACIONES=2000):
+            self.assertEqual(self.login().status_code, 200)
+
+        self.assertEqual(self.hash_actual().split('$')[1], '2000')
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_cambio_de_hasher_preferido_rehashea_en_el_login(self):
+        self.crear_usuario()
+
+        with self.settings(PASSWORD_HASHERS=[
+            'authentication.hashers.Argon2ConfigurablePasswordHasher',
+            'authentication.hashers.PBKDF2ConfigurablePasswordHasher',
+        ]):
+            self.assertEqual(self.login().status_code, 200)
+            self.assertEqual(identify_hasher(self.hash_actual()).algorithm, 'argon2')
+
+
+class PermisoPorRolTests(TestCase):
+    """PermisoPorRol sobre vistas de prueba con los atributos que leen los ViewSets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vendedor = Usuario.objects.create_user('vendedor', password='x', rol='vendedor')
+        cls.permiso = Permission.objects.get(codename='change_producto', content_type__app_label='ferreteria')
+
+    def setUp(self):
+        cache.clear()
+
+    def permitido(self, metodo='GET', usuario=None, **atributos):
+        request = SimpleNamespace(method=metodo, user=usuario or self.vendedor)
+        return PermisoPorRol().has_permission(request, SimpleNamespace(**atributos))
+
+    def test_roles_de_lectura_y_de_escritura(self):
+        vista = {'roles_permitidos': ('vendedor', 'gerente'), 'roles_escritura': ('gerente',)}
+
+        self.assertTrue(self.permitido('GET', **vista))
+        self.assertFalse(self.permitido('POST', **vista))
+        self.assertFalse(self.permitido('GET', roles_permitidos=('gerente',)))
+        # Sin roles_escritura, la escritura usa roles_permitidos
+        self.assertTrue(self.permitido('DELETE', roles_permitidos=('vendedor',)))
+
+    def test_admin_superusuario_e_inactivo(self):
+        admin = Usuario.objects.create_user('admin', password='x', rol='admin')
+        inactivo = Usuario.objects.create_user('inactivo', password='x', rol='gerente', activo=False)
+        anonimo = SimpleNamespace(is_authenticated=False, pk=None)
+
+        self.assertTrue(self.permitido('POST', usuario=admin, roles_permitidos=('gerente',)))
+        self.assertFalse(self.permitido('GET', usuario=inactivo))
+        self.assertFalse(self.permitido('GET', usuario=anonimo))
+
+    def test_permisos_requeridos_como_tupla_y_por_accion(self):
+        requeridos = ('ferreteria.change_producto',)
+        self.assertFalse(self.permitido(permisos_requeridos=requeridos))
+        self.assertTrue(self.permitido(action='list', permisos_requeridos={'update': requeridos}))
+        self.assertFalse(self.permitido(action='update', permisos_requeridos={'update': requeridos}))
+
+        self.vendedor.user_permissions.add(self.permiso)
+
+        self.assertTrue(self.permitido(permisos_requeridos=requeridos))
+        self.assertTrue(self.permitido(action='update', permisos_requeridos={'update': requeridos}))
+
+    def test_lectura_cacheada_sin_consultas(self):
+        obtener_permisos(self.vendedor.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_permisos(self.vendedor.pk)['rol'], 'vendedor')
+
+    def test_cambio_de_rol_invalida_la_cache(self):
+        vista = {'roles_permitidos': ('gerente',)}
+        self.assertFalse(self.permitido(**vista))
+
+        usuario = Usuario.objects.get(pk=self.vendedor.pk)
+        usuario.rol = 'gerente'
+        usuario.save()
+        self.assertTrue(self.permitido(**vista))
+
+        usuario.activo = False
+        usuario.save()
+        self.assertFalse(self.permitido(**vista))
+
+    def test_cambios_de_grupo_invalidan_la_cache(self):
+        requeridos = ('ferreteria.change_producto',)
+        grupo = Group.objects.create(name='bodega')
+        self.vendedor.groups.add(grupo)
+        self.assertFalse(self.permitido(permisos_requeridos=requeridos))
+
+        # Permiso agregado al grupo: incrementa la versión global
+        grupo.permissions.add(self.permiso)
+        self.assertTrue(self.permitido(permisos_requeridos=requeridos))
+
+        # Usuario quitado del grupo desde el grupo
+        grupo.user_set.remove(self.vendedor)
+        self.assertFalse(self.permitido(permisos_requeridos=requeridos))
+
+    def test_permiso_revocado_al_usuario(self):
+        requeridos = ('ferreteria.change_producto',)
+        self.vendedor.user_permissions.add(self.permiso)
+        self.assertTrue(self.permitido(permisos_requeridos=requeridos))
+
+        self.vendedor.user_permissions.remove(self.permiso)
+
+        self.assertFalse(self.permitido(permisos_requeridos=requeridos))
+
+
+class JWTSinConsultaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user('gerente', password='x', rol='gerente')
+
+    def autenticar(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return JWTSinConsultaAuthentication().authenticate(request)
+
+    def access_token(self):
+        return str(UsuarioRefreshToken.for_user(self.usuario).access_token)
+
+    def otro_proceso_vencido(self):
+        """Conjunto de otro worker cargado con el usuario habilitado y ya vencido"""
+        conjunto = UsuariosHabilitados()
+        conjunto.contiene(self.usuario.pk)
+        conjunto._cargado_en -= conjunto.refresco
+        return conjunto
+
+    def test_usuario_del_token_sin_consultas(self):
+        token = self.access_token()
+        self.autenticar(token)
+
+        with self.assertNumQueries(0):
+            usuario, _ = self.autenticar(token)
+
+        self.assertEqual(usuario.pk, self.usuario.pk)
+        self.assertEqual(usuario.id, self.usuario.pk)
+        self.assertEqual(usuario.rol, 'gerente')
+        self.assertEqual(usuario.username, 'gerente')
+        self.assertTrue(usuario.is_authenticated)
+        self.assertTrue(usuario.is_active)
+
+    def test_request_user_en_una_vista(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token()}')
+
+        response = client.get('/api/auth/verify/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['usuario']['id'], self.usuario.pk)
+        self.assertEqual(response.data['usuario']['rol'], 'gerente')
+
+    def test_usuario_desactivado_despues_de_emitir_el_token(self):
+        token = self.access_token()
+        self.autenticar(token)
+
+        otro_proceso = self.otro_proceso_vencido()
+        self.assertIn(self.usuario.pk, otro_proceso._ids)
+        self.usuario.activo = False
+        self.usuario.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar(token)
+        # Otro worker lo rechaza en su siguiente recarga (a más tardar JWT_USUARIOS_REFRESCO_SEGUNDOS)
+        with mock.patch('authentication.autenticacion.usuarios_habilitados', otro_proceso):
+            with self.assertRaises(AuthenticationFailed):
+                self.autenticar(token)
+
+    def test_usuario_eliminado_despues_de_emitir_el_token(self):
+        token = self.access_token()
+        self.autenticar(token)
+        otro_proceso = self.otro_proceso_vencido()
+        self.assertIn(self.usuario.pk, otro_proceso._ids)
+
+        Usuario.objects.filter(pk=self.usuario.pk).delete()
+
+        with mock.patch('authentication.autenticacion.usuarios_habilitados', otro_proceso):
+            with self.assertRaises(AuthenticationFailed):
+                self.autenticar(token)
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar(token)
+
+    def test_token_sin_claims_de_usuario_consulta_la_base_de_datos(self):
+        token = AccessToken.for_user(self.usuario)
+
+        with self.assertNumQueries(1):
+            usuario, _ = self.autenticar(str(token))
+
+        self.assertIsInstance(usuario, Usuario)
+
+
+class MigrateUsersTests(TestCase):
+    """migrate_users contra una tabla heredada creada en la base de pruebas (--tabla-origen)"""
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE usuarios_legado (id integer PRIMARY KEY, username varchar(150), email varchar(254), '
+                'password_hash varchar(255), rol varchar(20), activo boolean)'
+            )
+        self.checkpoint = Path(tempfile.mkdtemp()) / 'checkpoint'
+
+    def tearDown(self):
+        self.checkpoint.unlink(missing_ok=True)
+        self.checkpoint.parent.rmdir()
+
+    def insertar_origen(self, *filas):
+        with connection.cursor() as cursor:
+            cursor.executemany('INSERT INTO usuarios_legado VALUES (%s, %s, %s, %s, %s, %s)', filas)
+
+    def migrar(self):
+        salida = StringIO()
+        call_command(
+            'migrate_users', tabla_origen='usuarios_legado', checkpoint=str(self.checkpoint), lote=2, stdout=salida
+        )
+        return salida.getvalue()
+
+    def test_hash_bcrypt_se_conserva_sin_rehashear(self):
+        legado = bcrypt.hashpw(b'clave-heredada', bcrypt.gensalt(rounds=4)).decode()
+        self.insertar_origen((1, 'ana', 'ana@framasa.com', legado, 'gerente', True))
+
+        self.migrar()
+
+        usuario = Usuario.objects.get(username='ana')
+        self.assertEqual(usuario.password, f'bcrypt${legado}')
+        self.assertEqual(usuario.rol, 'gerente')
+        self.assertTrue(usuario.check_password('clave-heredada'))
+
+    def test_reanudar_desde_el_checkpoint(self):
+        self.insertar_origen(
+            (1, 'ana', None, '', 'vendedor', True),
+            (2, 'beto', None, '', 'vendedor', True),
+            (3, 'carla', None, '', 'vendedor', True),
+        )
+        self.assertIn('Migrados: 3', self.migrar())
+        self.assertEqual(self.checkpoint.read_text(), '3')
+
+        self.insertar_origen((4, 'dora', None, '', 'rol-desconocido', None))
+        salida = self.migrar()
+
+        self.assertIn('Reanudando desde el id 3', salida)
+        self.assertIn('Migrados: 1', salida)
+        self.assertIn('Omitidos (ya existían): 0', salida)
+        self.assertEqual(self.checkpoint.read_text(), '4')
+        dora = Usuario.objects.get(username='dora')
+        self.assertEqual((dora.rol, dora.email, dora.is_active), ('vendedor', 'dora@framasa.com', True))
+        self.assertFalse(dora.has_usable_password())
+
+    def test_conflictos_omitidos_por_bulk_create_no_cuentan_como_migrados(self):
+        self.insertar_origen((1, 'ana', None, '', 'vendedor', True), (2, 'beto', None, '', 'vendedor', True))
+        preparar_lote = MigrateUsers.preparar_lote
+
+        def preparar_y_competir(comando, filas):
+            nuevos = preparar_lote(comando, filas)
+            # Otro proceso crea 'beto' entre la verificación y el INSERT
+            Usuario.objects.create_user('beto', password='x')
+            return nuevos
+
+        with mock.patch.object(MigrateUsers, 'preparar_lote', preparar_y_competir):
+            salida = self.migrar()
+
+        self.assertIn('Migrados: 1', salida)
+        self.assertIn('Omitidos (ya existían): 1', salida)
@@ -0,0 +1,168 @@
+"""
+Tokens JWT con los datos del usuario embebidos como claims
+
+Permiten que JWTSinConsultaAuthentication construya el usuario del request a
+partir del token, sin consultar la tabla usuarios en cada llamada.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def claims_usuario(user):
+    """Claims que se agregan a los tokens emitidos para el usuario"""
+    return {
+        'username': user.get_username(),
+        'rol': getattr(user, 'rol', None) or 'vendedor',
+        'activo': bool(getattr(user, 'activo', True) and user.is_active),
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+    }
+
+
+# Backends de caché que no se comparten entre procesos
+CACHES_POR_PROCESO = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_compartida(alias='default'):
+    """True si todos los workers ven la misma caché (Redis, Memcached, base de datos, archivos)"""
+    return settings.CACHES.get(alias, {}).get('BACKEND') not in CACHES_POR_PROCESO
+
+
+class JTIsRevocados:
+    """
+    Conjunto en memoria (por proceso) de los JTI de refresh tokens en la lista negra
+
+    Se reconstruye cada JWT_BLACKLIST_REFRESCO_SEGUNDOS con los tokens de la
+    lista negra que aún no expiran; los tokens revocados en este proceso se
+    agregan de inmediato. Cada revocación se escribe además en la caché
+    compartida (Redis en producción) hasta que el token expira, y un JTI que
+    no está en el conjunto local se busca ahí (un solo cache.get), de modo que
+    un token revocado o rotado desde otro proceso se rechaza sin esperar la
+    reconstrucción.
+
+    Si la caché no es compartida entre procesos (LocMemCache o DummyCache,
+    la configuración por defecto sin REDIS_URL) o con
+    JWT_BLACKLIST_REFRESCO_SEGUNDOS = 0 se consulta siempre la base de datos:
+    de otro modo un refresh token rotado en un worker seguiría sirviendo en
+    los demás hasta la siguiente reconstrucción.
+    """
+
+    def __init__(self):
+        self._jtis = frozenset()
+        self._cargado_en = None
+        self._lock = threading.Lock()
+
+    @property
+    def refresco(self):
+        return getattr(settings, 'JWT_BLACKLIST_REFRESCO_SEGUNDOS', 60)
+
+    def _recargar(self):
+        with self._lock:
+            if self._cargado_en is not None and time.monotonic() - self._cargado_en < self.refresco:
+                return
+            self._jtis = frozenset(
+                BlacklistedToken.objects.filter(
+                    token__expires_at__gt=timezone.now()
+                ).values_list('token__jti', flat=True)
+            )
+            self._cargado_en = time.monotonic()
+
+    def contiene(self, jti):
+        if not self.refresco or not cache_compartida():
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if self._cargado_en is None or time.monotonic() - self._cargado_en >= self.refresco:
+            self._recargar()
+        return jti in self._jtis or cache.get(self.clave_cache(jti)) is not None
+
+    def agregar(self, jti, expira=None):
+        """
+        Args:
+            expira: timestamp de expiración del token; la marca en la caché
+                dura hasta entonces (por defecto, la vida de un refresh token)
+        """
+        with self._lock:
+            self._jtis = self._jtis | {jti}
+        if expira is None:
+            duracion = api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+        else:
+            duracion = expira - time.time()
+        if duracion > 0:
+            cache.set(self.clave_cache(jti), 1, timeout=math.ceil(duracion))
+
+    @staticmethod
+    def clave_cache(jti):
+        return f'jwt-revocado:{jti}'
+
+
+jtis_revocados = JTIsRevocados()
+
+
+class UsuarioRefreshToken(RefreshToken):
+    """
+    RefreshToken que incluye rol, activo y username del usuario
+
+    El access token generado con .access_token copia estos claims. La
+    verificación de la lista negra usa jtis_revocados (conjunto local y caché
+    compartida) en lugar de una consulta por cada refresh.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for clave, valor in claims_usuario(user).items():
+            token[clave] = valor
+        return token
+
+    def check_blacklist(self):
+        if jtis_revocados.contiene(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('El token está en la lista negra')
+
+    def blacklist(self):
+        resultado = super().blacklist()
+        jtis_revocados.agregar(self.payload[api_settings.JTI_CLAIM], self.payload.get('exp'))
+        return resultado
+
+
+class UsuarioToken(TokenUser):
+    """Usuario liviano construido a partir de los claims del token"""
+
+    @cached_property
+    def rol(self):
+        return self.token.get('rol', 'vendedor')
+
+    @cached_property
+    def activo(self):
+        return self.token.get('activo', True)
+
+    @property
+    def is_active(self):
+        return self.activo
+
+    # Permisos resueltos desde la caché de authentication.permisos (TokenUser no tiene grupos)
+
+    def get_all_permissions(self, obj=None):
+        from .permisos import obtener_permisos
+        datos = obtener_permisos(self.pk)
+        return set(datos['permisos']) if datos else set()
+
+    def has_perm(self, perm, obj=None):
+        from .permisos import tiene_permiso
+        return tiene_permiso(self.pk, perm)
+
+    def has_perms(self, perm_list, obj=None):
+        from .permisos import tiene_permiso
+        return tiene_permiso(self.pk, *perm_list)
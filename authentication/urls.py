@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('verify/', views.verify_token_view, name='verify'),
+    path('refresh/', views.refresh_token_view, name='refresh'),
     path('logout/', views.logout_view, name='logout'),
 ]
 
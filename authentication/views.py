@@ -2,9 +2,12 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from django.contrib.auth import get_user_model
 from .serializers import LoginSerializer, UsuarioSerializer
+from .tokens import UsuarioRefreshToken
+from .limitador import verificar_login
 
 User = get_user_model()
 
@@ -15,14 +18,30 @@ def login_view(request):
     """
     Endpoint para iniciar sesión
     """
+    if not isinstance(request.data, dict):
+        return Response({
+            'success': False,
+            'error': 'Debe enviar un objeto con "username" y "password".'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Rechazar ráfagas de intentos antes de ejecutar el hash de la contraseña
+    espera = verificar_login(request, request.data.get('username'))
+    if espera:
+        response = Response({
+            'success': False,
+            'error': 'Demasiados intentos de inicio de sesión. Intente de nuevo más tarde.'
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(espera)
+        return response
+
     try:
         serializer = LoginSerializer(data=request.data)
         
         if serializer.is_valid():
             user = serializer.validated_data['user']
             
-            # Generar tokens JWT
-            refresh = RefreshToken.for_user(user)
+            # Generar tokens JWT (con rol y estado del usuario como claims)
+            refresh = UsuarioRefreshToken.for_user(user)
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
             
@@ -60,7 +79,8 @@ def verify_token_view(request):
     Endpoint para verificar si un token es válido
     """
     try:
-        user = request.user
+        # request.user se construye desde el token; aquí se devuelven los datos actuales
+        user = User.objects.get(pk=request.user.pk)
         user_serializer = UsuarioSerializer(user)
         
         return Response({
@@ -83,7 +103,7 @@ def logout_view(request):
     try:
         refresh_token = request.data.get('refresh_token')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = UsuarioRefreshToken(refresh_token)
             token.blacklist()
         
         return Response({
@@ -96,3 +116,38 @@ def logout_view(request):
             'error': str(e)
         }, status=status.HTTP_400_BAD_REQUEST)
 
+
+class RefreshSerializer(TokenRefreshSerializer):
+    """Refresh con UsuarioRefreshToken (lista negra en memoria y claims del usuario)"""
+    token_class = UsuarioRefreshToken
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def refresh_token_view(request):
+    """
+    Endpoint para renovar el access token con el refresh token
+    Con ROTATE_REFRESH_TOKENS devuelve también un refresh token nuevo y el
+    anterior queda en la lista negra
+    """
+    refresh_token = request.data.get('refresh_token')
+    if not refresh_token:
+        return Response({
+            'success': False,
+            'error': 'Debe incluir "refresh_token".'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = RefreshSerializer(data={'refresh': refresh_token})
+    try:
+        serializer.is_valid(raise_exception=True)
+    except TokenError as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    return Response({
+        'success': True,
+        'token': serializer.validated_data['access'],
+        'refresh_token': serializer.validated_data.get('refresh', refresh_token),
+    }, status=status.HTTP_200_OK)
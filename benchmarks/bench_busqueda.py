@@ -0,0 +1,108 @@
+"""
+Benchmark de búsqueda por texto (latencia por tecla)
+
+Genera N productos dentro de una transacción, mide la búsqueda de cada prefijo
+del término (como lo envía el buscador del frontend al escribir) con y sin
+los índices pg_trgm, y al final deshace todo.
+
+Uso:
+    python benchmarks/bench_busqueda.py --filas 100000 --termino "tubo pvc"
+Requiere PostgreSQL con la migración de índices trigram aplicada.
+"""
+import argparse
+import random
+
+from comun import configurar_django, medir, Rollback
+
+PALABRAS = (
+    'tubo', 'pvc', 'codo', 'tee', 'llave', 'paso', 'cemento', 'clavo', 'tornillo',
+    'alambre', 'lamina', 'pintura', 'brocha', 'cable', 'foco', 'cinta', 'malla',
+    'varilla', 'hierro', 'galvanizado', 'bronce', 'cobre', 'acero', 'plastico',
+)
+
+
+def generar_productos(filas, categorias, unidad):
+    from ferreteria.models import Producto
+
+    aleatorio = random.Random(42)
+    lote = []
+    for i in range(filas):
+        nombre = ' '.join(aleatorio.choice(PALABRAS) for _ in range(3))
+        lote.append(Producto(
+            codigo=f'BENCH-{i:07d}',
+            nombre=f'{nombre} {aleatorio.randint(1, 99)}"',
+            categoria=aleatorio.choice(categorias),
+            unidad_medida=unidad,
+        ))
+        if len(lote) == 5000:
+            Producto.objects.bulk_create(lote)
+            lote = []
+    Producto.objects.bulk_create(lote)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--termino', default='tubo pvc')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.db import connection, transaction
+    from django.db.models import Q
+    from ferreteria.models import Producto, CategoriaProducto, UnidadMedida
+    from ferreteria.views import ProductoViewSet
+    from framasa_backend.search import aplicar_busqueda, ordenar_por_relevancia
+
+    if connection.vendor != 'postgresql':
+        raise SystemExit('Este benchmark requiere PostgreSQL')
+
+    campos = ProductoViewSet.campos_busqueda
+    base = Producto.objects.select_related('categoria', 'unidad_medida')
+
+    def consulta_anterior(texto):
+        # Búsqueda original: OR de __icontains sin índices ni relevancia
+        filtro = Q()
+        for campo in campos:
+            filtro |= Q(**{f'{campo}__icontains': texto})
+        return list(base.filter(filtro).order_by('codigo').values_list('id', flat=True))
+
+    def consulta_nueva(texto):
+        queryset = ordenar_por_relevancia(aplicar_busqueda(base, texto, campos), 'codigo')
+        return list(queryset.values_list('id', flat=True))
+
+    prefijos = [args.termino[:i] for i in range(2, len(args.termino) + 1) if args.termino[i - 1] != ' ']
+
+    try:
+        with transaction.atomic():
+            categorias = [
+                CategoriaProducto.objects.create(nombre=f'BENCH categoría {i}') for i in range(20)
+            ]
+            unidad = UnidadMedida.objects.create(nombre='BENCH unidad', abreviatura='bch')
+            generar_productos(args.filas, categorias, unidad)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE productos')
+                cursor.execute('ANALYZE categorias_producto')
+
+            despues = {p: medir(lambda: consulta_nueva(p), args.repeticiones) for p in prefijos}
+            resultados = {p: len(consulta_nueva(p)) for p in prefijos}
+
+            # DROP INDEX es transaccional: se restaura con el rollback final
+            with connection.cursor() as cursor:
+                cursor.execute('DROP INDEX IF EXISTS idx_productos_codigo_trgm')
+                cursor.execute('DROP INDEX IF EXISTS idx_productos_nombre_trgm')
+                cursor.execute('DROP INDEX IF EXISTS idx_categorias_producto_nombre_trgm')
+            antes = {p: medir(lambda: consulta_anterior(p), args.repeticiones) for p in prefijos}
+
+            print(f'Productos: {args.filas}  término: "{args.termino}"')
+            print(f'{"prefijo":<16}{"filas":>10}{"antes ms":>12}{"después ms":>12}{"mejora":>10}')
+            for p in prefijos:
+                print(f'{p!r:<16}{resultados[p]:>10}{antes[p]:>12.1f}{despues[p]:>12.1f}'
+                      f'{antes[p] / despues[p]:>9.1f}x')
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark de compresión: tamaño, CPU y tiempo de transferencia por nivel
+
+Genera N productos dentro de una transacción y serializa listados de varios
+tamaños con ProductoSerializer (claves snake_case y camelCase). Para cada
+tamaño compara gzip y brotli en varios niveles: bytes enviados, razón de
+compresión, milisegundos de CPU y tiempo total estimado (CPU + transferencia)
+con el ancho de banda indicado. La fila 'stream' comprime por bloques con
+vaciado, como las respuestas ?stream=true.
+
+Uso:
+    python benchmarks/bench_compresion.py --filas 1000 10000 50000 --mbps 20
+"""
+import argparse
+
+from comun import configurar_django, medir, Rollback
+
+NIVELES = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 6), ('br', 11)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--mbps', type=float, default=20, help='Ancho de banda del cliente en Mbit/s')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.db import transaction
+    from ferreteria.models import Producto, CategoriaProducto, UnidadMedida
+    from ferreteria.serializers import ProductoSerializer
+    from framasa_backend.middleware import CompresionMiddleware, brotli
+    from framasa_backend.renderers import dumps
+    from framasa_backend.streaming import generar_json_array
+
+    middleware = CompresionMiddleware(lambda request: None)
+    niveles = [(codificacion, nivel) for codificacion, nivel in NIVELES if codificacion == 'gzip' or brotli]
+    if brotli is None:
+        print('brotli no está instalado: solo se mide gzip (pip install Brotli)')
+
+    def comprimir(codificacion, nivel, bloques):
+        middleware.nivel_gzip = middleware.nivel_brotli = nivel
+        compresor = middleware.crear_compresor(codificacion)
+        if len(bloques) == 1:
+            return compresor.comprimir(bloques[0]) + compresor.terminar()
+        salida = [compresor.comprimir(bloque) + compresor.vaciar() for bloque in bloques]
+        return b''.join(salida) + compresor.terminar()
+
+    maximo = max(args.filas)
+    try:
+        with transaction.atomic():
+            categoria = CategoriaProducto.objects.create(nombre='BENCH categoría')
+            unidad = UnidadMedida.objects.create(nombre='BENCH unidad', abreviatura='bch')
+            Producto.objects.bulk_create(
+                [
+                    Producto(
+                        codigo=f'BENCH-{i:07d}', nombre=f'Producto de prueba {i}',
+                        categoria=categoria, unidad_medida=unidad,
+                        precio_venta=f'{i % 1000}.{i % 100:02d}', stock_actual=i % 50,
+                    )
+                    for i in range(maximo)
+                ],
+                batch_size=5000,
+            )
+            filas = ProductoSerializer(
+                Producto.objects.select_related('categoria', 'unidad_medida').filter(
+                    codigo__startswith='BENCH-'
+                ).order_by('codigo'),
+                many=True,
+            ).data
+            raise Rollback
+    except Rollback:
+        pass
+
+    bytes_por_ms = args.mbps * 1_000_000 / 8 / 1000
+    print(f'Ancho de banda: {args.mbps} Mbit/s')
+    print(f'{"filas":>7} {"modo":<14}{"KB":>10}{"razón":>8}{"CPU ms":>9}{"MB/s":>9}{"total ms":>10}')
+    for cantidad in args.filas:
+        contenido = dumps(filas[:cantidad])
+        bloques = list(generar_json_array(filas[:cantidad], 2000))
+        print(f'{cantidad:>7} {"sin comprimir":<14}{len(contenido) / 1024:>10.1f}{1:>8.1f}'
+              f'{0:>9.1f}{"":>9}{len(contenido) / bytes_por_ms:>10.1f}')
+        modos = [(f'{codificacion}-{nivel}', codificacion, nivel, [contenido]) for codificacion, nivel in niveles]
+        modos.append(('gzip-6 stream', 'gzip', 6, bloques))
+        if brotli:
+            modos.append(('br-4 stream', 'br', 4, bloques))
+        for nombre, codificacion, nivel, entrada in modos:
+            comprimido = comprimir(codificacion, nivel, entrada)
+            ms = medir(lambda: comprimir(codificacion, nivel, entrada), args.repeticiones)
+            print(f'{"":>7} {nombre:<14}{len(comprimido) / 1024:>10.1f}'
+                  f'{len(contenido) / len(comprimido):>8.1f}{ms:>9.1f}'
+                  f'{len(contenido) / 1024 / 1024 / (ms / 1000) if ms else 0:>9.0f}'
+                  f'{ms + len(comprimido) / bytes_por_ms:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de conexiones: costo por petición de abrir la conexión a PostgreSQL
+
+Simula el ciclo de una petición (señales request_started/request_finished,
+que es donde Django cierra o reutiliza la conexión) con una consulta mínima,
+como las de stats y detalle, en varios modos:
+
+- sin persistencia: CONN_MAX_AGE=0, una conexión nueva por petición
+- persistente: CONN_MAX_AGE=60 sin health checks
+- persistente + health checks: CONN_MAX_AGE=60 con CONN_HEALTH_CHECKS
+- configuración actual: lo definido en settings (incluye el pool si DB_POOL=True)
+
+Uso:
+    python benchmarks/bench_conexiones.py --peticiones 500
+"""
+import argparse
+import time
+
+from comun import configurar_django
+
+MODOS = [
+    ('sin persistencia', {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}),
+    ('persistente', {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': False}),
+    ('persistente + health checks', {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True}),
+    ('configuración actual', {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--peticiones', type=int, default=500)
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+
+    from framasa_backend.conexiones import obtener_metricas
+
+    def peticion():
+        request_started.send(sender=None)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        request_finished.send(sender=None)
+
+    original = {clave: connection.settings_dict[clave] for clave in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+    resultados = []
+    for nombre, valores in MODOS:
+        connection.close()
+        connection.settings_dict.update(original)
+        connection.settings_dict.update(valores)
+        peticion()  # calentamiento
+
+        aperturas = obtener_metricas()['bases_de_datos']['default']['conexiones_abiertas']
+        inicio = time.perf_counter()
+        for _ in range(args.peticiones):
+            peticion()
+        ms = (time.perf_counter() - inicio) * 1000 / args.peticiones
+        aperturas = obtener_metricas()['bases_de_datos']['default']['conexiones_abiertas'] - aperturas
+        resultados.append((nombre, ms, aperturas))
+    connection.close()
+    connection.settings_dict.update(original)
+
+    base = resultados[0][1]
+    print(f'{"modo":<30}{"ms/petición":>13}{"conexiones":>12}{"ahorro ms":>11}')
+    for nombre, ms, aperturas in resultados:
+        print(f'{nombre:<30}{ms:>13.3f}{aperturas:>12}{base - ms:>11.3f}')
+
+    pool = obtener_metricas()['bases_de_datos']['default']['pool']
+    if pool:
+        print(f'Pool: en uso {pool["en_uso"]}/{pool["tamano"]}, esperas {pool["solicitudes_en_espera"]}, '
+              f'timeouts {pool["timeouts"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark de codificación JSON: JSONRenderer de DRF vs ORJSONRenderer
+
+Genera N productos dentro de una transacción, obtiene los datos del listado
+(ProductoListSerializer, ruta rápida) y del detalle (ProductoSerializer),
+comprueba que ambos renderers produzcan el mismo JSON byte a byte y reporta
+el tiempo de render y de parseo.
+
+Uso:
+    python benchmarks/bench_json.py --filas 50000
+"""
+import argparse
+import io
+
+from comun import configurar_django, medir, Rollback
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, default=50000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.db import transaction
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from ferreteria.models import Producto, CategoriaProducto, UnidadMedida
+    from ferreteria.serializers import ProductoListSerializer, ProductoSerializer
+    from framasa_backend.renderers import ORJSONParser, ORJSONRenderer, orjson
+
+    if orjson is None:
+        raise SystemExit('orjson no está instalado: pip install orjson')
+
+    try:
+        with transaction.atomic():
+            categoria = CategoriaProducto.objects.create(nombre='BENCH categoría')
+            unidad = UnidadMedida.objects.create(nombre='BENCH unidad', abreviatura='bch')
+            Producto.objects.bulk_create(
+                [
+                    Producto(
+                        codigo=f'BENCH-{i:07d}', nombre=f'Producto de prueba {i} ñ',
+                        categoria=categoria, unidad_medida=unidad,
+                        precio_venta=f'{i % 1000}.{i % 100:02d}', stock_actual=i % 50,
+                    )
+                    for i in range(args.filas)
+                ],
+                batch_size=5000,
+            )
+            queryset = Producto.objects.select_related('categoria', 'unidad_medida').filter(
+                codigo__startswith='BENCH-'
+            ).order_by('codigo')
+
+            conjuntos = {
+                'listado': ProductoListSerializer.serializar_valores(queryset),
+                'detalle': ProductoSerializer(queryset, many=True).data,
+            }
+            raise Rollback
+    except Rollback:
+        pass
+
+    drf, rapido = JSONRenderer(), ORJSONRenderer()
+    print(f'Filas: {args.filas}')
+    print(f'{"datos":<10}{"operación":<10}{"DRF ms":>10}{"orjson ms":>11}{"mejora":>9}{"MB":>8}')
+    for nombre, datos in conjuntos.items():
+        contenido = drf.render(datos)
+        if rapido.render(datos) != contenido:
+            raise SystemExit(f'ERROR: ORJSONRenderer no produce el mismo JSON ({nombre})')
+
+        ms_drf = medir(lambda: drf.render(datos), args.repeticiones)
+        ms_orjson = medir(lambda: rapido.render(datos), args.repeticiones)
+        mb = len(contenido) / 1024 / 1024
+        print(f'{nombre:<10}{"render":<10}{ms_drf:>10.1f}{ms_orjson:>11.1f}{ms_drf / ms_orjson:>8.1f}x{mb:>8.1f}')
+
+        ms_drf = medir(lambda: JSONParser().parse(io.BytesIO(contenido)), args.repeticiones)
+        ms_orjson = medir(lambda: ORJSONParser().parse(io.BytesIO(contenido)), args.repeticiones)
+        print(f'{nombre:<10}{"parse":<10}{ms_drf:>10.1f}{ms_orjson:>11.1f}{ms_drf / ms_orjson:>8.1f}x')
+    print('JSON idéntico: sí')
+
+
+if __name__ == '__main__':
+    main()
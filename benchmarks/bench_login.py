@@ -0,0 +1,93 @@
+"""
+Benchmark de login: logins por segundo por núcleo según el hasher
+
+Para cada hasher (argon2, bcrypt, pbkdf2 con los costos de settings) mide
+check_password en un solo hilo y el endpoint /api/auth/login/ completo
+(autenticación + emisión de tokens) con un usuario temporal. También mide
+cuánto cuesta rechazar un intento con el limitador (HTTP 429).
+
+Uso:
+    python benchmarks/bench_login.py --repeticiones 20
+"""
+import argparse
+import time
+
+from comun import configurar_django, Rollback
+
+HASHERS = {
+    'argon2': 'authentication.hashers.Argon2ConfigurablePasswordHasher',
+    'bcrypt': 'authentication.hashers.BCryptSHA256ConfigurablePasswordHasher',
+    'pbkdf2': 'authentication.hashers.PBKDF2ConfigurablePasswordHasher',
+}
+
+
+def por_segundo(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return repeticiones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.conf import settings
+    from django.contrib.auth.hashers import check_password, make_password
+    from django.core.cache import cache
+    from django.db import transaction
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+    from authentication.models import Usuario
+
+    password = 'Benchmark-123!'
+    cliente = APIClient()
+    # APIClient usa el host 'testserver'
+    override_settings(ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver']).enable()
+    sin_limite = dict(LOGIN_LIMITE_IP=(10 ** 9, 10 ** 9), LOGIN_LIMITE_USUARIO=(10 ** 9, 10 ** 9))
+
+    print(f'{"hasher":<10}{"check_password/s":>18}{"login/s":>12}')
+    for clave, hasher in HASHERS.items():
+        with override_settings(PASSWORD_HASHERS=[hasher] + settings.PASSWORD_HASHERS, **sin_limite):
+            try:
+                encoded = make_password(password)
+            except ValueError as e:
+                print(f'{clave:<10}  no disponible ({e})')
+                continue
+
+            hash_por_segundo = por_segundo(lambda: check_password(password, encoded), args.repeticiones)
+            try:
+                with transaction.atomic():
+                    Usuario.objects.create_user('bench_login', password=password)
+
+                    def login():
+                        response = cliente.post(
+                            '/api/auth/login/', {'username': 'bench_login', 'password': password}, format='json'
+                        )
+                        assert response.status_code == 200, response.content
+
+                    login()
+                    login_por_segundo = por_segundo(login, args.repeticiones)
+                    raise Rollback
+            except Rollback:
+                pass
+        print(f'{clave:<10}{hash_por_segundo:>18,.1f}{login_por_segundo:>12,.1f}')
+
+    # Costo de rechazar un flood: la cubeta del username se agota y el resto recibe 429
+    cache.clear()
+    with override_settings(LOGIN_LIMITE_IP=(10 ** 9, 10 ** 9), LOGIN_LIMITE_USUARIO=(1, 1)):
+        def intento():
+            return cliente.post('/api/auth/login/', {'username': 'flood', 'password': 'x'}, format='json')
+
+        intento()
+        assert intento().status_code == 429
+        rechazos = por_segundo(intento, args.repeticiones * 10)
+    cache.clear()
+    print(f'Intentos rechazados por el limitador (429): {rechazos:,.0f}/s')
+    print('Valores por núcleo: cada medición corre en un solo hilo.')
+
+
+if __name__ == '__main__':
+    main()
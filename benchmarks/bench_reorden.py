@@ -0,0 +1,164 @@
+"""
+Benchmark del pronóstico de reorden: NumPy por bloques vs bucle por producto
+
+Genera la demanda diaria sintética de N productos x D días (Poisson, con una
+fracción de días sin ventas y productos creados en fechas distintas) y mide,
+bloque por bloque como el comando calcular_reorden:
+
+- matriz: armar la matriz desde las filas (producto, día, cantidad) que
+  devuelve la consulta agregada
+- cálculo: promedio móvil, SES, desviación, punto de reorden y EOQ con NumPy
+
+El mismo cálculo con un bucle de Python por producto (la referencia de
+productos/tests.py) se mide sobre una muestra y se extrapola. Con --productos-db se ejecuta además el comando
+completo (consulta, cálculo y guardado) contra la base de datos, dentro de
+una transacción que se deshace.
+
+Uso:
+    python benchmarks/bench_reorden.py --productos 100000 --dias 730
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+
+from comun import configurar_django, Rollback
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--productos', type=int, default=100000)
+    parser.add_argument('--dias', type=int, default=730)
+    parser.add_argument('--densidad', type=float, default=0.3, help='Fracción de días con ventas')
+    parser.add_argument('--bloque', type=int, default=10000)
+    parser.add_argument('--muestra', type=int, default=1000, help='Productos del bucle de referencia')
+    parser.add_argument('--productos-db', type=int, default=0, help='Productos para la prueba con base de datos')
+    args = parser.parse_args()
+
+    configurar_django()
+    import numpy as np
+    from productos import pronostico
+    from productos.tests import reorden_por_producto
+
+    parametros = {clave: valor for clave, valor in pronostico.PARAMETROS.items() if clave != 'dias'}
+    rng = np.random.default_rng(0)
+    fecha_inicio = date(2024, 1, 1)
+    dias_np = np.datetime64(fecha_inicio, 'D') + np.arange(args.dias)
+    fechas = dias_np.astype(object)
+
+    ms_matriz = ms_calculo = 0.0
+    celdas = 0
+    muestra = None
+    for desde in range(0, args.productos, args.bloque):
+        n = min(args.bloque, args.productos - desde)
+        ids = np.arange(desde + 1, desde + n + 1, dtype=np.int64)
+        inicio = rng.integers(0, args.dias // 2, n)
+        tasas = rng.gamma(1.5, 2.0, n)
+        hay_venta = (rng.random((n, args.dias)) < args.densidad) & (np.arange(args.dias) >= inicio[:, None])
+        filas_idx, columnas_idx = np.nonzero(hay_venta)
+        cantidades = rng.poisson(tasas[filas_idx]) + 1
+        filas = list(zip(ids[filas_idx].tolist(), fechas[columnas_idx].tolist(), cantidades.tolist()))
+        costos = rng.uniform(1, 500, n)
+        celdas += len(filas)
+
+        t = time.perf_counter()
+        demanda = pronostico.matriz_demanda(ids, filas, fecha_inicio, args.dias)
+        ms_matriz += (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        resultado = pronostico.calcular(demanda, inicio, costos, **parametros)
+        ms_calculo += (time.perf_counter() - t) * 1000
+
+        if muestra is None:
+            muestra = (demanda[:args.muestra], inicio[:args.muestra], costos[:args.muestra], resultado)
+
+    demanda, inicio, costos, resultado = muestra
+    z = NormalDist().inv_cdf(parametros['nivel_servicio'])
+    series = [fila[s:].tolist() for fila, s in zip(demanda, inicio)]
+    t = time.perf_counter()
+    referencia = [
+        reorden_por_producto(
+            serie, costo, parametros['ventana'], parametros['alfa'], parametros['tiempo_entrega'], z,
+            parametros['costo_pedido'], parametros['tasa_mantenimiento'],
+        )
+        for serie, costo in zip(series, costos)
+    ]
+    ms_bucle = (time.perf_counter() - t) * 1000 * args.productos / len(series)
+    diferencias = sum(
+        1 for (punto, cantidad, _), p, c in zip(
+            referencia, resultado['punto_reorden'], resultado['cantidad_pedido']
+        )
+        if punto != p or cantidad != c
+    )
+
+    print(f'Productos: {args.productos}  días: {args.dias}  filas (producto, día): {celdas}')
+    print(f'{"etapa":<28}{"segundos":>10}')
+    print(f'{"matriz desde filas":<28}{ms_matriz / 1000:>10.2f}')
+    print(f'{"cálculo NumPy":<28}{ms_calculo / 1000:>10.2f}')
+    print(f'{"total NumPy":<28}{(ms_matriz + ms_calculo) / 1000:>10.2f}')
+    print(f'{"bucle Python (extrapolado)":<28}{ms_bucle / 1000:>10.2f}')
+    print(f'Mejora del cálculo: {ms_bucle / ms_calculo:.0f}x; '
+          f'diferencias con la referencia en {len(series)} productos: {diferencias}')
+
+    if args.productos_db:
+        medir_base_de_datos(args.productos_db, args.dias, args.densidad)
+
+
+def medir_base_de_datos(cantidad, dias, densidad):
+    from django.db import transaction
+    from django.utils import timezone
+    from ferreteria.models import Producto, CategoriaProducto, UnidadMedida, MovimientoInventario
+    from productos import pronostico
+
+    import numpy as np
+    rng = np.random.default_rng(1)
+    ayer = timezone.localdate() - timedelta(days=1)
+    try:
+        with transaction.atomic():
+            categoria = CategoriaProducto.objects.create(nombre='BENCH categoría')
+            unidad = UnidadMedida.objects.create(nombre='BENCH unidad', abreviatura='bch')
+            productos = Producto.objects.bulk_create(
+                [
+                    Producto(
+                        codigo=f'BENCH-{i:07d}', nombre=f'Producto de prueba {i}',
+                        categoria=categoria, unidad_medida=unidad, costo_unitario=f'{i % 500 + 1}.00',
+                    )
+                    for i in range(cantidad)
+                ],
+                batch_size=5000,
+            )
+            Producto.objects.filter(codigo__startswith='BENCH-').update(
+                created_at=timezone.now() - timedelta(days=dias)
+            )
+            t = time.perf_counter()
+            movimientos = []
+            for producto in productos:
+                for dia in np.flatnonzero(rng.random(dias) < densidad).tolist():
+                    movimientos.append(MovimientoInventario(
+                        producto_id=producto.id, tipo=MovimientoInventario.TIPO_SALIDA,
+                        cantidad=-int(rng.integers(1, 10)),
+                    ))
+                    movimientos[-1].dia = dia
+            MovimientoInventario.objects.bulk_create(movimientos, batch_size=5000)
+            # auto_now_add no permite fijar la fecha al crear
+            for movimiento in movimientos:
+                movimiento.created_at = timezone.make_aware(
+                    datetime.combine(ayer - timedelta(days=movimiento.dia), datetime.min.time())
+                )
+            MovimientoInventario.objects.bulk_update(movimientos, ['created_at'], batch_size=5000)
+            print(f'\nBase de datos: {cantidad} productos, {len(movimientos)} movimientos '
+                  f'(generados en {time.perf_counter() - t:.1f} s)')
+
+            t = time.perf_counter()
+            sugerencias = pronostico.pronosticar('ferreteria', dias=dias)
+            consulta_y_calculo = time.perf_counter() - t
+            t = time.perf_counter()
+            pronostico.guardar('ferreteria', sugerencias)
+            print(f'consulta + cálculo: {consulta_y_calculo:.2f} s  guardado: {time.perf_counter() - t:.2f} s  '
+                  f'({len(sugerencias)} sugerencias)')
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark de serialización de listados (DRF vs ruta rápida con values_list)
+
+Genera N productos dentro de una transacción, serializa el listado con
+ProductoListSerializer(many=True) y con la ruta rápida, comprueba que el
+JSON resultante sea idéntico byte a byte y reporta filas por segundo.
+
+Uso:
+    python benchmarks/bench_serializacion.py --filas 50000
+"""
+import argparse
+
+from comun import configurar_django, medir, Rollback
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, default=50000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.db import transaction
+    from rest_framework.renderers import JSONRenderer
+    from ferreteria.models import Producto, CategoriaProducto, UnidadMedida
+    from ferreteria.serializers import ProductoListSerializer
+
+    renderer = JSONRenderer()
+
+    try:
+        with transaction.atomic():
+            categoria = CategoriaProducto.objects.create(nombre='BENCH categoría')
+            unidad = UnidadMedida.objects.create(nombre='BENCH unidad', abreviatura='bch')
+            Producto.objects.bulk_create(
+                [
+                    Producto(
+                        codigo=f'BENCH-{i:07d}', nombre=f'Producto de prueba {i}',
+                        categoria=categoria, unidad_medida=unidad,
+                        precio_venta=f'{i % 1000}.{i % 100:02d}', stock_actual=i % 50,
+                    )
+                    for i in range(args.filas)
+                ],
+                batch_size=5000,
+            )
+            queryset = Producto.objects.select_related('categoria', 'unidad_medida').filter(
+                codigo__startswith='BENCH-'
+            ).order_by('codigo')
+
+            def drf():
+                return renderer.render(ProductoListSerializer(queryset, many=True).data)
+
+            def rapida():
+                return renderer.render(ProductoListSerializer.serializar_valores(queryset))
+
+            if drf() != rapida():
+                raise SystemExit('ERROR: la ruta rápida no produce el mismo JSON')
+
+            ms_drf = medir(drf, args.repeticiones)
+            ms_rapida = medir(rapida, args.repeticiones)
+            print(f'Filas: {args.filas}  (JSON idéntico: sí)')
+            print(f'{"ruta":<14}{"ms":>10}{"filas/s":>14}')
+            print(f'{"DRF":<14}{ms_drf:>10.1f}{args.filas / ms_drf * 1000:>14,.0f}')
+            print(f'{"values_list":<14}{ms_rapida:>10.1f}{args.filas / ms_rapida * 1000:>14,.0f}')
+            print(f'Mejora: {ms_drf / ms_rapida:.1f}x')
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    main()
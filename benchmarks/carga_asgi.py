@@ -0,0 +1,161 @@
+"""
+Prueba de carga: gunicorn (WSGI, endpoints síncronos) vs uvicorn (ASGI, /api/async/)
+
+Levanta cada servidor en un puerto local, obtiene un token con el usuario
+indicado y lanza N clientes concurrentes (hilos con http.client) contra la
+misma ruta durante unos segundos. Reporta peticiones por segundo, p50 y p99.
+Con --url-wsgi/--url-asgi se usan servidores ya levantados.
+
+Requiere gunicorn y uvicorn instalados (no forman parte de requirements.txt).
+
+Uso:
+    python benchmarks/carga_asgi.py --usuario admin --password secreto \\
+        --ruta /api/ferreteria/productos/stats/ --concurrencia 50 --segundos 20
+"""
+import argparse
+import http.client
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def levantar(comando, url, espera=20):
+    """Inicia el servidor y espera a que acepte conexiones"""
+    proceso = subprocess.Popen(comando, cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.monotonic() + espera
+    partes = urlsplit(url)
+    while time.monotonic() < limite:
+        try:
+            conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=1)
+            conexion.request('GET', '/api/')
+            conexion.getresponse().read()
+            return proceso
+        except OSError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError(f'El servidor no respondió en {espera}s: {" ".join(comando)}')
+
+
+def obtener_token(url, usuario, password):
+    partes = urlsplit(url)
+    conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=10)
+    cuerpo = json.dumps({'username': usuario, 'password': password})
+    conexion.request('POST', '/api/auth/login/', cuerpo, {'Content-Type': 'application/json'})
+    respuesta = conexion.getresponse()
+    datos = json.loads(respuesta.read())
+    if respuesta.status != 200:
+        raise RuntimeError(f'Login fallido ({respuesta.status}): {datos}')
+    return datos['token']
+
+
+def cargar(url, ruta, token, concurrencia, segundos):
+    """
+    Ejecuta la carga con conexiones keep-alive
+
+    Returns:
+        (peticiones por segundo, latencias en ms, errores)
+    """
+    partes = urlsplit(url)
+    cabeceras = {'Authorization': f'Bearer {token}'}
+    latencias = []
+    errores = [0]
+    bloqueo = threading.Lock()
+    fin = time.monotonic() + segundos
+
+    def cliente():
+        propias = []
+        fallidas = 0
+        conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=30)
+        while time.monotonic() < fin:
+            inicio = time.perf_counter()
+            try:
+                conexion.request('GET', ruta, headers=cabeceras)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                if respuesta.status != 200:
+                    fallidas += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                fallidas += 1
+                conexion.close()
+                conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=30)
+                continue
+            propias.append((time.perf_counter() - inicio) * 1000)
+        conexion.close()
+        with bloqueo:
+            latencias.extend(propias)
+            errores[0] += fallidas
+
+    hilos = [threading.Thread(target=cliente) for _ in range(concurrencia)]
+    inicio = time.monotonic()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return len(latencias) / (time.monotonic() - inicio), latencias, errores[0]
+
+
+def percentil(valores, p):
+    if len(valores) < 2:
+        return valores[0] if valores else 0.0
+    return statistics.quantiles(valores, n=100)[p - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--usuario', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--ruta', default='/api/ferreteria/productos/stats/',
+                        help='Ruta síncrona; la variante ASGI se obtiene anteponiendo /api/async/')
+    parser.add_argument('--concurrencia', type=int, default=50)
+    parser.add_argument('--segundos', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2, help='Workers de cada servidor')
+    parser.add_argument('--hilos-gunicorn', type=int, default=4, help='Hilos por worker de gunicorn (gthread)')
+    parser.add_argument('--url-wsgi', help='Servidor WSGI ya levantado (no se inicia gunicorn)')
+    parser.add_argument('--url-asgi', help='Servidor ASGI ya levantado (no se inicia uvicorn)')
+    args = parser.parse_args()
+
+    if not args.ruta.startswith('/api/') or args.ruta.startswith('/api/async/'):
+        parser.error('--ruta debe ser una ruta síncrona bajo /api/')
+
+    escenarios = [
+        ('gunicorn (WSGI)', args.url_wsgi or 'http://127.0.0.1:8101', args.ruta, [
+            'gunicorn', 'framasa_backend.wsgi:application', '--bind', '127.0.0.1:8101',
+            '--workers', str(args.workers), '--threads', str(args.hilos_gunicorn),
+        ], args.url_wsgi),
+        ('uvicorn (ASGI)', args.url_asgi or 'http://127.0.0.1:8102', args.ruta.replace('/api/', '/api/async/', 1), [
+            'uvicorn', 'framasa_backend.asgi:application', '--host', '127.0.0.1', '--port', '8102',
+            '--workers', str(args.workers), '--log-level', 'warning',
+        ], args.url_asgi),
+    ]
+
+    print(f'{"servidor":<18}{"ruta":<42}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errores":>9}')
+    for nombre, url, ruta, comando, externo in escenarios:
+        proceso = None
+        if not externo:
+            if shutil.which(comando[0]) is None:
+                print(f'{nombre:<18}no disponible: instala {comando[0]}', file=sys.stderr)
+                continue
+            proceso = levantar(comando, url)
+        try:
+            token = obtener_token(url, args.usuario, args.password)
+            cargar(url, ruta, token, min(args.concurrencia, 5), 1)  # calentamiento
+            rps, latencias, errores = cargar(url, ruta, token, args.concurrencia, args.segundos)
+        finally:
+            if proceso is not None:
+                proceso.terminate()
+                proceso.wait()
+        print(f'{nombre:<18}{ruta:<42}{rps:>10,.1f}'
+              f'{percentil(latencias, 50):>10.1f}{percentil(latencias, 99):>10.1f}{errores:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Utilidades compartidas por los benchmarks
+
+Los benchmarks se ejecutan desde la raíz del backend, por ejemplo:
+    python benchmarks/bench_busqueda.py --filas 100000
+Usan la base de datos configurada en .env y deshacen los datos generados.
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+def configurar_django():
+    """Inicializa Django con la configuración del proyecto"""
+    raiz = Path(__file__).resolve().parent.parent
+    if str(raiz) not in sys.path:
+        sys.path.insert(0, str(raiz))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'framasa_backend.settings')
+    import django
+    django.setup()
+
+
+def medir(funcion, repeticiones=5, calentamiento=1):
+    """
+    Ejecuta la función varias veces y devuelve la mediana en milisegundos
+    """
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+class Rollback(Exception):
+    """Se lanza al final de un benchmark para deshacer los datos generados"""
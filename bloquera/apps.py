@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BloqueraConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bloquera'
+
+    def ready(self):
+        # Invalidar la caché de estadísticas cuando cambian los datos
+        from .estadisticas import productos_bloquera_stats
+        productos_bloquera_stats.conectar_senales()
@@ -0,0 +1,14 @@
+from django.db.models import Count, Q, Sum
+from framasa_backend.stats import MotorEstadisticas
+from .models import ProductoBloquera
+
+
+productos_bloquera_stats = MotorEstadisticas(ProductoBloquera, {
+    'total_productos': Count('id'),
+    'productos_activos': Count('id', filter=Q(activo=True)),
+    'productos_inactivos': Count('id', filter=Q(activo=False)),
+    # Productos con stock bajo (columna generada stock_actual <= stock_minimo)
+    'productos_stock_bajo': Count('id', filter=Q(stock_bajo=True)),
+    # Stock total en unidades
+    'stock_total_unidades': Sum('stock_actual'),
+})
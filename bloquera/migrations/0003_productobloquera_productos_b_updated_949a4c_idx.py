@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloquera', '0002_indices_trigram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productobloquera',
+            index=models.Index(fields=['updated_at'], name='productos_b_updated_949a4c_idx'),
+        ),
+    ]
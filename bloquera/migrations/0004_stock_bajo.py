@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloquera', '0003_productobloquera_productos_b_updated_949a4c_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productobloquera',
+            name='stock_bajo',
+            field=models.GeneratedField(db_persist=True, expression=models.ExpressionWrapper(models.Q(('stock_actual__lte', models.F('stock_minimo'))), output_field=models.BooleanField()), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='productobloquera',
+            index=models.Index(condition=models.Q(('activo', True), ('stock_bajo', True)), fields=['codigo'], name='idx_bloquera_stock_bajo'),
+        ),
+    ]
@@ -19,7 +19,16 @@ class ProductoBloquera(models.Model):
     
     stock_actual = models.IntegerField(default=0)
     stock_minimo = models.IntegerField(default=0)
-    
+    # Columna generada (STORED): la base de datos la recalcula en cada cambio de stock,
+    # también en update() con F() y bulk_create(), y sirve al índice parcial de alertas
+    stock_bajo = models.GeneratedField(
+        expression=models.ExpressionWrapper(
+            models.Q(stock_actual__lte=models.F('stock_minimo')), output_field=models.BooleanField()
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
+
     activo = models.BooleanField(default=True)
     
     created_at = models.DateTimeField(auto_now_add=True, db_column='created_at')
@@ -35,6 +44,12 @@ class ProductoBloquera(models.Model):
             models.Index(fields=['nombre']),
             models.Index(fields=['tipo_bloque']),
             models.Index(fields=['activo']),
+            models.Index(fields=['updated_at']),
+            # Índice parcial: solo contiene los productos activos con stock bajo
+            models.Index(
+                fields=['codigo'], name='idx_bloquera_stock_bajo',
+                condition=models.Q(stock_bajo=True, activo=True),
+            ),
         ]
 
     def __str__(self):
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from framasa_backend.serializers import SerializacionRapidaMixin
 from .models import ProductoBloquera
 
 
@@ -51,10 +52,15 @@ class ProductoBloqueraSerializer(serializers.ModelSerializer):
         }
 
 
-class ProductoBloqueraListSerializer(serializers.ModelSerializer):
+class ProductoBloqueraListSerializer(SerializacionRapidaMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar productos de bloquera
     """
+    campos_valores = (
+        'id', 'codigo', 'nombre', 'tipo_bloque', 'dimensiones',
+        'precio_unitario', 'stock_actual', 'activo'
+    )
+
     class Meta:
         model = ProductoBloquera
         fields = (
@@ -75,6 +81,20 @@ class ProductoBloqueraListSerializer(serializers.ModelSerializer):
             'activo': data.get('activo', False),
         }
 
+    @staticmethod
+    def fila_a_dict(fila):
+        id, codigo, nombre, tipo_bloque, dimensiones, precio_unitario, stock_actual, activo = fila
+        return {
+            'id': str(id),
+            'codigo': codigo,
+            'nombre': nombre,
+            'tipoBloque': tipo_bloque,
+            'dimensiones': dimensiones,
+            'precioVentaUnitario': float(precio_unitario),
+            'stockActual': stock_actual,
+            'activo': activo,
+        }
+
 
 class ProductosBloqueraStatsSerializer(serializers.Serializer):
     """
@@ -1,3 +1,62 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from authentication.models import Usuario
+from .models import ProductoBloquera
+
+
+@override_settings(SYNC_MARGEN_SEGUNDOS=0)
+class SincronizacionTests(TestCase):
+    """GET /api/bloquera/productos/sync/ (SincronizacionMixin)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user('admin', password='x', rol='admin')
+        for codigo in ('B1', 'B2', 'B3'):
+            ProductoBloquera.objects.create(codigo=codigo, nombre=f'Block {codigo}', tipo_bloque='pómez')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def sync(self, parametros=''):
+        response = self.client.get(f'/api/bloquera/productos/sync/?estado=activo{parametros}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_sin_marca_devuelve_el_listado_completo(self):
+        datos = self.sync()
+
+        self.assertTrue(datos['completo'])
+        self.assertEqual([producto['codigo'] for producto in datos['cambios']], ['B1', 'B2', 'B3'])
+        self.assertEqual(datos['eliminados'], [])
+
+    def test_cambios_y_eliminados_desde_la_marca(self):
+        watermark = self.sync()['watermark']
+        modificado = ProductoBloquera.objects.get(codigo='B1')
+        modificado.precio_unitario = '5.00'
+        modificado.save()
+        desactivado = ProductoBloquera.objects.get(codigo='B2')
+        self.assertEqual(self.client.delete(f'/api/bloquera/productos/{desactivado.pk}/').status_code, 204)
+
+        datos = self.sync(f'&updated_since={watermark}')
+
+        self.assertFalse(datos['completo'])
+        self.assertEqual(
+            [(producto['codigo'], producto['precioVentaUnitario']) for producto in datos['cambios']], [('B1', 5.0)]
+        )
+        # El soft delete deja al producto fuera del listado activo: se informa como eliminado
+        self.assertEqual(datos['eliminados'], [str(desactivado.pk)])
+        self.assertGreater(datos['watermark'], watermark)
+
+    def test_sin_cambios_desde_la_ultima_marca(self):
+        watermark = self.sync()['watermark']
+
+        datos = self.sync(f'&updated_since={watermark}')
+
+        self.assertEqual((datos['cambios'], datos['eliminados']), ([], []))
+
+    def test_marca_invalida_devuelve_400(self):
+        response = self.client.get('/api/bloquera/productos/sync/?updated_since=ayer')
+
+        self.assertEqual(response.status_code, 400)
@@ -1,9 +1,12 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, F, Sum
+from framasa_backend.mixins import (
+    ExportacionMixin, ListaRapidaMixin, SincronizacionMixin, ValidacionCondicionalMixin
+)
+from framasa_backend.search import aplicar_busqueda, ordenar_por_relevancia
 from .models import ProductoBloquera
+from .estadisticas import productos_bloquera_stats
 from .serializers import (
     ProductoBloqueraSerializer,
     ProductoBloqueraListSerializer,
@@ -11,17 +14,30 @@ from .serializers import (
 )
 
 
-class ProductoBloqueraViewSet(viewsets.ModelViewSet):
+class ProductoBloqueraViewSet(ValidacionCondicionalMixin, SincronizacionMixin, ExportacionMixin,
+                              ListaRapidaMixin, viewsets.ModelViewSet):
     """
     ViewSet para productos de bloquera con filtros y estadísticas
     Permite GET (listar), POST (crear), GET/{id} (detalle), PUT/{id} (actualizar), DELETE/{id} (desactivar)
     """
     queryset = ProductoBloquera.objects.all()
-    permission_classes = [IsAuthenticated]
     pagination_class = None  # Deshabilitar paginación, el frontend la maneja
+    campos_busqueda = ('codigo', 'nombre', 'tipo_bloque', 'dimensiones')
+    nombre_exportacion = 'productos_bloquera'
+    columnas_exportacion = (
+        ('codigo', 'Código'),
+        ('nombre', 'Nombre'),
+        ('tipo_bloque', 'Tipo de bloque'),
+        ('dimensiones', 'Dimensiones'),
+        ('precio_unitario', 'Precio unitario'),
+        ('costo_produccion', 'Costo producción'),
+        ('stock_actual', 'Stock actual'),
+        ('stock_minimo', 'Stock mínimo'),
+        ('activo', 'Activo'),
+    )
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ('list', 'sync'):
             return ProductoBloqueraListSerializer
         return ProductoBloqueraSerializer
 
@@ -37,12 +53,7 @@ class ProductoBloqueraViewSet(viewsets.ModelViewSet):
         # Búsqueda por texto
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(codigo__icontains=search) |
-                Q(nombre__icontains=search) |
-                Q(tipo_bloque__icontains=search) |
-                Q(dimensiones__icontains=search)
-            )
+            queryset = aplicar_busqueda(queryset, search, self.campos_busqueda)
 
         # Filtro por estado
         estado = self.request.query_params.get('estado', 'todos')
@@ -54,11 +65,11 @@ class ProductoBloqueraViewSet(viewsets.ModelViewSet):
         # Filtro por stock mínimo
         stock_minimo = self.request.query_params.get('stockMinimo', 'todos')
         if stock_minimo == 'bajo':
-            queryset = queryset.filter(stock_actual__lte=F('stock_minimo'))
+            queryset = queryset.filter(stock_bajo=True)
         elif stock_minimo == 'suficiente':
-            queryset = queryset.filter(stock_actual__gt=F('stock_minimo'))
+            queryset = queryset.filter(stock_bajo=False)
 
-        return queryset.order_by('codigo')
+        return ordenar_por_relevancia(queryset, 'codigo')
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -75,30 +86,8 @@ class ProductoBloqueraViewSet(viewsets.ModelViewSet):
         Endpoint para obtener estadísticas de productos de bloquera
         Calcula estadísticas sobre TODOS los productos, sin filtros
         """
-        # Usar el queryset base sin filtros para las estadísticas
-        base_queryset = ProductoBloquera.objects.all()
-
-        total_productos = base_queryset.count()
-        productos_activos = base_queryset.filter(activo=True).count()
-        productos_inactivos = base_queryset.filter(activo=False).count()
-        
-        # Productos con stock bajo (stock_actual <= stock_minimo)
-        productos_stock_bajo = base_queryset.filter(
-            stock_actual__lte=F('stock_minimo')
-        ).count()
-        
-        # Stock total en unidades
-        stock_total_unidades = base_queryset.aggregate(
-            total=Sum('stock_actual')
-        )['total'] or 0
-
-        stats = {
-            'total_productos': total_productos,
-            'productos_activos': productos_activos,
-            'productos_inactivos': productos_inactivos,
-            'productos_stock_bajo': productos_stock_bajo,
-            'stock_total_unidades': stock_total_unidades,
-        }
+        # Una sola consulta agregada, cacheada por unos segundos
+        stats = productos_bloquera_stats.obtener()
 
         serializer = ProductosBloqueraStatsSerializer(stats)
         return Response(serializer.data)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Producto, CategoriaProducto, UnidadMedida, Cliente
+from .models import Producto, CategoriaProducto, UnidadMedida, Cliente, MovimientoInventario
 
 
 @admin.register(Producto)
@@ -31,3 +31,12 @@ class ClienteAdmin(admin.ModelAdmin):
     search_fields = ('nombre', 'nit', 'telefono', 'email')
     ordering = ('nombre',)
     readonly_fields = ('fecha_registro', 'created_at', 'updated_at')
+
+
+@admin.register(MovimientoInventario)
+class MovimientoInventarioAdmin(admin.ModelAdmin):
+    list_display = ('producto', 'tipo', 'cantidad', 'referencia', 'usuario', 'created_at')
+    list_filter = ('tipo', 'created_at')
+    search_fields = ('producto__codigo', 'producto__nombre', 'referencia')
+    raw_id_fields = ('producto', 'usuario')
+    readonly_fields = ('created_at',)
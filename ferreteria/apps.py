@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class FerreteriaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ferreteria'
+
+    def ready(self):
+        # Invalidar la caché de estadísticas cuando cambian los datos
+        from .estadisticas import productos_stats
+        productos_stats.conectar_senales()
@@ -0,0 +1,12 @@
+from django.db.models import Count, Q
+from framasa_backend.stats import MotorEstadisticas
+from .models import Producto
+
+
+productos_stats = MotorEstadisticas(Producto, {
+    'total_productos': Count('id'),
+    'productos_activos': Count('id', filter=Q(activo=True)),
+    'productos_inactivos': Count('id', filter=Q(activo=False)),
+    # Productos con stock bajo (columna generada stock_actual <= stock_minimo)
+    'productos_stock_bajo': Count('id', filter=Q(stock_bajo=True)),
+})
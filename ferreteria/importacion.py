@@ -0,0 +1,370 @@
+"""
+Importación masiva de productos de ferretería desde CSV o XLSX
+
+El archivo se lee fila por fila (sin cargarlo completo en memoria), las
+categorías y unidades de medida se resuelven por nombre con diccionarios en
+memoria y los productos se insertan/actualizan por código en lotes con
+bulk_create(update_conflicts=True). Las filas con errores se reportan sin
+detener la importación. Los cambios de existencias se registran en el kardex
+(entrada inicial o ajuste) para que coincida con stock_actual.
+"""
+import csv
+import io
+import unicodedata
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from productos import alertas, precios
+
+from .estadisticas import productos_stats
+from .models import Producto, CategoriaProducto, UnidadMedida, MovimientoInventario
+
+COLUMNAS_REQUERIDAS = ('codigo', 'nombre', 'categoria', 'unidad_medida')
+COLUMNAS_ACTUALIZABLES = (
+    'nombre', 'descripcion', 'categoria', 'unidad_medida',
+    'precio_venta', 'costo_unitario', 'stock_actual', 'stock_minimo', 'activo',
+)
+# Nombres alternativos aceptados en el encabezado
+ALIAS_COLUMNAS = {
+    'categoria_producto': 'categoria',
+    'unidad': 'unidad_medida',
+    'unidad_de_medida': 'unidad_medida',
+    'precio': 'precio_venta',
+    'costo': 'costo_unitario',
+    'stock': 'stock_actual',
+}
+VALORES_VERDADEROS = {'1', 'si', 'true', 'verdadero', 'x', 'activo'}
+
+
+class ErrorFila(ValueError):
+    """Error de validación de una fila del archivo"""
+
+
+def normalizar_encabezado(valor):
+    texto = unicodedata.normalize('NFKD', str(valor or '')).encode('ascii', 'ignore').decode()
+    texto = texto.strip().lower().replace(' ', '_')
+    return ALIAS_COLUMNAS.get(texto, texto)
+
+
+def normalizar_nombre(valor):
+    return str(valor).strip().lower()
+
+
+def leer_csv(archivo):
+    """Itera las filas de un CSV (UTF-8, separado por coma, punto y coma o tabulador)"""
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.reader(texto, dialecto)
+    try:
+        yield from lector
+    except csv.Error as e:
+        raise ErrorFila(f'CSV mal formado en la línea {lector.line_num}: {e}')
+    finally:
+        # No cerrar el archivo subyacente al liberar el wrapper
+        texto.detach()
+
+
+def leer_xlsx(archivo):
+    """Itera las filas de la primera hoja de un XLSX en modo de solo lectura"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ErrorFila('Para importar archivos XLSX se requiere instalar openpyxl')
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        yield from libro.worksheets[0].iter_rows(values_only=True)
+    finally:
+        libro.close()
+
+
+def leer_filas(archivo, nombre_archivo):
+    """Elige el lector según la extensión del archivo"""
+    if nombre_archivo.lower().endswith(('.xlsx', '.xlsm')):
+        return leer_xlsx(archivo)
+    return leer_csv(archivo)
+
+
+def _parsear_numero(valor, columna):
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, (int, float, Decimal)):
+        numero = Decimal(str(valor))
+    else:
+        texto = str(valor).strip().replace('Q', '').replace(' ', '')
+        # "1,234.50" -> 1234.50 ; "12,50" -> 12.50
+        texto = texto.replace(',', '') if '.' in texto else texto.replace(',', '.')
+        try:
+            numero = Decimal(texto)
+        except InvalidOperation:
+            raise ErrorFila(f'{columna}: "{valor}" no es un número válido')
+    if not numero.is_finite():
+        raise ErrorFila(f'{columna}: "{valor}" no es un número válido')
+    if numero < 0:
+        raise ErrorFila(f'{columna}: no puede ser negativo')
+    return numero
+
+
+def convertir_decimal(valor, columna):
+    numero = _parsear_numero(valor, columna)
+    return None if numero is None else numero.quantize(Decimal('0.01'))
+
+
+def convertir_entero(valor, columna):
+    numero = _parsear_numero(valor, columna)
+    if numero is None:
+        return None
+    if numero != numero.to_integral_value():
+        raise ErrorFila(f'{columna}: "{valor}" debe ser un número entero')
+    return int(numero)
+
+
+class ResultadoImportacion:
+    """Resumen de una importación"""
+
+    def __init__(self):
+        self.creados = 0
+        self.actualizados = 0
+        self.errores = []
+
+    def agregar_error(self, fila, mensaje):
+        self.errores.append({'fila': fila, 'error': mensaje})
+
+    def as_dict(self, max_errores=1000):
+        return {
+            'procesados': self.creados + self.actualizados,
+            'creados': self.creados,
+            'actualizados': self.actualizados,
+            'total_errores': len(self.errores),
+            'errores': self.errores[:max_errores],
+        }
+
+
+class ImportadorProductos:
+    """
+    Importa productos desde un iterable de filas (la primera es el encabezado)
+
+    Columnas: codigo, nombre, categoria, unidad_medida (requeridas) y
+    descripcion, precio_venta, costo_unitario, stock_actual, stock_minimo,
+    activo (opcionales). En los productos existentes solo se actualizan las
+    columnas presentes en el archivo; las celdas vacías conservan el valor actual.
+    """
+
+    def __init__(self, tamano_lote=1000, usuario_id=None):
+        self.tamano_lote = tamano_lote
+        # Usuario al que se atribuyen los movimientos de kardex de la importación
+        self.usuario_id = usuario_id
+        self.categorias = {
+            normalizar_nombre(nombre): pk
+            for pk, nombre in CategoriaProducto.objects.values_list('id', 'nombre')
+        }
+        self.unidades = {}
+        for pk, nombre, abreviatura in UnidadMedida.objects.values_list('id', 'nombre', 'abreviatura'):
+            self.unidades[normalizar_nombre(abreviatura)] = pk
+            self.unidades[normalizar_nombre(nombre)] = pk
+
+    def importar(self, filas):
+        resultado = ResultadoImportacion()
+        filas = iter(filas)
+        try:
+            encabezado = [normalizar_encabezado(valor) for valor in next(filas)]
+        except StopIteration:
+            resultado.agregar_error(1, 'El archivo está vacío')
+            return resultado
+        except ErrorFila as e:
+            resultado.agregar_error(1, str(e))
+            return resultado
+
+        faltantes = [columna for columna in COLUMNAS_REQUERIDAS if columna not in encabezado]
+        if faltantes:
+            resultado.agregar_error(1, f'Faltan columnas requeridas: {", ".join(faltantes)}')
+            return resultado
+
+        self.columnas = encabezado
+        self.campos_actualizar = [
+            f'{columna}_id' if columna in ('categoria', 'unidad_medida') else columna
+            for columna in COLUMNAS_ACTUALIZABLES if columna in encabezado
+        ] + ['updated_at']
+
+        lote = {}
+        numero_fila = 1
+        try:
+            for numero_fila, valores in enumerate(filas, start=2):
+                if not any(valor not in (None, '') for valor in valores):
+                    continue
+                try:
+                    producto = self.construir_producto(valores)
+                except ErrorFila as e:
+                    resultado.agregar_error(numero_fila, str(e))
+                    continue
+                # Si un código se repite en el lote, prevalece la última fila
+                lote[producto.codigo] = (numero_fila, producto)
+                if len(lote) >= self.tamano_lote:
+                    self.guardar_lote(lote, resultado)
+                    lote = {}
+        except ErrorFila as e:
+            # Archivo mal formado: se reporta la fila y se guardan las leídas hasta ahí
+            resultado.agregar_error(numero_fila + 1, str(e))
+        if lote:
+            self.guardar_lote(lote, resultado)
+
+        # bulk_create no dispara post_save
+        productos_stats.invalidar()
+        alertas.invalidar()
+        return resultado
+
+    def construir_producto(self, valores):
+        datos = dict(zip(self.columnas, valores))
+
+        codigo = str(datos.get('codigo') or '').strip()
+        nombre = str(datos.get('nombre') or '').strip()
+        if not codigo:
+            raise ErrorFila('codigo: es requerido')
+        if len(codigo) > 30:
+            raise ErrorFila('codigo: máximo 30 caracteres')
+        if not nombre:
+            raise ErrorFila('nombre: es requerido')
+        if len(nombre) > 150:
+            raise ErrorFila('nombre: máximo 150 caracteres')
+
+        categoria = datos.get('categoria')
+        categoria_id = self.categorias.get(normalizar_nombre(categoria or ''))
+        if categoria_id is None:
+            raise ErrorFila(f'categoria: no existe la categoría "{categoria}"')
+        unidad = datos.get('unidad_medida')
+        unidad_medida_id = self.unidades.get(normalizar_nombre(unidad or ''))
+        if unidad_medida_id is None:
+            raise ErrorFila(f'unidad_medida: no existe la unidad "{unidad}"')
+
+        producto = Producto(
+            codigo=codigo,
+            nombre=nombre,
+            categoria_id=categoria_id,
+            unidad_medida_id=unidad_medida_id,
+        )
+        # Columnas presentes pero vacías: en productos existentes se conserva el valor actual
+        producto._vacios = []
+        if 'descripcion' in datos:
+            if datos['descripcion'] in (None, ''):
+                producto._vacios.append('descripcion')
+            else:
+                producto.descripcion = str(datos['descripcion']).strip()
+        for columna, convertir in (
+            ('precio_venta', convertir_decimal),
+            ('costo_unitario', convertir_decimal),
+            ('stock_actual', convertir_entero),
+            ('stock_minimo', convertir_entero),
+        ):
+            if columna not in datos:
+                continue
+            valor = convertir(datos[columna], columna)
+            if valor is None:
+                producto._vacios.append(columna)
+            else:
+                setattr(producto, columna, valor)
+        if 'activo' in datos:
+            if datos['activo'] in (None, ''):
+                producto._vacios.append('activo')
+            else:
+                producto.activo = normalizar_nombre(datos['activo']) in VALORES_VERDADEROS
+        return producto
+
+    def guardar_lote(self, lote, resultado):
+        """
+        Inserta/actualiza un lote; si la base de datos lo rechaza se reintenta
+        fila por fila para identificar las filas con error
+        """
+        columnas_vacias = {columna for _, producto in lote.values() for columna in producto._vacios}
+        existentes = {
+            fila['codigo']: fila
+            for fila in Producto.objects.filter(codigo__in=lote.keys()).values('codigo', *columnas_vacias)
+        }
+        for codigo, (_, producto) in lote.items():
+            if codigo in existentes:
+                for columna in producto._vacios:
+                    setattr(producto, columna, existentes[codigo][columna])
+
+        try:
+            with transaction.atomic():
+                self.upsert([producto for _, producto in lote.values()])
+        except DatabaseError:
+            guardados = set()
+            for codigo, (numero_fila, producto) in lote.items():
+                try:
+                    with transaction.atomic():
+                        self.upsert([producto])
+                    guardados.add(codigo)
+                except DatabaseError as e:
+                    resultado.agregar_error(numero_fila, str(e).strip())
+        else:
+            guardados = set(lote)
+
+        actualizados = len(guardados & existentes.keys())
+        resultado.actualizados += actualizados
+        resultado.creados += len(guardados) - actualizados
+
+    def upsert(self, productos):
+        """
+        Inserta/actualiza los productos (dentro de la transacción del lote) y
+        registra en el kardex y en el historial de precios lo que cambió
+
+        bulk_create no dispara señales ni pasa por aplicar_movimientos: las
+        existencias previas se leen con bloqueo (select_for_update) para que
+        la diferencia registrada como movimiento coincida con el stock final.
+        """
+        ahora = timezone.now()
+        for producto in productos:
+            producto.updated_at = ahora
+        codigos = [producto.codigo for producto in productos]
+        anteriores = {
+            codigo: (precio, stock)
+            for codigo, precio, stock in Producto.objects.select_for_update().filter(codigo__in=codigos)
+            .order_by('codigo').values_list('codigo', 'precio_venta', 'stock_actual')
+        }
+        Producto.objects.bulk_create(
+            productos,
+            update_conflicts=True,
+            unique_fields=['codigo'],
+            update_fields=self.campos_actualizar,
+        )
+        ids = dict(Producto.objects.filter(codigo__in=codigos).values_list('codigo', 'id'))
+
+        cambios_precio = []
+        movimientos = []
+        for producto in productos:
+            producto_id = ids[producto.codigo]
+            if producto.codigo not in anteriores:
+                cambios_precio.append((producto_id, producto.precio_venta))
+                if producto.stock_actual:
+                    movimientos.append(MovimientoInventario(
+                        producto_id=producto_id,
+                        tipo=MovimientoInventario.TIPO_ENTRADA,
+                        cantidad=producto.stock_actual,
+                        referencia='importacion',
+                        observaciones='Existencia inicial por importación de productos',
+                        usuario_id=self.usuario_id,
+                    ))
+                continue
+            precio_anterior, stock_anterior = anteriores[producto.codigo]
+            if 'precio_venta' in self.campos_actualizar and precio_anterior != producto.precio_venta:
+                cambios_precio.append((producto_id, producto.precio_venta))
+            if 'stock_actual' in self.campos_actualizar and stock_anterior != producto.stock_actual:
+                movimientos.append(MovimientoInventario(
+                    producto_id=producto_id,
+                    tipo=MovimientoInventario.TIPO_AJUSTE,
+                    cantidad=producto.stock_actual - stock_anterior,
+                    referencia='importacion',
+                    observaciones='Ajuste de existencias por importación de productos',
+                    usuario_id=self.usuario_id,
+                ))
+
+        if cambios_precio:
+            precios.registrar('ferreteria', cambios_precio, momento=ahora)
+        if movimientos:
+            MovimientoInventario.objects.bulk_create(movimientos)
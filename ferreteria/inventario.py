@@ -0,0 +1,90 @@
+"""
+Aplicación de movimientos de inventario de ferretería
+
+El stock se actualiza con UPDATE ... SET stock_actual = stock_actual + delta
+(F expressions) dentro de una transacción, de modo que dos ventas simultáneas
+del mismo producto nunca pisan el valor de la otra.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+
+from productos import alertas
+
+from .estadisticas import productos_stats
+from .models import Producto, MovimientoInventario
+
+
+def delta_movimiento(tipo, cantidad):
+    """Cantidad con signo que aplica un movimiento sobre el stock"""
+    if tipo == MovimientoInventario.TIPO_SALIDA:
+        return -abs(cantidad)
+    if tipo == MovimientoInventario.TIPO_ENTRADA:
+        return abs(cantidad)
+    return cantidad
+
+
+def aplicar_movimientos(lineas, usuario_id=None):
+    """
+    Registra un lote de movimientos y actualiza el stock de forma atómica
+
+    Args:
+        lineas: lista de dicts con producto_id, tipo, cantidad y opcionalmente
+            referencia y observaciones (ya validados)
+        usuario_id: usuario que registra los movimientos
+
+    Returns:
+        (movimientos creados, dict {producto_id: stock resultante})
+
+    Raises:
+        serializers.ValidationError si un producto no existe o el stock
+        quedaría negativo; en ese caso no se aplica ninguna línea del lote.
+    """
+    deltas = defaultdict(int)
+    movimientos = []
+    for linea in lineas:
+        cantidad = delta_movimiento(linea['tipo'], linea['cantidad'])
+        deltas[linea['producto_id']] += cantidad
+        movimientos.append(MovimientoInventario(
+            producto_id=linea['producto_id'],
+            tipo=linea['tipo'],
+            cantidad=cantidad,
+            referencia=linea.get('referencia'),
+            observaciones=linea.get('observaciones'),
+            usuario_id=usuario_id,
+        ))
+
+    with transaction.atomic():
+        existentes = set(Producto.objects.filter(pk__in=deltas).values_list('pk', flat=True))
+        faltantes = sorted(set(deltas) - existentes)
+        if faltantes:
+            raise serializers.ValidationError({
+                'producto_id': [f'No existen los productos: {", ".join(map(str, faltantes))}']
+            })
+
+        # update() no toca auto_now, se actualiza updated_at explícitamente para sync/ETag.
+        # Se recorren los productos en orden para evitar deadlocks entre lotes concurrentes
+        ahora = timezone.now()
+        for producto_id in sorted(deltas):
+            delta = deltas[producto_id]
+            if delta == 0:
+                continue
+            queryset = Producto.objects.filter(pk=producto_id)
+            if delta < 0:
+                queryset = queryset.filter(stock_actual__gte=-delta)
+            actualizados = queryset.update(stock_actual=F('stock_actual') + delta, updated_at=ahora)
+            if not actualizados:
+                raise serializers.ValidationError({
+                    'cantidad': [f'Stock insuficiente para el producto {producto_id}']
+                })
+
+        MovimientoInventario.objects.bulk_create(movimientos)
+        stock = dict(Producto.objects.filter(pk__in=deltas).values_list('pk', 'stock_actual'))
+
+    # update() no dispara post_save
+    productos_stats.invalidar()
+    alertas.invalidar()
+    return movimientos, stock
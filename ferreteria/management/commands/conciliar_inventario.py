@@ -0,0 +1,72 @@
+"""
+Comando de Django para conciliar el stock de ferretería contra el kardex
+Uso: python manage.py conciliar_inventario [--registrar-ajustes]
+
+Pensado para ejecutarse periódicamente (cron). Compara stock_actual de cada
+producto con la suma de sus movimientos en una sola consulta agregada.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from ferreteria.models import Producto, MovimientoInventario
+
+
+class Command(BaseCommand):
+    help = 'Concilia stock_actual de los productos de ferretería contra la suma del kardex'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--registrar-ajustes',
+            action='store_true',
+            help='Registrar un ajuste por la diferencia para que el kardex coincida con el stock '
+                 '(útil para cargar saldos iniciales)',
+        )
+        parser.add_argument(
+            '--limite',
+            type=int,
+            default=50,
+            help='Cantidad máxima de diferencias a mostrar (por defecto 50)',
+        )
+
+    def handle(self, *args, **options):
+        diferencias = (
+            Producto.objects
+            .annotate(saldo_kardex=Coalesce(Sum('movimientos__cantidad'), Value(0)))
+            .exclude(stock_actual=F('saldo_kardex'))
+            .values_list('id', 'codigo', 'stock_actual', 'saldo_kardex')
+            .order_by('codigo')
+        )
+        diferencias = list(diferencias)
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('✓ El stock coincide con el kardex en todos los productos'))
+            return
+
+        self.stdout.write(
+            self.style.WARNING(f'{len(diferencias)} productos con diferencias entre stock y kardex:')
+        )
+        for producto_id, codigo, stock_actual, saldo in diferencias[:options['limite']]:
+            self.stdout.write(
+                f'  {codigo}: stock={stock_actual} kardex={saldo} diferencia={stock_actual - saldo}'
+            )
+        if len(diferencias) > options['limite']:
+            self.stdout.write(f'  ... y {len(diferencias) - options["limite"]} más')
+
+        if options['registrar_ajustes']:
+            with transaction.atomic():
+                MovimientoInventario.objects.bulk_create(
+                    [
+                        MovimientoInventario(
+                            producto_id=producto_id,
+                            tipo=MovimientoInventario.TIPO_AJUSTE,
+                            cantidad=stock_actual - saldo,
+                            referencia='conciliacion',
+                            observaciones='Ajuste automático por conciliación de inventario',
+                        )
+                        for producto_id, codigo, stock_actual, saldo in diferencias
+                    ],
+                    batch_size=1000,
+                )
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(diferencias)} ajustes registrados en el kardex'))
@@ -0,0 +1,47 @@
+"""
+Comando de Django para importar productos de ferretería desde CSV o XLSX
+Uso: python manage.py importar_productos archivo.csv [--lote 1000]
+
+Las categorías y unidades de medida se indican por nombre (la unidad también
+por abreviatura). Los productos se insertan o actualizan por código.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ferreteria.importacion import ImportadorProductos, ErrorFila, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Importa productos de ferretería desde un archivo CSV o XLSX (upsert por código)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo CSV o XLSX')
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Cantidad de filas por lote (por defecto 1000)',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                importador = ImportadorProductos(tamano_lote=options['lote'])
+                resultado = importador.importar(leer_filas(archivo, options['archivo']))
+        except FileNotFoundError:
+            raise CommandError(f'No existe el archivo {options["archivo"]}')
+        except (ErrorFila, UnicodeDecodeError) as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+        duracion = time.perf_counter() - inicio
+
+        for error in resultado.errores[:50]:
+            self.stdout.write(self.style.WARNING(f'  Fila {error["fila"]}: {error["error"]}'))
+        if len(resultado.errores) > 50:
+            self.stdout.write(f'  ... y {len(resultado.errores) - 50} errores más')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {resultado.creados} creados, {resultado.actualizados} actualizados, '
+            f'{len(resultado.errores)} errores en {duracion:.1f}s'
+        ))
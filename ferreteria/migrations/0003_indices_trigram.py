@@ -0,0 +1,20 @@
+"""
+Índices GIN pg_trgm para la búsqueda por texto (?search=)
+Solo se crean en PostgreSQL; en otros motores la migración no hace nada
+"""
+from django.db import migrations
+
+from framasa_backend.migraciones import CrearIndicesTrigram
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ferreteria', '0002_cliente'),
+    ]
+
+    operations = [
+        CrearIndicesTrigram('productos', ['codigo', 'nombre']),
+        CrearIndicesTrigram('categorias_producto', ['nombre']),
+        CrearIndicesTrigram('clientes', ['nombre', 'nit', 'telefono', 'email']),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ferreteria', '0003_indices_trigram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['updated_at'], name='clientes_updated_6da118_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['updated_at'], name='productos_updated_238212_idx'),
+        ),
+    ]
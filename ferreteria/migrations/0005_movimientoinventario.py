@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ferreteria', '0004_cliente_clientes_updated_6da118_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('entrada', 'Entrada'), ('salida', 'Salida'), ('ajuste', 'Ajuste')], max_length=10)),
+                ('cantidad', models.IntegerField()),
+                ('referencia', models.CharField(blank=True, max_length=100, null=True)),
+                ('observaciones', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='created_at')),
+                ('producto', models.ForeignKey(db_column='producto_id', on_delete=django.db.models.deletion.PROTECT, related_name='movimientos', to='ferreteria.producto')),
+                ('usuario', models.ForeignKey(blank=True, db_column='usuario_id', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos_inventario', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Inventario',
+                'verbose_name_plural': 'Movimientos de Inventario',
+                'db_table': 'movimientos_inventario',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['producto', 'created_at'], name='movimientos_product_70c5a9_idx'), models.Index(fields=['tipo'], name='movimientos_tipo_af40b1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ferreteria', '0005_movimientoinventario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='stock_bajo',
+            field=models.GeneratedField(db_persist=True, expression=models.ExpressionWrapper(models.Q(('stock_actual__lte', models.F('stock_minimo'))), output_field=models.BooleanField()), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('activo', True), ('stock_bajo', True)), fields=['codigo'], name='idx_productos_stock_bajo'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ferreteria', '0006_stock_bajo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoriaproducto',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_column='updated_at'),
+        ),
+        migrations.AddField(
+            model_name='unidadmedida',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_column='updated_at'),
+        ),
+    ]
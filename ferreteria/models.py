@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -9,6 +10,8 @@ class CategoriaProducto(models.Model):
     nombre = models.CharField(max_length=100, unique=True)
     descripcion = models.TextField(blank=True, null=True)
     activo = models.BooleanField(default=True)
+    # Forma parte del ETag del listado de productos (nombre de la categoría)
+    updated_at = models.DateTimeField(auto_now=True, db_column='updated_at')
 
     class Meta:
         db_table = 'categorias_producto'
@@ -27,6 +30,8 @@ class UnidadMedida(models.Model):
     nombre = models.CharField(max_length=50, unique=True)
     abreviatura = models.CharField(max_length=10, unique=True)
     activo = models.BooleanField(default=True)
+    # Forma parte del ETag del listado de productos (nombre y abreviatura)
+    updated_at = models.DateTimeField(auto_now=True, db_column='updated_at')
 
     class Meta:
         db_table = 'unidades_medida'
@@ -64,6 +69,15 @@ class Producto(models.Model):
 
     stock_actual = models.IntegerField(default=0)
     stock_minimo = models.IntegerField(default=0)
+    # Columna generada (STORED): la base de datos la recalcula en cada cambio de stock,
+    # también en update() con F() y bulk_create(), y sirve al índice parcial de alertas
+    stock_bajo = models.GeneratedField(
+        expression=models.ExpressionWrapper(
+            models.Q(stock_actual__lte=models.F('stock_minimo')), output_field=models.BooleanField()
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
 
     activo = models.BooleanField(default=True)
 
@@ -79,6 +93,12 @@ class Producto(models.Model):
             models.Index(fields=['codigo']),
             models.Index(fields=['nombre']),
             models.Index(fields=['activo']),
+            models.Index(fields=['updated_at']),
+            # Índice parcial: solo contiene los productos activos con stock bajo
+            models.Index(
+                fields=['codigo'], name='idx_productos_stock_bajo',
+                condition=models.Q(stock_bajo=True, activo=True),
+            ),
         ]
 
     def __str__(self):
@@ -113,7 +133,57 @@ class Cliente(models.Model):
             models.Index(fields=['nombre']),
             models.Index(fields=['nit']),
             models.Index(fields=['activo']),
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return self.nombre
+
+
+class MovimientoInventario(models.Model):
+    """
+    Movimiento de inventario (kardex) de productos de ferretería
+    La cantidad se guarda con signo: positiva suma al stock y negativa lo resta,
+    así el saldo del kardex de un producto es SUM(cantidad)
+    """
+    TIPO_ENTRADA = 'entrada'
+    TIPO_SALIDA = 'salida'
+    TIPO_AJUSTE = 'ajuste'
+    TIPO_CHOICES = [
+        (TIPO_ENTRADA, 'Entrada'),
+        (TIPO_SALIDA, 'Salida'),
+        (TIPO_AJUSTE, 'Ajuste'),
+    ]
+
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.PROTECT,
+        related_name='movimientos',
+        db_column='producto_id'
+    )
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    cantidad = models.IntegerField()
+    referencia = models.CharField(max_length=100, blank=True, null=True)
+    observaciones = models.TextField(blank=True, null=True)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='movimientos_inventario',
+        db_column='usuario_id'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_column='created_at')
+
+    class Meta:
+        db_table = 'movimientos_inventario'
+        verbose_name = 'Movimiento de Inventario'
+        verbose_name_plural = 'Movimientos de Inventario'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['producto', 'created_at']),
+            models.Index(fields=['tipo']),
         ]
 
     def __str__(self):
-        return self.nombre
\ No newline at end of file
+        return f"{self.get_tipo_display()} {self.cantidad} - {self.producto_id}"
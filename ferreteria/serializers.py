@@ -1,5 +1,7 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Producto, CategoriaProducto, UnidadMedida, Cliente
+from framasa_backend.serializers import CamposDinamicosMixin, SerializacionRapidaMixin
+from .models import Producto, CategoriaProducto, UnidadMedida, Cliente, MovimientoInventario
 
 
 class CategoriaProductoSerializer(serializers.ModelSerializer):
@@ -20,9 +22,12 @@ class UnidadMedidaSerializer(serializers.ModelSerializer):
         fields = ('id', 'nombre', 'abreviatura', 'activo')
 
 
-class ProductoSerializer(serializers.ModelSerializer):
+class ProductoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer para productos con información relacionada
+    Admite ?fields= y ?format_style=camel|snake|both (CamposDinamicosMixin)
+    stock_actual solo se captura al crear (queda registrado como entrada en el
+    kardex); después cambia únicamente con movimientos de inventario
     """
     categoria = serializers.StringRelatedField(read_only=True)
     categoria_id = serializers.IntegerField(write_only=True, required=True)
@@ -48,6 +53,43 @@ class ProductoSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         )
         read_only_fields = ('id', 'created_at', 'updated_at')
+        extra_kwargs = {'stock_actual': {'min_value': 0}}
+
+    campos_comunes = ('id', 'codigo', 'nombre', 'descripcion', 'activo')
+    campos_snake = (
+        'categoria_id', 'unidad_medida_id', 'precio_venta', 'costo_unitario', 'stock_actual', 'stock_minimo',
+    )
+    campos_camel = {
+        'categoria': 'categoria_nombre',
+        'precioVenta': 'precio_venta',
+        'costoUnitario': 'costo_unitario',
+        'unidadMedida': 'unidad_medida_nombre',
+        'stockActual': 'stock_actual',
+        'stockMinimo': 'stock_minimo',
+        'fechaCreacion': 'created_at',
+        'ultimaActualizacion': 'updated_at',
+    }
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None and 'stock_actual' in fields:
+            fields['stock_actual'].read_only = True
+        return fields
+
+    def create(self, validated_data):
+        """Crea el producto y registra su stock inicial como entrada en el kardex"""
+        request = self.context.get('request')
+        with transaction.atomic():
+            producto = super().create(validated_data)
+            if producto.stock_actual:
+                MovimientoInventario.objects.create(
+                    producto=producto,
+                    tipo=MovimientoInventario.TIPO_ENTRADA,
+                    cantidad=producto.stock_actual,
+                    referencia='stock inicial',
+                    usuario_id=request.user.pk if request else None,
+                )
+        return producto
 
     def to_representation(self, instance):
         """
@@ -57,14 +99,14 @@ class ProductoSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         # Formatear para que coincida con ProductoFerreteria del frontend
         # Incluir ambos formatos: camelCase para visualización y snake_case con IDs para edición
-        return {
+        return self.proyectar({
             'id': str(data.get('id', '')),
             'codigo': data.get('codigo', ''),
             'nombre': data.get('nombre', ''),
             'descripcion': data.get('descripcion', ''),
             # Campos en snake_case con IDs (necesarios para edición)
-            'categoria_id': instance.categoria_id if hasattr(instance, 'categoria_id') else None,
-            'unidad_medida_id': instance.unidad_medida_id if hasattr(instance, 'unidad_medida_id') else None,
+            'categoria_id': instance.categoria_id if self.incluye('categoria_id') else None,
+            'unidad_medida_id': instance.unidad_medida_id if self.incluye('unidad_medida_id') else None,
             'precio_venta': float(data.get('precio_venta', 0)),
             'costo_unitario': float(data.get('costo_unitario', 0)),
             'stock_actual': data.get('stock_actual', 0),
@@ -79,15 +121,20 @@ class ProductoSerializer(serializers.ModelSerializer):
             'stockMinimo': data.get('stock_minimo', 0),
             'fechaCreacion': data.get('created_at', ''),
             'ultimaActualizacion': data.get('updated_at', ''),
-        }
+        })
 
 
-class ProductoListSerializer(serializers.ModelSerializer):
+class ProductoListSerializer(SerializacionRapidaMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar productos
     """
     categoria = serializers.CharField(source='categoria.nombre', read_only=True)
 
+    campos_valores = (
+        'id', 'codigo', 'nombre', 'categoria__nombre',
+        'precio_venta', 'stock_actual', 'activo'
+    )
+
     class Meta:
         model = Producto
         fields = (
@@ -107,6 +154,19 @@ class ProductoListSerializer(serializers.ModelSerializer):
             'activo': data.get('activo', False),
         }
 
+    @staticmethod
+    def fila_a_dict(fila):
+        id, codigo, nombre, categoria, precio_venta, stock_actual, activo = fila
+        return {
+            'id': str(id),
+            'codigo': codigo,
+            'nombre': nombre,
+            'categoria': categoria,
+            'precioVenta': float(precio_venta),
+            'stockActual': stock_actual,
+            'activo': activo,
+        }
+
 
 class ProductosStatsSerializer(serializers.Serializer):
     """
@@ -153,3 +213,52 @@ class ClienteSerializer(serializers.ModelSerializer):
             'updated_at': data.get('updated_at'),
         }
 
+
+class MovimientoInventarioSerializer(serializers.ModelSerializer):
+    """
+    Serializer para consultar movimientos de inventario
+    """
+    producto_codigo = serializers.CharField(source='producto.codigo', read_only=True)
+
+    class Meta:
+        model = MovimientoInventario
+        fields = (
+            'id', 'producto', 'producto_codigo', 'tipo', 'cantidad',
+            'referencia', 'observaciones', 'usuario', 'created_at'
+        )
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        return {
+            'id': str(data.get('id', '')),
+            'producto_id': data.get('producto'),
+            'productoCodigo': data.get('producto_codigo', ''),
+            'tipo': data.get('tipo', ''),
+            'cantidad': data.get('cantidad', 0),
+            'referencia': data.get('referencia'),
+            'observaciones': data.get('observaciones'),
+            'usuario_id': data.get('usuario'),
+            'fecha': data.get('created_at'),
+        }
+
+
+class LineaMovimientoSerializer(serializers.Serializer):
+    """
+    Serializer para cada línea de un lote de movimientos
+    - entrada / salida: cantidad positiva
+    - ajuste: cantidad con signo (positiva suma, negativa resta)
+    """
+    producto_id = serializers.IntegerField()
+    tipo = serializers.ChoiceField(choices=MovimientoInventario.TIPO_CHOICES)
+    cantidad = serializers.IntegerField()
+    referencia = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    observaciones = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs['tipo'] == MovimientoInventario.TIPO_AJUSTE:
+            if attrs['cantidad'] == 0:
+                raise serializers.ValidationError({'cantidad': 'El ajuste no puede ser 0.'})
+        elif attrs['cantidad'] <= 0:
+            raise serializers.ValidationError({'cantidad': 'La cantidad debe ser mayor a 0.'})
+        return attrs
@@ -1,3 +1,368 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from authentication.models import Usuario
+from framasa_backend.renderers import ORJSONRenderer
+from bloquera.models import ProductoBloquera
+from bloquera.serializers import ProductoBloqueraListSerializer
+from piedrinera.models import AgregadoPiedrinera, Camion
+from piedrinera.serializers import AgregadoPiedrineraListSerializer, CamionListSerializer
+from planillas.models import Empleado
+from planillas.serializers import EmpleadoListSerializer
+from .importacion import ImportadorProductos
+from .inventario import aplicar_movimientos
+from .models import Producto, CategoriaProducto, UnidadMedida, MovimientoInventario
+from .serializers import ProductoListSerializer, ProductoSerializer
+
+
+class DatosFerreteriaMixin:
+    """Categoría, unidad y productos comunes a las pruebas de ferretería"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = CategoriaProducto.objects.create(nombre='Tubería')
+        cls.unidad = UnidadMedida.objects.create(nombre='Unidad', abreviatura='u')
+        cls.tubo = cls.crear_producto('T001', stock_actual=10)
+        cls.codo = cls.crear_producto('C001', stock_actual=2)
+
+    @classmethod
+    def crear_producto(cls, codigo, stock_actual=0, precio_venta='12.50'):
+        return Producto.objects.create(
+            codigo=codigo, nombre=f'Producto {codigo}', categoria=cls.categoria, unidad_medida=cls.unidad,
+            precio_venta=precio_venta, costo_unitario='10.00', stock_actual=stock_actual, stock_minimo=1,
+        )
+
+
+class AplicarMovimientosTests(DatosFerreteriaMixin, TestCase):
+
+    def test_lote_actualiza_stock_y_registra_movimientos(self):
+        movimientos, stock = aplicar_movimientos([
+            {'producto_id': self.tubo.pk, 'tipo': 'salida', 'cantidad': 4},
+            {'producto_id': self.codo.pk, 'tipo': 'entrada', 'cantidad': 3},
+        ])
+
+        self.assertEqual(len(movimientos), 2)
+        self.assertEqual(stock, {self.tubo.pk: 6, self.codo.pk: 5})
+        self.assertEqual(
+            sorted(MovimientoInventario.objects.values_list('producto_id', 'cantidad')),
+            sorted([(self.tubo.pk, -4), (self.codo.pk, 3)]),
+        )
+
+    def test_stock_insuficiente_revierte_todo_el_lote(self):
+        with self.assertRaises(serializers.ValidationError):
+            aplicar_movimientos([
+                {'producto_id': self.tubo.pk, 'tipo': 'salida', 'cantidad': 4},
+                {'producto_id': self.codo.pk, 'tipo': 'salida', 'cantidad': 3},
+            ])
+
+        self.tubo.refresh_from_db()
+        self.codo.refresh_from_db()
+        self.assertEqual((self.tubo.stock_actual, self.codo.stock_actual), (10, 2))
+        self.assertFalse(MovimientoInventario.objects.exists())
+
+    def test_producto_inexistente_revierte_todo_el_lote(self):
+        with self.assertRaises(serializers.ValidationError):
+            aplicar_movimientos([
+                {'producto_id': self.tubo.pk, 'tipo': 'entrada', 'cantidad': 1},
+                {'producto_id': 999999, 'tipo': 'entrada', 'cantidad': 1},
+            ])
+
+        self.tubo.refresh_from_db()
+        self.assertEqual(self.tubo.stock_actual, 10)
+        self.assertFalse(MovimientoInventario.objects.exists())
+
+
+class ImportadorProductosTests(DatosFerreteriaMixin, TestCase):
+    encabezado = ['Código', 'Nombre', 'Categoría', 'Unidad de medida', 'Precio venta', 'Stock actual']
+
+    def importar(self, *filas):
+        return ImportadorProductos(tamano_lote=2).importar([self.encabezado, *filas])
+
+    def test_cuenta_creados_actualizados_y_errores_por_fila(self):
+        resultado = self.importar(
+            ['T001', 'Tubo PVC', 'Tubería', 'u', '15.00', '12'],
+            ['N001', 'Nuevo', 'tubería', 'Unidad', '3.00', '5'],
+            ['N002', 'Sin categoría', 'Eléctrico', 'u', '1.00', '1'],
+            ['N003', 'Precio inválido', 'Tubería', 'u', 'abc', '1'],
+            ['N004', 'Stock decimal', 'Tubería', 'u', '1.00', '3.7'],
+            ['', '', '', '', '', ''],
+            ['N005', 'Nuevo 2', 'Tubería', 'u', '2.00', ''],
+        ).as_dict()
+
+        self.assertEqual((resultado['creados'], resultado['actualizados']), (2, 1))
+        self.assertEqual([error['fila'] for error in resultado['errores']], [4, 5, 6])
+        self.assertIn('Eléctrico', resultado['errores'][0]['error'])
+
+        self.tubo.refresh_from_db()
+        self.assertEqual((self.tubo.nombre, self.tubo.stock_actual), ('Tubo PVC', 12))
+        self.assertEqual(Producto.objects.get(codigo='N001').stock_actual, 5)
+        self.assertFalse(Producto.objects.filter(codigo__in=['N002', 'N003', 'N004']).exists())
+
+    def test_cambios_de_stock_quedan_en_el_kardex(self):
+        self.importar(
+            ['T001', 'Tubo', 'Tubería', 'u', '', '12'],
+            ['C001', 'Codo', 'Tubería', 'u', '', '2'],
+            ['N001', 'Nuevo', 'Tubería', 'u', '', '5'],
+        )
+
+        nuevo = Producto.objects.get(codigo='N001')
+        self.assertEqual(
+            sorted(MovimientoInventario.objects.values_list('producto_id', 'tipo', 'cantidad')),
+            sorted([(self.tubo.pk, 'ajuste', 2), (nuevo.pk, 'entrada', 5)]),
+        )
+
+    def test_encabezado_sin_columnas_requeridas(self):
+        resultado = ImportadorProductos().importar([['codigo', 'nombre'], ['X1', 'X']]).as_dict()
+
+        self.assertEqual(resultado['procesados'], 0)
+        self.assertEqual(resultado['errores'][0]['fila'], 1)
+
+
+class ProductoViewSetTests(DatosFerreteriaMixin, TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(Usuario.objects.create_user('admin', password='x', rol='admin'))
+
+    def datos(self, **cambios):
+        return {
+            'codigo': 'N001', 'nombre': 'Nuevo', 'categoria_id': self.categoria.pk,
+            'unidad_medida_id': self.unidad.pk, 'precio_venta': '5.00', 'costo_unitario': '3.00',
+            'stock_actual': 7, 'stock_minimo': 1, **cambios,
+        }
+
+    def test_crear_registra_el_stock_inicial_como_entrada(self):
+        response = self.client.post('/api/ferreteria/productos/', self.datos(), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        producto = Producto.objects.get(codigo='N001')
+        self.assertEqual(
+            list(MovimientoInventario.objects.filter(producto=producto).values_list('tipo', 'cantidad')),
+            [('entrada', 7)],
+        )
+
+    def test_actualizar_no_modifica_el_stock(self):
+        response = self.client.put(
+            f'/api/ferreteria/productos/{self.tubo.pk}/',
+            self.datos(codigo='T001', nombre='Tubo PVC', stock_actual=99),
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.tubo.refresh_from_db()
+        self.assertEqual((self.tubo.nombre, self.tubo.stock_actual), ('Tubo PVC', 10))
+
+    def test_detalle_con_proyeccion_de_campos(self):
+        response = self.client.get(f'/api/ferreteria/productos/{self.tubo.pk}/?fields=codigo,nombre')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['codigo'], 'T001')
+
+    def test_filtros_invalidos_del_kardex_devuelven_400(self):
+        for parametros in ('producto=x', 'desde=abc', 'hasta=2024-02-30'):
+            with self.subTest(parametros=parametros):
+                response = self.client.get(f'/api/ferreteria/movimientos/?{parametros}')
+                self.assertEqual(response.status_code, 400)
+
+
+class ValidacionCondicionalTests(DatosFerreteriaMixin, TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(Usuario.objects.create_user('admin', password='x', rol='admin'))
+
+    def assertEtagCambiaCon(self, url, cambio):
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        cambio()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_listado_cambio_de_producto(self):
+        def cambio():
+            self.codo.nombre = 'Codo 90'
+            self.codo.save()
+
+        self.assertEtagCambiaCon('/api/ferreteria/productos/', cambio)
+
+    def test_listado_cambio_en_tabla_relacionada(self):
+        def cambio():
+            self.categoria.nombre = 'Tubería PVC'
+            self.categoria.save()
+
+        self.assertEtagCambiaCon('/api/ferreteria/productos/', cambio)
+
+    def test_detalle_cambio_en_tabla_relacionada(self):
+        def cambio():
+            self.unidad.abreviatura = 'und'
+            self.unidad.save()
+
+        self.assertEtagCambiaCon(f'/api/ferreteria/productos/{self.tubo.pk}/', cambio)
+
+
+class SerializacionRapidaTests(DatosFerreteriaMixin, TestCase):
+    """La ruta rápida (values_list) produce el mismo JSON, byte a byte, que los serializers de DRF"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.crear_producto('Ñ001', stock_actual=0, precio_venta='0.10')
+        ProductoBloquera.objects.create(
+            codigo='B1', nombre='Block "pómez"', tipo_bloque='pómez', dimensiones='15x20x40',
+            precio_unitario='4.25', stock_actual=2, stock_minimo=5,
+        )
+        ProductoBloquera.objects.create(codigo='B2', nombre='Block', tipo_bloque='sólido', activo=False)
+        AgregadoPiedrinera.objects.create(
+            codigo='A1', nombre='Arena', tipo='arena', granulometria='0-4 mm', precio_venta_m3='150.00',
+            stock_actual_m3='1.50', stock_minimo_m3='5', ubicacion='Patio 1', calidad='A', proveedor='Río',
+        )
+        AgregadoPiedrinera.objects.create(
+            codigo='A2', nombre='Piedrín', tipo='piedrin', precio_venta_m3='99.99',
+            stock_actual_m3='0', stock_minimo_m3='0',
+        )
+        Camion.objects.create(
+            placa='C1', marca='Volvo', modelo='FH', capacidad_m3='12.00', estado_actual='activo',
+            fecha_proximo_mantenimiento=datetime.date(2026, 1, 2),
+        )
+        Camion.objects.create(
+            placa='C2', marca='Hino', modelo='500', capacidad_m3='8.50', estado_actual='taller',
+            seguro_vigente=False,
+        )
+        Empleado.objects.create(
+            codigo_empleado='E1', nombres='Ana', apellidos='Pérez', dpi='123', puesto='Operador',
+            salario_base_q='3500.00', fecha_contratacion=datetime.date(2020, 1, 1),
+        )
+        Empleado.objects.create(
+            codigo_empleado='E2', nombres='José', apellidos='López', puesto='Piloto',
+            salario_base_q='4200.50', fecha_contratacion=datetime.date(2021, 6, 30), activo=False,
+        )
+
+    def test_misma_salida_que_el_serializer(self):
+        for serializer_class, queryset in (
+            (ProductoListSerializer, Producto.objects.select_related('categoria')),
+            (ProductoBloqueraListSerializer, ProductoBloquera.objects.all()),
+            (AgregadoPiedrineraListSerializer, AgregadoPiedrinera.objects.all()),
+            (CamionListSerializer, Camion.objects.all()),
+            (EmpleadoListSerializer, Empleado.objects.all()),
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                esperado = JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+                self.assertEqual(JSONRenderer().render(serializer_class.serializar_valores(queryset)), esperado)
+                self.assertEqual(
+                    JSONRenderer().render(list(serializer_class.iterar_valores(queryset, chunk_size=1))), esperado
+                )
+
+    def test_el_listado_usa_la_ruta_rapida(self):
+        client = APIClient()
+        client.force_authenticate(Usuario.objects.create_user('admin', password='x', rol='admin'))
+
+        client.get('/api/ferreteria/productos/')  # carga los permisos del usuario en caché
+
+        # Una consulta para el ETag y una sola consulta de columnas para las filas
+        with self.assertNumQueries(2):
+            response = client.get('/api/ferreteria/productos/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render(ProductoListSerializer(Producto.objects.select_related('categoria'), many=True).data),
+        )
+
+
+class ORJSONRendererTests(DatosFerreteriaMixin, TestCase):
+    """ORJSONRenderer escribe los mismos bytes que JSONRenderer de DRF"""
+
+    def assertMismosBytes(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_respuestas_de_los_serializers(self):
+        productos = Producto.objects.select_related('categoria', 'unidad_medida')
+
+        self.assertMismosBytes(ProductoSerializer(productos, many=True).data)
+        self.assertMismosBytes(ProductoListSerializer.serializar_valores(productos))
+
+    def test_tipos_especiales(self):
+        self.assertMismosBytes({
+            'decimal': Decimal('12.50'),
+            'fecha': datetime.date(2026, 1, 2),
+            'momento': timezone.now(),
+            'sin_zona': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901),
+            'hora': datetime.time(7, 30),
+            'lazy': gettext_lazy('Producto'),
+            'texto': 'Tubería "PVC" \u2028 línea \u2029 párrafo',
+            'claves': {1: 'uno', None: 'nada'},
+            'float': 0.1 + 0.2,
+            'enteros': [0, -1, 2 ** 53],
+        })
+
+    def test_endpoint_con_el_renderer_por_defecto(self):
+        client = APIClient()
+        client.force_authenticate(Usuario.objects.create_user('admin', password='x', rol='admin'))
+
+        response = client.get(f'/api/ferreteria/productos/{self.tubo.pk}/')
+
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+
+class ListadoProductosTests(DatosFerreteriaMixin, TestCase):
+    """Streaming (?stream=true) y paginación por cursor (?page_size= / ?cursor=) del listado"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for codigo in ('A001', 'B001', 'D001', 'E001'):
+            cls.crear_producto(codigo)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(Usuario.objects.create_user('admin', password='x', rol='admin'))
+
+    def test_stream_devuelve_el_mismo_array_que_el_listado(self):
+        for parametros in ('', '?fields=codigo,precioVenta', '?search=T001', '?search=noexiste'):
+            with self.subTest(parametros=parametros):
+                esperado = self.client.get(f'/api/ferreteria/productos/{parametros}').content
+                separador = '&' if parametros else '?'
+
+                response = self.client.get(f'/api/ferreteria/productos/{parametros}{separador}stream=true&chunk_size=2')
+
+                self.assertTrue(response.streaming)
+                self.assertEqual(b''.join(response.streaming_content), esperado)
+
+    def test_sin_parametros_no_se_pagina(self):
+        response = self.client.get('/api/ferreteria/productos/')
+
+        self.assertEqual(len(response.json()), 6)
+
+    def test_paginacion_por_cursor(self):
+        codigos = []
+        url = '/api/ferreteria/productos/?page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            codigos += [producto['codigo'] for producto in response.data['results']]
+            url = response.data['next']
+            if url and len(codigos) == 4:
+                # Un producto insertado antes del cursor no desplaza la página siguiente
+                self.crear_producto('0000')
+
+        self.assertEqual(codigos, ['A001', 'B001', 'C001', 'D001', 'E001', 'T001'])
+
+    def test_page_size_limitado_y_stream_ignorado_al_paginar(self):
+        with mock.patch('ferreteria.views.CodigoCursorPagination.max_page_size', 3):
+            response = self.client.get('/api/ferreteria/productos/?page_size=50&stream=true')
 
-# Create your tests here.
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data['results']), 3)
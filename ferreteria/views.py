@@ -1,33 +1,86 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Count, Case, When, IntegerField, F
-from .models import Producto, CategoriaProducto, UnidadMedida, Cliente
+from django.utils.dateparse import parse_date
+from framasa_backend.pagination import CodigoCursorPagination
+from framasa_backend.mixins import (
+    ExportacionMixin, ListaRapidaMixin, ProyeccionCamposMixin, SincronizacionMixin, ValidacionCondicionalMixin
+)
+from framasa_backend.search import aplicar_busqueda, ordenar_por_relevancia
+from framasa_backend.streaming import stream_queryset, obtener_chunk_size
+from .models import Producto, CategoriaProducto, UnidadMedida, Cliente, MovimientoInventario
+from .inventario import aplicar_movimientos
+from .importacion import ImportadorProductos, ErrorFila, leer_filas
+from .estadisticas import productos_stats
 from .serializers import (
     ProductoSerializer,
     ProductoListSerializer,
     CategoriaProductoSerializer,
     UnidadMedidaSerializer,
     ProductosStatsSerializer,
-    ClienteSerializer
+    ClienteSerializer,
+    MovimientoInventarioSerializer,
+    LineaMovimientoSerializer
 )
 
 
-class ProductoViewSet(viewsets.ModelViewSet):
+class ProductoViewSet(ValidacionCondicionalMixin, SincronizacionMixin, ExportacionMixin, ListaRapidaMixin,
+                      ProyeccionCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para productos con filtros y estadísticas
     Permite GET (listar), POST (crear), GET/{id} (detalle), PUT/{id} (actualizar), DELETE/{id} (eliminar)
     """
     queryset = Producto.objects.select_related('categoria', 'unidad_medida').all()
-    permission_classes = [IsAuthenticated]
     pagination_class = None  # Deshabilitar paginación, el frontend la maneja
+    campos_modificacion_relacionados = ('categoria__updated_at', 'unidad_medida__updated_at')
+    campos_busqueda = ('codigo', 'nombre', 'categoria__nombre')
+    nombre_exportacion = 'productos'
+    columnas_exportacion = (
+        ('codigo', 'Código'),
+        ('nombre', 'Nombre'),
+        ('categoria__nombre', 'Categoría'),
+        ('unidad_medida__abreviatura', 'Unidad'),
+        ('precio_venta', 'Precio venta'),
+        ('costo_unitario', 'Costo unitario'),
+        ('stock_actual', 'Stock actual'),
+        ('stock_minimo', 'Stock mínimo'),
+        ('activo', 'Activo'),
+    )
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        # Con ?fields= / ?format_style= el listado usa el serializer completo proyectado
+        if self.action == 'sync' or (self.action == 'list' and not self.proyeccion_solicitada()):
             return ProductoListSerializer
         return ProductoSerializer
 
+    @property
+    def paginator(self):
+        """
+        Paginación por cursor opcional: solo se activa con ?page_size= o ?cursor=
+        Sin esos parámetros se mantiene el listado completo que usa el frontend
+        """
+        if not hasattr(self, '_paginator'):
+            if self.action == 'list' and CodigoCursorPagination.solicitada(self.request):
+                self._paginator = CodigoCursorPagination()
+            else:
+                self._paginator = None
+        return self._paginator
+
+    def list(self, request, *args, **kwargs):
+        """
+        Listado de productos
+        - Por defecto: array completo sin paginar
+        - ?page_size=N / ?cursor=...: paginación por cursor ordenada por código
+        - ?stream=true: array completo enviado en bloques (?chunk_size=N)
+        """
+        if request.query_params.get('stream', '').lower() == 'true' and self.paginator is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            serializer = self.get_serializer()
+            return stream_queryset(queryset, serializer, obtener_chunk_size(request))
+        return super().list(request, *args, **kwargs)
+
     def get_queryset(self):
         """
         Filtros opcionales:
@@ -41,11 +94,7 @@ class ProductoViewSet(viewsets.ModelViewSet):
         # Búsqueda por texto
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(codigo__icontains=search) |
-                Q(nombre__icontains=search) |
-                Q(categoria__nombre__icontains=search)
-            )
+            queryset = aplicar_busqueda(queryset, search, self.campos_busqueda)
 
         # Filtro por estado
         estado = self.request.query_params.get('estado', 'todos')
@@ -67,11 +116,11 @@ class ProductoViewSet(viewsets.ModelViewSet):
         # Filtro por stock mínimo
         stock_minimo = self.request.query_params.get('stockMinimo', 'todos')
         if stock_minimo == 'bajo':
-            queryset = queryset.filter(stock_actual__lte=F('stock_minimo'))
+            queryset = queryset.filter(stock_bajo=True)
         elif stock_minimo == 'suficiente':
-            queryset = queryset.filter(stock_actual__gt=F('stock_minimo'))
+            queryset = queryset.filter(stock_bajo=False)
 
-        return queryset.order_by('codigo')
+        return ordenar_por_relevancia(queryset, 'codigo')
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -79,28 +128,33 @@ class ProductoViewSet(viewsets.ModelViewSet):
         Endpoint para obtener estadísticas de productos
         Calcula estadísticas sobre TODOS los productos, sin filtros
         """
-        # Usar el queryset base sin filtros para las estadísticas
-        base_queryset = Producto.objects.all()
-
-        total_productos = base_queryset.count()
-        productos_activos = base_queryset.filter(activo=True).count()
-        productos_inactivos = base_queryset.filter(activo=False).count()
-        
-        # Productos con stock bajo (stock_actual <= stock_minimo)
-        productos_stock_bajo = base_queryset.filter(
-            stock_actual__lte=F('stock_minimo')
-        ).count()
-
-        stats = {
-            'total_productos': total_productos,
-            'productos_activos': productos_activos,
-            'productos_inactivos': productos_inactivos,
-            'productos_stock_bajo': productos_stock_bajo,
-        }
+        # Una sola consulta agregada, cacheada por unos segundos
+        stats = productos_stats.obtener()
 
         serializer = ProductosStatsSerializer(stats)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def importar(self, request):
+        """
+        Importación masiva de productos desde un archivo CSV o XLSX (campo 'archivo')
+        Inserta o actualiza por código en lotes y reporta los errores por fila
+        """
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response(
+                {'error': 'Debe enviar el archivo en el campo "archivo"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            importador = ImportadorProductos(usuario_id=request.user.pk)
+            resultado = importador.importar(leer_filas(archivo.file, archivo.name))
+        except (ErrorFila, UnicodeDecodeError) as e:
+            return Response({'error': f'No se pudo leer el archivo: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(resultado.as_dict())
+
     @action(detail=False, methods=['get'])
     def categorias(self, request):
         """
@@ -117,7 +171,6 @@ class CategoriaProductoViewSet(viewsets.ReadOnlyModelViewSet):
     """
     queryset = CategoriaProducto.objects.filter(activo=True)
     serializer_class = CategoriaProductoSerializer
-    permission_classes = [IsAuthenticated]
     pagination_class = None  # Deshabilitar paginación
 
 
@@ -127,11 +180,10 @@ class UnidadMedidaViewSet(viewsets.ReadOnlyModelViewSet):
     """
     queryset = UnidadMedida.objects.filter(activo=True)
     serializer_class = UnidadMedidaSerializer
-    permission_classes = [IsAuthenticated]
     pagination_class = None  # Deshabilitar paginación
 
 
-class ClienteViewSet(viewsets.ModelViewSet):
+class ClienteViewSet(ValidacionCondicionalMixin, SincronizacionMixin, ExportacionMixin, viewsets.ModelViewSet):
     """
     ViewSet para clientes con filtros y estadísticas
     Permite GET (listar), POST (crear), GET/{id} (detalle), PUT/{id} (actualizar), DELETE/{id} (desactivar)
@@ -139,8 +191,19 @@ class ClienteViewSet(viewsets.ModelViewSet):
     """
     queryset = Cliente.objects.all()
     serializer_class = ClienteSerializer
-    permission_classes = [IsAuthenticated]
     pagination_class = None  # Deshabilitar paginación, el frontend la maneja
+    campos_busqueda = ('nombre', 'nit', 'telefono', 'email')
+    sync_id_como_texto = False  # ClienteSerializer devuelve el id numérico
+    nombre_exportacion = 'clientes'
+    columnas_exportacion = (
+        ('nombre', 'Nombre'),
+        ('nit', 'NIT'),
+        ('direccion', 'Dirección'),
+        ('telefono', 'Teléfono'),
+        ('email', 'Email'),
+        ('fecha_registro', 'Fecha registro'),
+        ('activo', 'Activo'),
+    )
 
     def get_queryset(self):
         """
@@ -163,12 +226,7 @@ class ClienteViewSet(viewsets.ModelViewSet):
         # Búsqueda por texto
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(nombre__icontains=search) |
-                Q(nit__icontains=search) |
-                Q(telefono__icontains=search) |
-                Q(email__icontains=search)
-            )
+            queryset = aplicar_busqueda(queryset, search, self.campos_busqueda)
 
         # Filtro por período de registro
         periodo_registro = self.request.query_params.get('periodo_registro', None)
@@ -187,7 +245,7 @@ class ClienteViewSet(viewsets.ModelViewSet):
                 año_atras = ahora - timedelta(days=365)
                 queryset = queryset.filter(fecha_registro__gte=año_atras)
 
-        return queryset.order_by('nombre')
+        return ordenar_por_relevancia(queryset, 'nombre')
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -206,7 +264,6 @@ class ClienteViewSet(viewsets.ModelViewSet):
         """
         from django.utils import timezone
         from datetime import timedelta
-        from django.db.models import Count, Sum
         
         # Solo contar clientes activos
         base_queryset = Cliente.objects.filter(activo=True)
@@ -232,3 +289,81 @@ class ClienteViewSet(viewsets.ModelViewSet):
         }
 
         return Response(stats)
+
+
+class MovimientoInventarioViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet para el kardex de ferretería
+    Permite GET (listar, paginado), GET/{id} (detalle) y POST (registrar un lote de movimientos)
+    Los movimientos no se editan ni eliminan: las correcciones se hacen con un ajuste
+    """
+    queryset = MovimientoInventario.objects.select_related('producto').all()
+    serializer_class = MovimientoInventarioSerializer
+    max_lineas_por_lote = 1000
+
+    def get_queryset(self):
+        """
+        Filtros opcionales:
+        - producto: ID del producto
+        - tipo: 'entrada', 'salida' o 'ajuste'
+        - desde / hasta: rango de fechas (YYYY-MM-DD)
+        """
+        queryset = self.queryset
+        params = self.request.query_params
+
+        producto = params.get('producto')
+        if producto:
+            try:
+                queryset = queryset.filter(producto_id=int(producto))
+            except ValueError:
+                raise ValidationError({'producto': 'Debe ser el ID numérico de un producto.'})
+
+        tipo = params.get('tipo')
+        if tipo:
+            queryset = queryset.filter(tipo=tipo)
+
+        for parametro, lookup in (('desde', 'created_at__date__gte'), ('hasta', 'created_at__date__lte')):
+            valor = params.get(parametro)
+            if not valor:
+                continue
+            try:
+                fecha = parse_date(valor)
+            except ValueError:
+                fecha = None
+            if fecha is None:
+                raise ValidationError({parametro: 'Debe ser una fecha con formato YYYY-MM-DD.'})
+            queryset = queryset.filter(**{lookup: fecha})
+
+        return queryset.order_by('-created_at', '-id')
+
+    def create(self, request, *args, **kwargs):
+        """
+        Registra un lote de movimientos en una sola transacción
+        Acepta una lista de líneas o {"movimientos": [...]}:
+            {"producto_id": 1, "tipo": "salida", "cantidad": 3, "referencia": "F-001"}
+        Si alguna línea falla (producto inexistente o stock insuficiente) no se aplica ninguna
+        """
+        lineas = request.data.get('movimientos') if isinstance(request.data, dict) else request.data
+        if not isinstance(lineas, list) or not lineas:
+            return Response(
+                {'error': 'Debe enviar una lista de movimientos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(lineas) > self.max_lineas_por_lote:
+            return Response(
+                {'error': f'Máximo {self.max_lineas_por_lote} movimientos por lote.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = LineaMovimientoSerializer(data=lineas, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        movimientos, stock = aplicar_movimientos(serializer.validated_data, usuario_id=request.user.pk)
+
+        return Response({
+            'movimientos_registrados': len(movimientos),
+            'stock': [
+                {'producto_id': producto_id, 'stockActual': stock_actual}
+                for producto_id, stock_actual in sorted(stock.items())
+            ],
+        }, status=status.HTTP_201_CREATED)
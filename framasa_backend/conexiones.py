@@ -0,0 +1,88 @@
+"""
+Métricas de conexiones a la base de datos (por proceso)
+
+- Sin pool: cuenta peticiones y conexiones abiertas (señal connection_created).
+  Con conexiones persistentes las aperturas deben ser muy pocas respecto a
+  las peticiones; si son iguales, cada petición abre una conexión nueva.
+- Con pool (DB_POOL=True, Django 5.1+): agrega las estadísticas de
+  psycopg_pool (conexiones en uso, esperas, timeouts).
+
+Se publican en GET /api/admin/conexiones/ (solo administradores).
+"""
+import threading
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+_bloqueo = threading.Lock()
+_contadores = {'peticiones': 0, 'aperturas': {}}
+
+
+def _peticion_iniciada(sender, **kwargs):
+    with _bloqueo:
+        _contadores['peticiones'] += 1
+
+
+def _conexion_creada(sender, connection, **kwargs):
+    with _bloqueo:
+        aperturas = _contadores['aperturas']
+        aperturas[connection.alias] = aperturas.get(connection.alias, 0) + 1
+
+
+request_started.connect(_peticion_iniciada, dispatch_uid='conexiones_peticion')
+connection_created.connect(_conexion_creada, dispatch_uid='conexiones_creada')
+
+
+def estadisticas_pool(connection):
+    """Estadísticas de psycopg_pool de la conexión, o None si no usa pool"""
+    pool = getattr(connection, 'pool', None) if connection.settings_dict.get('OPTIONS', {}).get('pool') else None
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    return {
+        'tamano': stats.get('pool_size', 0),
+        'disponibles': stats.get('pool_available', 0),
+        'en_uso': stats.get('pool_size', 0) - stats.get('pool_available', 0),
+        'minimo': stats.get('pool_min'),
+        'maximo': stats.get('pool_max'),
+        'esperando': stats.get('requests_waiting', 0),
+        'solicitudes': stats.get('requests_num', 0),
+        'solicitudes_en_espera': stats.get('requests_queued', 0),
+        'espera_ms': stats.get('requests_wait_ms', 0),
+        'timeouts': stats.get('requests_errors', 0),
+        'conexiones_perdidas': stats.get('connections_lost', 0),
+    }
+
+
+def obtener_metricas():
+    with _bloqueo:
+        peticiones = _contadores['peticiones']
+        aperturas = dict(_contadores['aperturas'])
+
+    bases = {}
+    for alias in connections:
+        connection = connections[alias]
+        bases[alias] = {
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+            'health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+            'conexiones_abiertas': aperturas.get(alias, 0),
+            'pool': estadisticas_pool(connection),
+        }
+    return {
+        'pool_configurado': getattr(settings, 'DB_POOL', False),
+        'pool_disponible': getattr(settings, 'DB_POOL_DISPONIBLE', False),
+        'peticiones': peticiones,
+        'bases_de_datos': bases,
+    }
+
+
+class MetricasConexionesView(APIView):
+    """Métricas de conexiones del proceso que atiende la petición"""
+    roles_permitidos = ('admin',)
+
+    def get(self, request):
+        return Response(obtener_metricas())
@@ -0,0 +1,109 @@
+"""
+Router de base de datos para réplicas de lectura
+
+Las réplicas son los alias de DATABASES con TEST['MIRROR'] = 'default'
+(ver DB_REPLICAS en settings). Solo se lee de una réplica dentro de una
+petición GET/HEAD marcada por ReplicaLecturaMiddleware; las escrituras, los
+comandos de gestión y el resto del tráfico usan siempre 'default'.
+
+Read-your-writes: después de que un usuario escribe, sus lecturas van a
+'default' durante DB_REPLICA_STICKY_SEGUNDOS, para que no vea datos de una
+réplica con retraso.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import router
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+# Petición GET en curso: {'request': HttpRequest, 'alias': alias resuelto o None}
+_lectura_actual = ContextVar('framasa_lectura_replica', default=None)
+
+
+def alias_replicas():
+    return [
+        alias for alias, config in settings.DATABASES.items()
+        if config.get('TEST', {}).get('MIRROR') == 'default'
+    ]
+
+
+def _clave_escritura(user_id):
+    return f'replica:escritura:{user_id}'
+
+
+def registrar_escritura(user_id):
+    """Envía las lecturas del usuario a 'default' durante la ventana de stickiness"""
+    segundos = getattr(settings, 'DB_REPLICA_STICKY_SEGUNDOS', 5)
+    if segundos > 0:
+        cache.set(_clave_escritura(user_id), True, segundos)
+
+
+def iniciar_lectura(request):
+    """Marca la petición como de solo lectura; devuelve el token para terminar_lectura()"""
+    return _lectura_actual.set({'request': request, 'alias': None})
+
+
+def terminar_lectura(token):
+    _lectura_actual.reset(token)
+
+
+def fijar_lectura(queryset):
+    """
+    Fija en el queryset la base elegida para la petición en curso
+
+    Necesario en las respuestas en streaming (exportaciones, ?stream=true):
+    su cuerpo se consume después de que ReplicaLecturaMiddleware termina la
+    lectura, y sin base fija esas consultas irían a 'default'.
+    """
+    return queryset.using(router.db_for_read(queryset.model))
+
+
+def _elegir_alias(request):
+    """
+    Returns:
+        (alias, definitivo): definitivo es False mientras el usuario aún no
+        está autenticado (consultas de la propia autenticación)
+    """
+    replicas = alias_replicas()
+    if not replicas:
+        return 'default', True
+
+    # DRF asigna el usuario autenticado a la HttpRequest antes de ejecutar la
+    # vista; el usuario perezoso de AuthenticationMiddleware no se evalúa aquí
+    # porque hacerlo consultaría la base de datos desde el propio router.
+    user = request.__dict__.get('user')
+    if user is None or isinstance(user, SimpleLazyObject):
+        return random.choice(replicas), False
+    if user.is_authenticated and cache.get(_clave_escritura(user.pk)):
+        return 'default', True
+    return random.choice(replicas), True
+
+
+class RouterReplicas:
+
+    def db_for_read(self, model, **hints):
+        lectura = _lectura_actual.get()
+        if lectura is None:
+            return 'default'
+        if lectura['alias'] is not None:
+            return lectura['alias']
+        alias, definitivo = _elegir_alias(lectura['request'])
+        if definitivo:
+            # Una sola base por petición, para que todas sus consultas sean consistentes
+            lectura['alias'] = alias
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas contienen los mismos datos que 'default'
+        bases = {'default', *alias_replicas()}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,129 @@
+"""
+Exportación de listados a CSV o XLSX sin cargar el resultado en memoria
+
+- CSV: las filas se escriben a medida que se leen del cursor y se envían en
+  un StreamingHttpResponse.
+- XLSX: openpyxl en modo write_only escribe las filas en un archivo temporal
+  (memoria constante) que luego se envía en bloques con FileResponse.
+"""
+import csv
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from framasa_backend.db_router import fijar_lectura
+
+CHUNK_SIZE_EXPORTACION = 2000
+FILAS_POR_BLOQUE_CSV = 500
+# Caracteres con los que Excel interpreta una celda de texto como fórmula
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en lugar de escribirla"""
+
+    def write(self, valor):
+        return valor
+
+
+def texto_seguro(valor):
+    """
+    Antepone ' a los textos que Excel ejecutaría como fórmula (inyección de
+    fórmulas en CSV/XLSX); Excel muestra el texto sin el apóstrofo
+    """
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def valor_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return texto_seguro(valor)
+
+
+def valor_xlsx(valor):
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        # Excel no admite zonas horarias
+        return timezone.make_naive(valor)
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return texto_seguro(valor)
+
+
+def generar_csv(encabezados, filas):
+    """Genera el CSV por bloques de líneas (con BOM para que Excel detecte UTF-8)"""
+    escritor = csv.writer(_Eco())
+    yield '\ufeff' + escritor.writerow(encabezados)
+    bloque = []
+    for fila in filas:
+        bloque.append(escritor.writerow([valor_csv(valor) for valor in fila]))
+        if len(bloque) >= FILAS_POR_BLOQUE_CSV:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+def escribir_xlsx(encabezados, filas, titulo='Datos'):
+    """
+    Escribe las filas en un XLSX temporal y lo devuelve abierto al inicio
+
+    Raises:
+        ImportError si openpyxl no está instalado
+    """
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(title=titulo[:31])
+    hoja.append(list(encabezados))
+    for fila in filas:
+        hoja.append([valor_xlsx(valor) for valor in fila])
+
+    # Se elimina automáticamente al cerrarse cuando termina la respuesta
+    archivo = tempfile.TemporaryFile(suffix='.xlsx')
+    libro.save(archivo)
+    archivo.seek(0)
+    return archivo
+
+
+def exportar_queryset(queryset, columnas, nombre, formato='csv'):
+    """
+    Respuesta de descarga con las columnas indicadas del queryset
+
+    Args:
+        queryset: queryset ya filtrado
+        columnas: secuencia de (campo para values_list, encabezado)
+        nombre: nombre base del archivo descargado
+        formato: 'csv' o 'xlsx'
+    """
+    campos = [campo for campo, _ in columnas]
+    encabezados = [encabezado for _, encabezado in columnas]
+    filas = fijar_lectura(queryset).values_list(*campos).iterator(chunk_size=CHUNK_SIZE_EXPORTACION)
+    fecha = timezone.localdate().isoformat()
+
+    if formato == 'xlsx':
+        archivo = escribir_xlsx(encabezados, filas, titulo=nombre)
+        return FileResponse(
+            archivo,
+            as_attachment=True,
+            filename=f'{nombre}_{fecha}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    response = StreamingHttpResponse(generar_csv(encabezados, filas), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nombre}_{fecha}.csv"'
+    return response
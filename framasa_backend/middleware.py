@@ -0,0 +1,409 @@
+"""
+Middlewares del proyecto
+"""
+import logging
+import re
+import time
+import zlib
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from framasa_backend.db_router import alias_replicas, iniciar_lectura, registrar_escritura, terminar_lectura
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+logger = logging.getLogger('framasa.rendimiento')
+
+
+class _RegistroConsultas:
+    """execute_wrapper que cuenta consultas y tiempo en base de datos"""
+
+    def __init__(self):
+        self.total = 0
+        self.duracion = 0.0
+        # El SQL llega con placeholders (%s), por lo que el texto ya es la "forma" de la consulta
+        self.formas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duracion += time.perf_counter() - inicio
+            self.total += 1
+            self.formas[sql] += 1
+
+
+class InstrumentacionMiddleware:
+    """
+    Mide cada request: cantidad de consultas SQL y tiempo en base de datos,
+    tiempo de la vista y tiempo de render (serialización JSON de DRF).
+
+    - Escribe una línea de log estructurada en 'framasa.rendimiento': en nivel
+      DEBUG, o WARNING si el request tarda más de INSTRUMENTACION_UMBRAL_LENTO_MS
+      o si hay un posible N+1 (la misma consulta repetida más de
+      INSTRUMENTACION_UMBRAL_N1 veces en el mismo request)
+    - Agrega el header Server-Timing (visible en las DevTools del navegador)
+      solo con DEBUG o si la IP del cliente está en INTERNAL_IPS, para no
+      exponer tiempos internos a cualquier cliente
+
+    Es opcional: INSTRUMENTACION_ACTIVA vale DEBUG por defecto.
+
+    En las respuestas en streaming las consultas se ejecutan al consumir el
+    cuerpo, por eso la línea de log se escribe al terminar el stream e incluye
+    esas consultas; el header Server-Timing sale antes y no las incluye.
+
+    Bajo ASGI (vistas asíncronas) se miden los tiempos pero no las consultas:
+    el ORM asíncrono las ejecuta en otro hilo, fuera del alcance del wrapper.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.activa = getattr(settings, 'INSTRUMENTACION_ACTIVA', settings.DEBUG)
+        self.umbral_n1 = getattr(settings, 'INSTRUMENTACION_UMBRAL_N1', 10)
+        self.umbral_lento_ms = getattr(settings, 'INSTRUMENTACION_UMBRAL_LENTO_MS', 500)
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        if not self.activa:
+            return self.get_response(request)
+
+        registro = _RegistroConsultas()
+        request._instrumentacion = tiempos = {}
+        inicio = time.perf_counter()
+        with self._medir_consultas(registro):
+            response = self.get_response(request)
+        total = time.perf_counter() - inicio
+
+        vista, render = self._tiempos(tiempos, inicio, total)
+        self._agregar_server_timing(request, response, registro, total, vista, render)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self._medir_stream(
+                response.streaming_content, request, response, registro, inicio, vista, render
+            )
+        else:
+            self._registrar(request, response, registro, total, vista, render)
+        return response
+
+    async def __acall__(self, request):
+        if not self.activa:
+            return await self.get_response(request)
+
+        request._instrumentacion = tiempos = {}
+        inicio = time.perf_counter()
+        response = await self.get_response(request)
+        total = time.perf_counter() - inicio
+
+        vista, render = self._tiempos(tiempos, inicio, total)
+        self._agregar_server_timing(request, response, None, total, vista, render)
+        self._registrar(request, response, None, total, vista, render)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, '_instrumentacion'):
+            request._instrumentacion['inicio_vista'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Las Response de DRF se renderizan después de este punto
+        tiempos = getattr(request, '_instrumentacion', None)
+        if tiempos is not None:
+            tiempos['fin_vista'] = time.perf_counter()
+            response.add_post_render_callback(
+                lambda r: tiempos.__setitem__('fin_render', time.perf_counter())
+            )
+        return response
+
+    @staticmethod
+    def _medir_consultas(registro):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(registro))
+        return stack
+
+    @staticmethod
+    def _tiempos(tiempos, inicio, total):
+        vista = tiempos.get('fin_vista', inicio + total) - tiempos.get('inicio_vista', inicio)
+        render = tiempos['fin_render'] - tiempos['fin_vista'] if 'fin_render' in tiempos else 0
+        return vista, render
+
+    def _medir_stream(self, contenido, request, response, registro, inicio, vista, render):
+        """Cuenta las consultas que se ejecutan mientras el servidor consume el cuerpo"""
+        try:
+            with self._medir_consultas(registro):
+                yield from contenido
+        finally:
+            self._registrar(request, response, registro, time.perf_counter() - inicio, vista, render)
+
+    def _agregar_server_timing(self, request, response, registro, total, vista, render):
+        if not (settings.DEBUG or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS):
+            return
+        metricas = [
+            f'view;dur={vista * 1000:.1f}',
+            f'render;dur={render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ]
+        if registro is not None:
+            metricas.insert(0, f'db;dur={registro.duracion * 1000:.1f};desc="{registro.total} consultas"')
+        response['Server-Timing'] = ', '.join(metricas)
+
+    def _registrar(self, request, response, registro, total, vista, render):
+        datos = {
+            'metodo': request.method,
+            'ruta': request.path,
+            'status': response.status_code,
+        }
+        repetidas = []
+        if registro is not None:
+            datos['consultas'] = registro.total
+            datos['db_ms'] = round(registro.duracion * 1000, 1)
+            repetidas = [
+                (sql, veces) for sql, veces in registro.formas.most_common(3) if veces > self.umbral_n1
+            ]
+        datos.update(
+            vista_ms=round(vista * 1000, 1),
+            render_ms=round(render * 1000, 1),
+            total_ms=round(total * 1000, 1),
+        )
+        mensaje = ' '.join(f'{clave}={valor}' for clave, valor in datos.items())
+        lento = datos['total_ms'] > self.umbral_lento_ms
+        if lento:
+            mensaje += ' lento=True'
+        if repetidas:
+            datos['n_mas_1'] = [{'sql': sql[:300], 'veces': veces} for sql, veces in repetidas]
+            logger.warning(
+                '%s posible_n+1=%s', mensaje,
+                '; '.join(f'{veces}x {sql[:120]}' for sql, veces in repetidas),
+                extra={'rendimiento': datos},
+            )
+        elif lento:
+            logger.warning(mensaje, extra={'rendimiento': datos})
+        else:
+            logger.debug(mensaje, extra={'rendimiento': datos})
+
+
+class ReplicaLecturaMiddleware:
+    """
+    Marca las peticiones GET/HEAD para que RouterReplicas las lea de una
+    réplica, y registra las escrituras exitosas de cada usuario para que sus
+    siguientes lecturas vayan a 'default' (read-your-writes).
+
+    Debe ir después de AuthenticationMiddleware. Sin réplicas configuradas
+    (DB_REPLICAS) no tiene efecto.
+    """
+    sync_capable = True
+    async_capable = True
+    METODOS_LECTURA = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        if request.method in self.METODOS_LECTURA:
+            token = iniciar_lectura(request)
+            try:
+                return self.get_response(request)
+            finally:
+                terminar_lectura(token)
+
+        response = self.get_response(request)
+        self._registrar_escritura(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if request.method in self.METODOS_LECTURA:
+            token = iniciar_lectura(request)
+            try:
+                return await self.get_response(request)
+            finally:
+                terminar_lectura(token)
+
+        response = await self.get_response(request)
+        await sync_to_async(self._registrar_escritura)(request, response)
+        return response
+
+    def _registrar_escritura(self, request, response):
+        if response.status_code >= 400 or not alias_replicas():
+            return
+        # DRF deja en la HttpRequest el usuario autenticado por la vista
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            registrar_escritura(user.pk)
+
+
+TIPOS_COMPRIMIBLES = (
+    'application/json', 'text/', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+_re_codificacion = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def codificaciones_aceptadas(accept_encoding):
+    """{codificación: q} a partir del header Accept-Encoding"""
+    aceptadas = {}
+    for parte in accept_encoding.lower().split(','):
+        coincidencia = _re_codificacion.match(parte)
+        if not coincidencia:
+            continue
+        try:
+            aceptadas[coincidencia[1]] = float(coincidencia[2]) if coincidencia[2] else 1.0
+        except ValueError:
+            continue
+    return aceptadas
+
+
+class _CompresorGzip:
+    def __init__(self, nivel):
+        # wbits=31: formato gzip (cabecera y CRC)
+        self._compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def comprimir(self, datos):
+        return self._compresor.compress(datos)
+
+    def vaciar(self):
+        # Z_SYNC_FLUSH: el cliente puede descomprimir cada bloque al recibirlo
+        return self._compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self):
+        return self._compresor.flush()
+
+
+class _CompresorBrotli:
+    def __init__(self, nivel):
+        self._compresor = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, datos):
+        return self._compresor.process(datos)
+
+    def vaciar(self):
+        return self._compresor.flush()
+
+    def terminar(self):
+        return self._compresor.finish()
+
+
+class CompresionMiddleware:
+    """
+    Comprime las respuestas (brotli o gzip) según el header Accept-Encoding
+
+    - Solo tipos de texto/JSON; los XLSX y otros binarios ya vienen comprimidos
+    - Las respuestas menores a COMPRESION_UMBRAL_BYTES se envían sin comprimir
+    - Las respuestas en streaming (?stream=true, exportación CSV) se comprimen
+      bloque a bloque, vaciando el compresor después de cada uno
+    - Agrega Vary: Accept-Encoding y convierte el ETag en débil, porque el
+      cuerpo enviado ya no es idéntico byte a byte
+
+    - No se comprimen las rutas de COMPRESION_EXCLUIR_RUTAS (por defecto
+      /api/auth/, cuyas respuestas de login y refresh llevan los tokens JWT)
+
+    Settings: COMPRESION_ACTIVA, COMPRESION_UMBRAL_BYTES,
+    COMPRESION_NIVEL_GZIP (1-9), COMPRESION_NIVEL_BROTLI (0-11),
+    COMPRESION_EXCLUIR_RUTAS.
+
+    A diferencia de GZipMiddleware de Django no agrega relleno aleatorio
+    contra BREACH: los únicos secretos en el cuerpo son los tokens de
+    /api/auth/, que se envían sin comprimir; el resto de la API autentica por
+    header y no refleja secretos en las respuestas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.activa = getattr(settings, 'COMPRESION_ACTIVA', True)
+        self.umbral = getattr(settings, 'COMPRESION_UMBRAL_BYTES', 1024)
+        self.nivel_gzip = getattr(settings, 'COMPRESION_NIVEL_GZIP', 6)
+        self.nivel_brotli = getattr(settings, 'COMPRESION_NIVEL_BROTLI', 4)
+        self.excluir_rutas = tuple(getattr(settings, 'COMPRESION_EXCLUIR_RUTAS', ('/api/auth/',)))
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        return self.procesar(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.procesar(request, await self.get_response(request))
+
+    def elegir_codificacion(self, request):
+        """La codificación con mayor q; ante empate se prefiere brotli"""
+        aceptadas = codificaciones_aceptadas(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        comodin = aceptadas.get('*', 0)
+        candidatas = ('br', 'gzip') if brotli is not None else ('gzip',)
+        mejor = max(candidatas, key=lambda codificacion: aceptadas.get(codificacion, comodin))
+        return mejor if aceptadas.get(mejor, comodin) > 0 else None
+
+    def crear_compresor(self, codificacion):
+        if codificacion == 'br':
+            return _CompresorBrotli(self.nivel_brotli)
+        return _CompresorGzip(self.nivel_gzip)
+
+    def procesar(self, request, response):
+        if not self.activa or response.has_header('Content-Encoding') or response.status_code < 200:
+            return response
+        if request.path.startswith(self.excluir_rutas):
+            return response
+        tipo = response.get('Content-Type', '').lower()
+        if not tipo.startswith(TIPOS_COMPRIMIBLES):
+            return response
+        if not response.streaming and len(response.content) < self.umbral:
+            return response
+
+        # La representación depende del header aunque esta petición no se comprima
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codificacion = self.elegir_codificacion(request)
+        if codificacion is None:
+            return response
+
+        compresor = self.crear_compresor(codificacion)
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._comprimir_async(response.streaming_content, compresor)
+            else:
+                response.streaming_content = self._comprimir_stream(response.streaming_content, compresor)
+            del response['Content-Length']
+        else:
+            contenido = compresor.comprimir(response.content) + compresor.terminar()
+            if len(contenido) >= len(response.content):
+                return response
+            response.content = contenido
+            response['Content-Length'] = str(len(contenido))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = codificacion
+        return response
+
+    @staticmethod
+    def _comprimir_stream(contenido, compresor):
+        for bloque in contenido:
+            datos = compresor.comprimir(bloque)
+            yield datos + compresor.vaciar()
+        yield compresor.terminar()
+
+    @staticmethod
+    async def _comprimir_async(contenido, compresor):
+        async for bloque in contenido:
+            datos = compresor.comprimir(bloque)
+            yield datos + compresor.vaciar()
+        yield compresor.terminar()
@@ -0,0 +1,51 @@
+"""
+Operaciones de migración compartidas por las apps del ERP
+"""
+from django.db.migrations.operations.base import Operation
+
+
+class CrearIndicesTrigram(Operation):
+    """
+    Crea índices GIN pg_trgm sobre UPPER(columna) para acelerar __icontains
+
+    Django traduce __icontains en PostgreSQL a UPPER(columna::text) LIKE UPPER(%s),
+    por eso el índice se crea sobre esa misma expresión. En otros motores la
+    operación no hace nada, así las migraciones siguen funcionando en SQLite.
+    """
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, tabla, columnas):
+        self.tabla = tabla
+        self.columnas = columnas
+
+    def deconstruct(self):
+        return (self.__class__.__name__, [], {'tabla': self.tabla, 'columnas': self.columnas})
+
+    def nombre_indice(self, columna):
+        return f'idx_{self.tabla}_{columna}_trgm'
+
+    def state_forwards(self, app_label, state):
+        # Los índices no forman parte del estado de los modelos
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        quote = schema_editor.quote_name
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for columna in self.columnas:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {quote(self.nombre_indice(columna))} '
+                f'ON {quote(self.tabla)} USING gin (UPPER({quote(columna)}::text) gin_trgm_ops)'
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        quote = schema_editor.quote_name
+        for columna in self.columnas:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {quote(self.nombre_indice(columna))}')
+
+    def describe(self):
+        return f'Crear índices trigram en {self.tabla} ({", ".join(self.columnas)})'
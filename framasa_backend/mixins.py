@@ -0,0 +1,235 @@
+"""
+Mixins compartidos por los ViewSets de las apps del ERP
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .exportacion import exportar_queryset
+
+
+class ListaRapidaMixin:
+    """
+    Usa la ruta rápida del serializer de listado (SerializacionRapidaMixin)
+    cuando el listado no está paginado
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if self.paginator is None and hasattr(serializer_class, 'serializar_valores'):
+            queryset = self.filter_queryset(self.get_queryset())
+            return Response(serializer_class.serializar_valores(queryset))
+        return super().list(request, *args, **kwargs)
+
+
+class ProyeccionCamposMixin:
+    """
+    ?fields= y ?format_style= en listado y detalle para serializers con
+    CamposDinamicosMixin: el queryset se limita con only() a las columnas
+    de los campos pedidos (solo en GET).
+
+    Con proyección, el listado usa el serializer completo en lugar de la ruta
+    rápida (ver get_serializer_class de cada ViewSet).
+    """
+
+    def proyeccion_solicitada(self):
+        params = self.request.query_params
+        return 'fields' in params or 'format_style' in params
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in ('GET', 'HEAD') or not self.proyeccion_solicitada():
+            return queryset
+        serializer = self.get_serializer()
+        columnas = getattr(serializer, 'columnas_modelo', lambda: None)()
+        if not columnas:
+            return queryset
+
+        # Solo se mantienen los select_related de las relaciones que se leen
+        relaciones = {columna.split('__')[0] for columna in columnas if '__' in columna}
+        if queryset.query.select_related:
+            queryset = queryset.select_related(None)
+            if relaciones:
+                queryset = queryset.select_related(*relaciones)
+        return queryset.only(*columnas)
+
+
+class SincronizacionMixin:
+    """
+    Sincronización incremental: GET .../sync/?updated_since=<ISO 8601>
+
+    Devuelve solo los registros del listado (mismos filtros que list) cuyo
+    updated_at es posterior a la marca indicada, los ids de los registros
+    modificados que ya no pertenecen al listado (p. ej. desactivados con el
+    soft delete) y una nueva marca ('watermark') para la siguiente llamada.
+    Sin updated_since devuelve el listado completo.
+
+    Nota: las eliminaciones físicas no dejan registro, por lo que no aparecen
+    en 'eliminados'.
+    """
+    # Representar los ids eliminados igual que el campo 'id' del serializer
+    sync_id_como_texto = True
+
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        # La marca se toma antes de consultar y con un margen hacia atrás para no
+        # perder cambios de transacciones que confirmen durante la consulta
+        margen = timedelta(seconds=getattr(settings, 'SYNC_MARGEN_SEGUNDOS', 5))
+        watermark = timezone.now() - margen
+
+        queryset = self.filter_queryset(self.get_queryset())
+        eliminados = []
+
+        updated_since = request.query_params.get('updated_since')
+        if updated_since:
+            desde = parse_datetime(updated_since)
+            if desde is None:
+                return Response(
+                    {'error': 'updated_since debe ser una fecha ISO 8601'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(desde):
+                desde = timezone.make_aware(desde)
+
+            queryset = queryset.filter(updated_at__gte=desde)
+            visibles = set(queryset.values_list('pk', flat=True))
+            modificados = self.queryset.model.objects.filter(
+                updated_at__gte=desde
+            ).values_list('pk', flat=True)
+            eliminados = [
+                str(pk) if self.sync_id_como_texto else pk
+                for pk in modificados if pk not in visibles
+            ]
+
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'serializar_valores'):
+            cambios = serializer_class.serializar_valores(queryset)
+        else:
+            cambios = self.get_serializer(queryset, many=True).data
+
+        return Response({
+            'cambios': cambios,
+            'eliminados': eliminados,
+            # Formato UTC con 'Z' para que el cliente pueda reenviarlo sin codificar '+'
+            'watermark': watermark.isoformat().replace('+00:00', 'Z'),
+            'completo': not updated_since,
+        })
+
+
+class ValidacionCondicionalMixin:
+    """
+    GET condicional con ETag / Last-Modified para list y retrieve
+
+    - list: el ETag se calcula con MAX(updated_at) y COUNT(*) del queryset ya
+      filtrado (una consulta agregada barata)
+    - retrieve: el ETag se calcula con el updated_at del registro
+
+    Si la respuesta incluye datos de otras tablas (categoria__nombre), sus
+    updated_at se declaran en campos_modificacion_relacionados y entran en el
+    mismo MAX(); sin ellos, renombrar una categoría no cambiaría el ETag.
+
+    Si el cliente envía If-None-Match (o If-Modified-Since) y los datos no
+    cambiaron se responde 304 sin serializar nada.
+    """
+    campo_modificacion = 'updated_at'
+    # updated_at de las tablas relacionadas que aparecen en la respuesta ('categoria__updated_at')
+    campos_modificacion_relacionados = ()
+
+    def _etag(self, *partes):
+        partes = (self.get_serializer_class().__name__, self.request.get_full_path()) + partes
+        firma = hashlib.md5(':'.join(str(parte) for parte in partes).encode()).hexdigest()
+        return f'"{firma}"'
+
+    @staticmethod
+    def _valor_relacionado(instance, campo):
+        """Sigue 'categoria__updated_at' sobre la instancia (relaciones en select_related)"""
+        for parte in campo.split('__'):
+            instance = getattr(instance, parte, None)
+        return instance
+
+    def _respuesta_condicional(self, etag, modificado):
+        last_modified = int(modificado.timestamp()) if modificado else None
+        return get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+
+    def _agregar_validadores(self, response, etag, modificado):
+        response['ETag'] = etag
+        if modificado:
+            response['Last-Modified'] = http_date(modificado.timestamp())
+        # El navegador puede guardar la respuesta pero debe revalidarla siempre
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        campos = (self.campo_modificacion, *self.campos_modificacion_relacionados)
+        resumen = queryset.order_by().aggregate(
+            *(Max(campo) for campo in campos),
+            total=Count('pk'),
+        )
+        modificado = max(
+            (resumen[f'{campo}__max'] for campo in campos if resumen[f'{campo}__max']), default=None
+        )
+        etag = self._etag(modificado.isoformat() if modificado else '', resumen['total'])
+
+        no_modificado = self._respuesta_condicional(etag, modificado)
+        if no_modificado is not None:
+            return no_modificado
+        response = super().list(request, *args, **kwargs)
+        return self._agregar_validadores(response, etag, modificado)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        modificado = max(
+            filter(None, (
+                self._valor_relacionado(instance, campo)
+                for campo in (self.campo_modificacion, *self.campos_modificacion_relacionados)
+            )),
+            default=None,
+        )
+        etag = self._etag(instance.pk, modificado.isoformat() if modificado else '')
+
+        no_modificado = self._respuesta_condicional(etag, modificado)
+        if no_modificado is not None:
+            return no_modificado
+        serializer = self.get_serializer(instance)
+        return self._agregar_validadores(Response(serializer.data), etag, modificado)
+
+
+class ExportacionMixin:
+    """
+    Exportación del listado: GET .../export/?formato=csv|xlsx
+
+    Aplica los mismos filtros que list (get_queryset/filter_queryset) y lee
+    solo las columnas de 'columnas_exportacion' con values_list().iterator(),
+    de modo que la memoria no crece con la cantidad de filas.
+    """
+    # Secuencia de (campo, encabezado); admite campos relacionados ('categoria__nombre')
+    columnas_exportacion = ()
+    nombre_exportacion = 'exportacion'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        formato = request.query_params.get('formato', 'csv').lower()
+        if formato not in ('csv', 'xlsx'):
+            return Response(
+                {'error': "formato debe ser 'csv' o 'xlsx'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            return exportar_queryset(queryset, self.columnas_exportacion, self.nombre_exportacion, formato)
+        except ImportError:
+            return Response(
+                {'error': 'La exportación a XLSX requiere instalar openpyxl'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
@@ -0,0 +1,24 @@
+"""
+Paginación compartida por las apps del ERP
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class CodigoCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) ordenada por código
+
+    El cursor es opaco y se basa en el último código entregado, por lo que las
+    páginas son estables aunque se inserten productos entre una petición y otra.
+    Uso: ?page_size=100 para la primera página y luego seguir el enlace 'next'.
+    """
+    ordering = 'codigo'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    @classmethod
+    def solicitada(cls, request):
+        """Indica si el cliente pidió paginación explícitamente"""
+        params = request.query_params
+        return cls.cursor_query_param in params or cls.page_size_query_param in params
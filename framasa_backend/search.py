@@ -0,0 +1,47 @@
+"""
+Búsqueda de texto compartida por los ViewSets
+
+En PostgreSQL los filtros __icontains se resuelven con los índices GIN
+pg_trgm sobre UPPER(columna) (ver framasa_backend.migraciones) y los
+resultados se ordenan por relevancia con similitud de trigramas.
+En otros motores (SQLite en desarrollo/tests) se usa el mismo filtro
+sin ordenamiento por relevancia.
+"""
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+ANOTACION_RELEVANCIA = 'relevancia'
+
+
+def aplicar_busqueda(queryset, texto, campos):
+    """
+    Filtra el queryset por texto en cualquiera de los campos indicados
+
+    Args:
+        queryset: QuerySet base
+        texto: texto a buscar (parámetro ?search=)
+        campos: lookups de los campos donde buscar, p. ej. ('codigo', 'categoria__nombre')
+    """
+    filtro = Q()
+    for campo in campos:
+        filtro |= Q(**{f'{campo}__icontains': texto})
+    queryset = queryset.filter(filtro)
+
+    if connections[queryset.db].vendor == 'postgresql':
+        # Import diferido: django.contrib.postgres requiere psycopg instalado
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        similitudes = [TrigramWordSimilarity(texto, campo) for campo in campos]
+        relevancia = Greatest(*similitudes) if len(similitudes) > 1 else similitudes[0]
+        queryset = queryset.annotate(**{ANOTACION_RELEVANCIA: relevancia})
+    return queryset
+
+
+def ordenar_por_relevancia(queryset, *orden):
+    """
+    Aplica el orden indicado, anteponiendo la relevancia si hubo búsqueda
+    """
+    if ANOTACION_RELEVANCIA in queryset.query.annotations:
+        return queryset.order_by(f'-{ANOTACION_RELEVANCIA}', *orden)
+    return queryset.order_by(*orden)
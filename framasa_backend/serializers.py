@@ -0,0 +1,155 @@
+"""
+Utilidades compartidas para los serializers de las apps del ERP
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+class SerializacionRapidaMixin:
+    """
+    Ruta rápida para listados: lee solo las columnas necesarias con
+    values_list() y arma el diccionario de salida en una sola pasada,
+    sin instanciar modelos ni pasar por los campos de DRF.
+
+    Las clases que lo usan definen:
+        campos_valores: lookups que se piden a la base de datos
+        fila_a_dict(fila): convierte la tupla de values_list() en el
+            mismo diccionario que devuelve to_representation()
+    """
+    campos_valores = ()
+
+    @staticmethod
+    def fila_a_dict(fila):
+        raise NotImplementedError
+
+    @classmethod
+    def valores(cls, queryset):
+        return queryset.values_list(*cls.campos_valores)
+
+    @classmethod
+    def serializar_valores(cls, queryset):
+        """Serializa el queryset completo con la ruta rápida"""
+        fila_a_dict = cls.fila_a_dict
+        return [fila_a_dict(fila) for fila in cls.valores(queryset)]
+
+    @classmethod
+    def iterar_valores(cls, queryset, chunk_size):
+        """Igual que serializar_valores() pero leyendo por bloques con iterator()"""
+        fila_a_dict = cls.fila_a_dict
+        for fila in cls.valores(queryset).iterator(chunk_size=chunk_size):
+            yield fila_a_dict(fila)
+
+
+def fecha_iso(valor):
+    """Mismo formato que DateField de DRF (ISO 8601 o None)"""
+    return valor.isoformat() if valor else None
+
+
+FORMATOS_CAMPOS = ('both', 'snake', 'camel')
+
+
+class CamposDinamicosMixin:
+    """
+    Proyección de campos para serializers que emiten cada valor en
+    snake_case y en camelCase, controlada por parámetros del request:
+
+        ?fields=id,nombre,precioVenta   solo esas claves de salida
+        ?format_style=camel|snake|both  solo las claves de ese formato
+
+    Las clases que lo usan definen:
+        campos_comunes: claves presentes en ambos formatos
+        campos_snake: claves que solo pertenecen al formato snake_case
+        campos_camel: {clave camelCase: campo del serializer del que sale}
+        columnas_extra: {campo del serializer: columnas del modelo} para
+            campos que no son columnas (propiedades del modelo)
+    Las claves comunes y snake_case salen del campo del serializer con el
+    mismo nombre.
+
+    En GET se descartan los campos del serializer que no se van a emitir y
+    columnas_modelo() devuelve las columnas para queryset.only().
+    """
+    campos_comunes = ()
+    campos_snake = ()
+    campos_camel = {}
+    columnas_extra = {}
+
+    @property
+    def claves_activas(self):
+        """Claves de salida pedidas, o None si el request no pide proyección"""
+        if not hasattr(self, '_claves_activas'):
+            self._claves_activas = self._leer_claves()
+        return self._claves_activas
+
+    def _leer_claves(self):
+        request = self.context.get('request')
+        if request is None:
+            return None
+        params = getattr(request, 'query_params', request.GET)
+        fields = params.get('fields')
+        estilo = params.get('format_style', 'both')
+        if estilo not in FORMATOS_CAMPOS:
+            raise serializers.ValidationError(
+                {'format_style': f'Formato inválido. Opciones: {", ".join(FORMATOS_CAMPOS)}'}
+            )
+        if not fields and estilo == 'both':
+            return None
+
+        excluidas = set(self.campos_camel) if estilo == 'snake' else set()
+        if estilo == 'camel':
+            excluidas.update(self.campos_snake)
+        claves = {clave.strip() for clave in fields.split(',')} if fields else None
+        return {'excluidas': excluidas, 'incluidas': claves}
+
+    def incluye(self, clave):
+        claves = self.claves_activas
+        return claves is None or (
+            clave not in claves['excluidas']
+            and (claves['incluidas'] is None or clave in claves['incluidas'])
+        )
+
+    def _campos_necesarios(self):
+        """Campos del serializer que alimentan las claves de salida activas"""
+        necesarios = set()
+        for clave in (*self.campos_comunes, *self.campos_snake, *self.campos_camel):
+            if self.incluye(clave):
+                necesarios.add(self.campos_camel.get(clave, clave))
+        return necesarios
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if self.claves_activas is None or request is None or request.method not in ('GET', 'HEAD'):
+            return fields
+        necesarios = self._campos_necesarios()
+        return {nombre: campo for nombre, campo in fields.items() if nombre in necesarios}
+
+    def columnas_modelo(self):
+        """
+        Columnas del modelo para only() según las claves activas, o None si
+        no se pide proyección o algún campo no se puede traducir a columnas
+        """
+        if self.claves_activas is None:
+            return None
+        modelo = self.Meta.model
+        columnas = set()
+        for nombre, campo in self.fields.items():
+            if nombre in self.columnas_extra:
+                columnas.update(self.columnas_extra[nombre])
+                continue
+            if campo.source == '*':
+                return None
+            try:
+                field = modelo._meta.get_field(campo.source_attrs[0])
+            except FieldDoesNotExist:
+                return None
+            if field.is_relation and len(campo.source_attrs) > 1:
+                columnas.add('__'.join(campo.source_attrs))
+            else:
+                columnas.add(field.name)
+        return columnas
+
+    def proyectar(self, data):
+        """Filtra el diccionario de salida según las claves activas"""
+        if self.claves_activas is None:
+            return data
+        return {clave: valor for clave, valor in data.items() if self.incluye(clave)}
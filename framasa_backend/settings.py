@@ -3,6 +3,9 @@ Django settings for framasa_backend project.
 """
 
 import os
+import django
+from copy import deepcopy
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -38,6 +41,7 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     # Local apps
     'authentication',
@@ -45,15 +49,19 @@ INSTALLED_APPS = [
     'bloquera',
     'piedrinera',
     'planillas',
+    'productos',
 ]
 
 MIDDLEWARE = [
+    'framasa_backend.middleware.InstrumentacionMiddleware',
+    'framasa_backend.middleware.CompresionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'framasa_backend.middleware.ReplicaLecturaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,9 +98,162 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Conexiones persistentes: se reutilizan entre peticiones hasta DB_CONN_MAX_AGE
+        # segundos y se verifican antes de usarlas (evita errores tras un reinicio de PostgreSQL)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
+# Pool de conexiones de psycopg 3 (DB_POOL=True). Requiere Django 5.1+ y
+# psycopg[pool]; con versiones anteriores se mantienen las conexiones
+# persistentes. Con servidores ASGI (uvicorn) usar el pool o DB_CONN_MAX_AGE=0.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+DB_POOL_DISPONIBLE = django.VERSION >= (5, 1) and find_spec('psycopg_pool') is not None
+
+if DB_POOL and DB_POOL_DISPONIBLE:
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # el pool administra la vida de las conexiones
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX', '10')),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        },
+    }
+
+# Réplicas de lectura: DB_REPLICAS=host1,host2:5433 crea los alias replica_1,
+# replica_2... con las mismas credenciales que 'default'. Los GET de la API
+# leen de una réplica (framasa_backend.db_router); las escrituras van a
+# 'default'. Para probar localmente basta DB_REPLICAS=localhost (un segundo
+# alias sobre la misma base de datos).
+DB_REPLICAS = [destino.strip() for destino in os.getenv('DB_REPLICAS', '').split(',') if destino.strip()]
+for numero, destino in enumerate(DB_REPLICAS, start=1):
+    host, _, puerto = destino.partition(':')
+    DATABASES[f'replica_{numero}'] = {
+        **deepcopy(DATABASES['default']),
+        'HOST': host,
+        'PORT': puerto or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['framasa_backend.db_router.RouterReplicas']
+
+# Segundos que las lecturas de un usuario van a 'default' después de que escribe
+DB_REPLICA_STICKY_SEGUNDOS = int(os.getenv('DB_REPLICA_STICKY_SEGUNDOS', '5'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# En producción con varios workers usar REDIS_URL para compartir la caché
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'framasa',
+        }
+    }
+
+# Segundos que se cachean los endpoints de estadísticas (stats)
+STATS_CACHE_TIMEOUT = int(os.getenv('STATS_CACHE_TIMEOUT', '30'))
+
+# Margen (segundos) que se resta al watermark de los endpoints sync
+SYNC_MARGEN_SEGUNDOS = int(os.getenv('SYNC_MARGEN_SEGUNDOS', '5'))
+
+# Instrumentación por request (consultas SQL, tiempos y header Server-Timing)
+# Opcional: por defecto solo con DEBUG. El header Server-Timing se envía con DEBUG
+# o a las IPs de INTERNAL_IPS; el log es DEBUG salvo requests lentos o con N+1 (WARNING)
+INSTRUMENTACION_ACTIVA = os.getenv('INSTRUMENTACION_ACTIVA', str(DEBUG)) == 'True'
+INTERNAL_IPS = [ip for ip in os.getenv('INTERNAL_IPS', '').split(',') if ip]
+# Milisegundos a partir de los cuales un request se registra como lento
+INSTRUMENTACION_UMBRAL_LENTO_MS = int(os.getenv('INSTRUMENTACION_UMBRAL_LENTO_MS', '500'))
+# Veces que puede repetirse la misma consulta en un request antes de marcarla como N+1
+INSTRUMENTACION_UMBRAL_N1 = int(os.getenv('INSTRUMENTACION_UMBRAL_N1', '10'))
+
+# Segundos que se cachean las alertas de stock bajo (también se invalidan con cada cambio)
+ALERTAS_CACHE_TIMEOUT = int(os.getenv('ALERTAS_CACHE_TIMEOUT', '15'))
+
+# Compresión de respuestas (brotli si está instalado, si no gzip); ver benchmarks/bench_compresion.py
+COMPRESION_ACTIVA = os.getenv('COMPRESION_ACTIVA', 'True') == 'True'
+COMPRESION_UMBRAL_BYTES = int(os.getenv('COMPRESION_UMBRAL_BYTES', '1024'))
+COMPRESION_NIVEL_GZIP = int(os.getenv('COMPRESION_NIVEL_GZIP', '6'))
+COMPRESION_NIVEL_BROTLI = int(os.getenv('COMPRESION_NIVEL_BROTLI', '4'))
+# Rutas cuyas respuestas llevan secretos (tokens JWT) y no se comprimen (BREACH)
+COMPRESION_EXCLUIR_RUTAS = ('/api/auth/',)
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.0/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'simple',
+        },
+    },
+    'loggers': {
+        'framasa': {
+            'handlers': ['console'],
+            'level': os.getenv('FRAMASA_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# PASSWORD_HASHER elige el hasher preferido: 'argon2' (por defecto si argon2-cffi
+# está instalado), 'bcrypt' o 'pbkdf2'. Al cambiar el hasher o su costo, las
+# contraseñas se re-hashean en el siguiente login exitoso.
+# BCryptPasswordHasher permite verificar los hashes bcrypt heredados migrados con migrate_users
+
+_HASHERS = {
+    'argon2': 'authentication.hashers.Argon2ConfigurablePasswordHasher',
+    'bcrypt': 'authentication.hashers.BCryptSHA256ConfigurablePasswordHasher',
+    'pbkdf2': 'authentication.hashers.PBKDF2ConfigurablePasswordHasher',
+}
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'argon2' if find_spec('argon2') else 'pbkdf2')
+PASSWORD_HASHERS = [_HASHERS[PASSWORD_HASHER]] + [
+    hasher for clave, hasher in _HASHERS.items() if clave != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptPasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Costos (valores por defecto según las recomendaciones de OWASP para argon2id)
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', '19456'))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', '1'))
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv('PASSWORD_BCRYPT_ROUNDS', '10'))
+PASSWORD_PBKDF2_ITERACIONES = int(os.getenv('PASSWORD_PBKDF2_ITERACIONES', '720000'))
+
+# Límite de intentos de login: "capacidad/fichas por minuto" por IP y por username.
+# El límite por IP es alto a propósito: todo el personal de una sucursal sale por
+# la misma IP (NAT) y se conecta a la vez al cambio de turno; cada cuenta queda
+# protegida por LOGIN_LIMITE_USUARIO. Bajarlo solo si cada usuario tiene su propia IP.
+LOGIN_LIMITE_IP = tuple(int(valor) for valor in os.getenv('LOGIN_LIMITE_IP', '100/30').split('/'))
+LOGIN_LIMITE_USUARIO = tuple(int(valor) for valor in os.getenv('LOGIN_LIMITE_USUARIO', '5/5').split('/'))
+# Usar X-Forwarded-For para la IP del cliente (solo detrás de un proxy de confianza)
+LOGIN_CONFIAR_X_FORWARDED_FOR = os.getenv('LOGIN_CONFIAR_X_FORWARDED_FOR', 'False') == 'True'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -142,10 +303,22 @@ AUTH_USER_MODEL = 'authentication.Usuario'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Construye el usuario desde los claims del token, sin consultar la tabla usuarios
+        'authentication.autenticacion.JWTSinConsultaAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
-        'rest_framework.permissions.IsAuthenticated',
+        # IsAuthenticated + rol/permisos cacheados (roles_permitidos / permisos_requeridos en el ViewSet)
+        'authentication.permisos.PermisoPorRol',
+    ),
+    # orjson con la misma salida que JSONRenderer (framasa_backend/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'framasa_backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'framasa_backend.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
@@ -168,6 +341,20 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Segundos entre recargas del conjunto en memoria de usuarios habilitados
+# (revocación de tokens de usuarios desactivados o eliminados)
+JWT_USUARIOS_REFRESCO_SEGUNDOS = int(os.getenv('JWT_USUARIOS_REFRESCO_SEGUNDOS', '60'))
+
+# Segundos entre reconstrucciones del conjunto en memoria de refresh tokens en la
+# lista negra (0 = consultar la base de datos en cada refresh). Solo aplica con
+# una caché compartida (REDIS_URL); con LocMemCache se consulta siempre la base de datos
+JWT_BLACKLIST_REFRESCO_SEGUNDOS = int(os.getenv('JWT_BLACKLIST_REFRESCO_SEGUNDOS', '60'))
+
+# Segundos que se cachean el rol, grupos y permisos de cada usuario. Sin caché
+# compartida (REDIS_URL) es también el tiempo máximo que un permiso revocado sigue
+# vigente en los demás workers
+PERMISOS_CACHE_TIMEOUT = int(os.getenv('PERMISOS_CACHE_TIMEOUT', '300'))
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -0,0 +1,84 @@
+"""
+Motor de estadísticas compartido por las apps del ERP
+
+Cada app declara sus contadores como agregados condicionales
+(Count('id', filter=Q(...))) y el motor los resuelve en una sola consulta,
+guardando el resultado en caché por unos segundos. La caché se invalida con
+las señales post_save/post_delete del modelo.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save, post_delete
+
+
+class MotorEstadisticas:
+    """
+    Calcula y cachea las estadísticas de un modelo
+
+    Ejemplo:
+        MotorEstadisticas(Producto, {
+            'total_productos': Count('id'),
+            'productos_activos': Count('id', filter=Q(activo=True)),
+        })
+    """
+
+    def __init__(self, modelo, agregados):
+        self.modelo = modelo
+        self.agregados = agregados
+        self.clave_cache = f'stats:{modelo._meta.label_lower}'
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'STATS_CACHE_TIMEOUT', 30)
+
+    def calcular(self):
+        """Ejecuta la consulta agregada (una sola consulta a la base de datos)"""
+        resultado = self.modelo.objects.aggregate(**self.agregados)
+        # Sum() devuelve None cuando la tabla está vacía
+        return {clave: valor or 0 for clave, valor in resultado.items()}
+
+    def obtener(self):
+        """Devuelve las estadísticas desde caché o las calcula si no existen"""
+        stats = cache.get(self.clave_cache)
+        if stats is None:
+            stats = self.calcular()
+            cache.set(self.clave_cache, stats, self.timeout)
+        return stats
+
+    async def aobtener(self, paralelo=False):
+        """
+        Versión asíncrona de obtener()
+
+        Con paralelo=True la consulta se ejecuta en un hilo propio con su
+        propia conexión, de modo que varias estadísticas lanzadas con
+        asyncio.gather se consultan al mismo tiempo (el ORM asíncrono de
+        Django ejecuta todas las consultas en un único hilo compartido).
+        """
+        stats = await cache.aget(self.clave_cache)
+        if stats is None:
+            if paralelo:
+                stats = await sync_to_async(self._calcular_en_hilo, thread_sensitive=False)()
+            else:
+                resultado = await self.modelo.objects.aaggregate(**self.agregados)
+                stats = {clave: valor or 0 for clave, valor in resultado.items()}
+            await cache.aset(self.clave_cache, stats, self.timeout)
+        return stats
+
+    def _calcular_en_hilo(self):
+        try:
+            return self.calcular()
+        finally:
+            # Cerrar la conexión abierta por el hilo del executor
+            connection.close()
+
+    def invalidar(self, **kwargs):
+        """Elimina las estadísticas cacheadas (receptor de señales)"""
+        cache.delete(self.clave_cache)
+
+    def conectar_senales(self):
+        """Conecta la invalidación a post_save y post_delete del modelo"""
+        uid = f'{self.clave_cache}:invalidar'
+        post_save.connect(self.invalidar, sender=self.modelo, weak=False, dispatch_uid=uid)
+        post_delete.connect(self.invalidar, sender=self.modelo, weak=False, dispatch_uid=uid)
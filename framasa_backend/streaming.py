@@ -0,0 +1,59 @@
+"""
+Respuestas JSON en streaming para listados grandes
+"""
+from django.http import StreamingHttpResponse
+
+from framasa_backend.db_router import fijar_lectura
+from framasa_backend.renderers import dumps
+
+CHUNK_SIZE_DEFAULT = 2000
+CHUNK_SIZE_MAXIMO = 10000
+
+
+def obtener_chunk_size(request, default=CHUNK_SIZE_DEFAULT):
+    """Lee ?chunk_size= del request, limitado a un rango razonable"""
+    try:
+        chunk_size = int(request.query_params.get('chunk_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(chunk_size, CHUNK_SIZE_MAXIMO))
+
+
+def generar_json_array(filas, chunk_size=CHUNK_SIZE_DEFAULT):
+    """
+    Genera un array JSON (bytes) por bloques a partir de un iterable de diccionarios
+    """
+    yield b'['
+    bloque = []
+    primero = True
+    for fila in filas:
+        bloque.append(dumps(fila))
+        if len(bloque) >= chunk_size:
+            yield (b'' if primero else b',') + b','.join(bloque)
+            primero = False
+            bloque = []
+    if bloque:
+        yield (b'' if primero else b',') + b','.join(bloque)
+    yield b']'
+
+
+def stream_queryset(queryset, serializer, chunk_size=CHUNK_SIZE_DEFAULT):
+    """
+    Devuelve un StreamingHttpResponse con el queryset serializado fila por fila
+
+    Las filas se leen con iterator(chunk_size=...) para no cargar la tabla completa
+    en memoria; el formato es el mismo array que devuelve el listado sin paginar.
+    Si el serializer tiene ruta rápida (SerializacionRapidaMixin) se usa values_list().
+    """
+    queryset = fijar_lectura(queryset)
+    if hasattr(serializer, 'iterar_valores'):
+        filas = serializer.iterar_valores(queryset, chunk_size)
+    else:
+        filas = (
+            serializer.to_representation(instance)
+            for instance in queryset.iterator(chunk_size=chunk_size)
+        )
+    return StreamingHttpResponse(
+        generar_json_array(filas, chunk_size),
+        content_type='application/json'
+    )
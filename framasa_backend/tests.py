@@ -0,0 +1,386 @@
+import datetime
+import gzip
+import json
+from types import SimpleNamespace
+
+import brotli
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    AsyncClient, AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase,
+    override_settings
+)
+from rest_framework.permissions import BasePermission
+from rest_framework.test import APIClient
+
+from authentication.models import Usuario
+from authentication.tokens import UsuarioRefreshToken
+from bloquera.models import ProductoBloquera
+from ferreteria.models import Producto, CategoriaProducto, UnidadMedida
+from ferreteria.views import ProductoViewSet
+from piedrinera.models import AgregadoPiedrinera, Camion
+from planillas.models import Empleado
+from . import db_router
+from .middleware import CompresionMiddleware, InstrumentacionMiddleware, ReplicaLecturaMiddleware
+from .vistas_async import vista_detalle
+
+REPLICA = {**settings.DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
+
+@override_settings(
+    DATABASES={**settings.DATABASES, 'replica_1': REPLICA},
+    DB_REPLICA_STICKY_SEGUNDOS=5,
+)
+class RouterReplicasTests(SimpleTestCase):
+    """Ruteo de lecturas con un alias de réplica (TEST['MIRROR'] = 'default')"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = SimpleNamespace(pk=7, is_authenticated=True)
+
+    def peticion(self, metodo='get', status=200):
+        """
+        Ejecuta una petición por ReplicaLecturaMiddleware y devuelve las bases
+        que eligió el router durante la vista
+        """
+        bases = {}
+
+        def vista(request):
+            # Como DRF, la vista asigna el usuario autenticado a la HttpRequest
+            request.user = self.usuario
+            bases['lectura'] = router.db_for_read(Producto)
+            bases['escritura'] = router.db_for_write(Producto)
+            bases['fijada'] = db_router.fijar_lectura(Producto.objects.all()).db
+            return HttpResponse(status=status)
+
+        request = getattr(RequestFactory(), metodo)('/api/ferreteria/productos/')
+        ReplicaLecturaMiddleware(vista)(request)
+        return bases
+
+    def test_alias_de_replicas(self):
+        self.assertEqual(db_router.alias_replicas(), ['replica_1'])
+
+    def test_get_lee_de_la_replica_y_escribe_en_default(self):
+        bases = self.peticion()
+
+        self.assertEqual(bases['lectura'], 'replica_1')
+        self.assertEqual(bases['escritura'], 'default')
+        # Los querysets de las respuestas en streaming quedan fijos en la réplica
+        self.assertEqual(bases['fijada'], 'replica_1')
+
+    def test_fuera_de_una_peticion_get_se_usa_default(self):
+        self.assertEqual(router.db_for_read(Producto), 'default')
+        self.assertEqual(self.peticion('post')['lectura'], 'default')
+
+    def test_lecturas_despues_de_una_escritura_van_a_default(self):
+        self.peticion('post', status=201)
+
+        bases = self.peticion()
+
+        self.assertEqual(bases['lectura'], 'default')
+        self.assertEqual(bases['fijada'], 'default')
+
+    def test_escritura_fallida_no_activa_la_ventana(self):
+        self.peticion('post', status=400)
+
+        self.assertEqual(self.peticion()['lectura'], 'replica_1')
+
+    def test_ventana_por_usuario(self):
+        self.peticion('post', status=201)
+        self.usuario = SimpleNamespace(pk=8, is_authenticated=True)
+
+        self.assertEqual(self.peticion()['lectura'], 'replica_1')
+
+    def test_contextvar_se_reinicia_entre_peticiones(self):
+        self.assertEqual(self.peticion()['lectura'], 'replica_1')
+        self.assertIsNone(db_router._lectura_actual.get())
+
+        # La base elegida en una petición no pasa a la siguiente
+        db_router.registrar_escritura(self.usuario.pk)
+        self.assertEqual(self.peticion()['lectura'], 'default')
+        self.assertIsNone(db_router._lectura_actual.get())
+
+    def test_contextvar_se_reinicia_si_la_vista_falla(self):
+        def vista(request):
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            ReplicaLecturaMiddleware(vista)(RequestFactory().get('/'))
+
+        self.assertIsNone(db_router._lectura_actual.get())
+
+
+class SinPermisoDeObjeto(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return False
+
+
+class ProductoSinPermisoDeObjetoViewSet(ProductoViewSet):
+    permission_classes = ProductoViewSet.permission_classes + [SinPermisoDeObjeto]
+
+
+class VistasAsyncTests(TransactionTestCase):
+    """
+    Cada ruta de /api/async/ responde lo mismo que su endpoint síncrono
+
+    TransactionTestCase: las estadísticas combinadas consultan en hilos con
+    su propia conexión, que no verían datos de una transacción sin confirmar.
+    """
+
+    def setUp(self):
+        cache.clear()
+        categoria = CategoriaProducto.objects.create(nombre='Tubería')
+        unidad = UnidadMedida.objects.create(nombre='Unidad', abreviatura='u')
+        self.producto = Producto.objects.create(
+            codigo='T001', nombre='Tubo PVC', categoria=categoria, unidad_medida=unidad,
+            precio_venta='12.50', costo_unitario='10.00', stock_actual=2, stock_minimo=3,
+        )
+        Producto.objects.create(
+            codigo='C001', nombre='Codo', categoria=categoria, unidad_medida=unidad,
+            precio_venta='3.00', costo_unitario='2.00', stock_actual=10, stock_minimo=1, activo=False,
+        )
+        ProductoBloquera.objects.create(
+            codigo='B1', nombre='Block 15', tipo_bloque='pómez', precio_unitario='4.25',
+            costo_produccion='3', stock_actual=2, stock_minimo=5,
+        )
+        AgregadoPiedrinera.objects.create(
+            codigo='A1', nombre='Arena', tipo='arena', precio_venta_m3='150.00',
+            stock_actual_m3='1.50', stock_minimo_m3='5',
+        )
+        self.camion = Camion.objects.create(
+            placa='C123', marca='Volvo', modelo='FH', capacidad_m3='12.00', estado_actual='activo',
+            fecha_proximo_mantenimiento=datetime.date(2026, 1, 2),
+        )
+        Empleado.objects.create(
+            codigo_empleado='E1', nombres='Ana', apellidos='Pérez', puesto='Operador',
+            salario_base_q='3500.00', fecha_contratacion=datetime.date(2020, 1, 1),
+        )
+        usuario = Usuario.objects.create_user('admin', password='x', rol='admin')
+        self.token = str(UsuarioRefreshToken.for_user(usuario).access_token)
+
+    def get_sync(self, url):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return client.get(url)
+
+    def get_async(self, url, token=None):
+        headers = {'Authorization': f'Bearer {token or self.token}'}
+        return async_to_sync(AsyncClient().get)(url.replace('/api/', '/api/async/'), headers=headers)
+
+    def assertMismaRespuesta(self, url):
+        sincrona = self.get_sync(url)
+        asincrona = self.get_async(url)
+
+        self.assertEqual(asincrona.status_code, sincrona.status_code, url)
+        self.assertEqual(asincrona.content, sincrona.content, url)
+        return asincrona
+
+    def test_listados(self):
+        for url in (
+            '/api/ferreteria/productos/',
+            '/api/ferreteria/productos/?search=tubo&estado=activo',
+            '/api/ferreteria/productos/?fields=codigo,nombre',
+            '/api/bloquera/productos/',
+            '/api/piedrinera/productos/',
+            '/api/piedrinera/camiones/',
+            '/api/planillas/empleados/?estado=activo',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.assertMismaRespuesta(url).status_code, 200)
+
+    def test_detalles(self):
+        for url in (
+            f'/api/ferreteria/productos/{self.producto.pk}/',
+            f'/api/ferreteria/productos/{self.producto.pk}/?fields=codigo,precioVenta',
+            f'/api/piedrinera/camiones/{self.camion.pk}/',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.assertMismaRespuesta(url).status_code, 200)
+
+    def test_detalle_inexistente_o_pk_invalido(self):
+        for url in ('/api/ferreteria/productos/999999/', '/api/ferreteria/productos/abc/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.assertMismaRespuesta(url).status_code, 404)
+
+    def test_estadisticas(self):
+        for url in (
+            '/api/ferreteria/productos/stats/',
+            '/api/bloquera/productos/stats/',
+            '/api/piedrinera/productos/stats/',
+            '/api/planillas/empleados/stats/',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.assertMismaRespuesta(url).status_code, 200)
+
+    def test_estadisticas_combinadas(self):
+        response = self.get_async('/api/stats/')
+
+        self.assertEqual(response.status_code, 200)
+        combinadas = json.loads(response.content)
+        for seccion, url in (
+            ('ferreteria', '/api/ferreteria/productos/stats/'),
+            ('bloquera', '/api/bloquera/productos/stats/'),
+            ('piedrinera', '/api/piedrinera/productos/stats/'),
+            ('planillas', '/api/planillas/empleados/stats/'),
+        ):
+            with self.subTest(seccion=seccion):
+                self.assertEqual(combinadas[seccion], self.get_sync(url).json())
+
+    def test_sin_token(self):
+        response = async_to_sync(AsyncClient().get)('/api/async/ferreteria/productos/')
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_detalle_verifica_permisos_de_objeto(self):
+        vista = vista_detalle(ProductoSinPermisoDeObjetoViewSet)
+        request = AsyncRequestFactory().get('/', headers={'Authorization': f'Bearer {self.token}'})
+
+        response = async_to_sync(vista)(request, pk=str(self.producto.pk))
+
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(
+    INSTRUMENTACION_ACTIVA=True, DEBUG=False, INTERNAL_IPS=[],
+    INSTRUMENTACION_UMBRAL_LENTO_MS=500, INSTRUMENTACION_UMBRAL_N1=3,
+)
+class InstrumentacionMiddlewareTests(TestCase):
+
+    def consultar(self, veces=1):
+        for _ in range(veces):
+            list(Producto.objects.all())
+
+    def peticion(self, vista, ip='10.0.0.5'):
+        """Ejecuta la vista por el middleware; devuelve (response, registros del log)"""
+        with self.assertLogs('framasa.rendimiento', level='DEBUG') as logs:
+            response = InstrumentacionMiddleware(vista)(RequestFactory().get('/api/x/', REMOTE_ADDR=ip))
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response, logs.records
+
+    def vista(self, request):
+        self.consultar()
+        return HttpResponse('ok')
+
+    def test_desactivada_por_defecto_sin_debug(self):
+        with self.settings(), self.assertNoLogs('framasa.rendimiento', level='DEBUG'):
+            del settings.INSTRUMENTACION_ACTIVA
+            InstrumentacionMiddleware(self.vista)(RequestFactory().get('/'))
+
+    def test_server_timing_solo_con_debug_o_ip_interna(self):
+        response, registros = self.peticion(self.vista)
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(registros[0].rendimiento['consultas'], 1)
+
+        with self.settings(INTERNAL_IPS=['10.0.0.5']):
+            response, _ = self.peticion(self.vista)
+        self.assertIn('1 consultas', response['Server-Timing'])
+
+        with self.settings(DEBUG=True):
+            response, _ = self.peticion(self.vista)
+        self.assertTrue(response.has_header('Server-Timing'))
+
+    def test_nivel_del_log(self):
+        _, registros = self.peticion(self.vista)
+        self.assertEqual(registros[0].levelname, 'DEBUG')
+
+        with self.settings(INSTRUMENTACION_UMBRAL_LENTO_MS=-1):
+            _, registros = self.peticion(self.vista)
+        self.assertEqual(registros[0].levelname, 'WARNING')
+        self.assertIn('lento=True', registros[0].getMessage())
+
+        def vista_n_mas_1(request):
+            self.consultar(5)
+            return HttpResponse('ok')
+
+        _, registros = self.peticion(vista_n_mas_1)
+        self.assertEqual(registros[0].levelname, 'WARNING')
+        self.assertIn('posible_n+1', registros[0].getMessage())
+
+    def test_cuenta_las_consultas_del_streaming(self):
+        def vista(request):
+            self.consultar()
+
+            def contenido():
+                for _ in range(2):
+                    self.consultar()
+                    yield b'x'
+
+            return StreamingHttpResponse(contenido())
+
+        _, registros = self.peticion(vista)
+
+        self.assertEqual(len(registros), 1)
+        self.assertEqual(registros[0].rendimiento['consultas'], 3)
+
+
+@override_settings(COMPRESION_ACTIVA=True, COMPRESION_UMBRAL_BYTES=1024)
+class CompresionMiddlewareTests(SimpleTestCase):
+    cuerpo = json.dumps([{'codigo': f'P{i:04d}', 'nombre': 'Tubo PVC', 'precioVenta': 12.5} for i in range(200)])
+
+    def peticion(self, accept_encoding, cuerpo=None, ruta='/api/ferreteria/productos/',
+                 content_type='application/json'):
+        def vista(request):
+            response = HttpResponse(self.cuerpo if cuerpo is None else cuerpo, content_type=content_type)
+            response['ETag'] = '"abc"'
+            return response
+
+        request = RequestFactory().get(ruta, HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompresionMiddleware(vista)(request)
+
+    def test_negociacion(self):
+        for accept_encoding, esperado in (
+            ('gzip, deflate, br', 'br'),
+            ('gzip', 'gzip'),
+            ('br;q=0.5, gzip;q=0.8', 'gzip'),
+            ('*', 'br'),
+            ('*;q=0.5, br;q=0', 'gzip'),
+            ('gzip;q=0', None),
+            ('identity', None),
+            ('', None),
+        ):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.peticion(accept_encoding)
+
+                self.assertEqual(response.get('Content-Encoding'), esperado)
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_el_contenido_se_descomprime_igual(self):
+        response = self.peticion('gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), self.cuerpo)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+        response = self.peticion('br')
+        self.assertEqual(brotli.decompress(response.content).decode(), self.cuerpo)
+
+    def test_sin_compresion(self):
+        for nombre, argumentos in (
+            ('menor al umbral', {'cuerpo': '{"ok": true}'}),
+            ('binario', {'content_type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'}),
+            ('tokens de /api/auth/', {'ruta': '/api/auth/login/'}),
+        ):
+            with self.subTest(nombre):
+                response = self.peticion('gzip, br', **argumentos)
+
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response['ETag'], '"abc"')
+
+    def test_streaming_por_bloques(self):
+        bloques = [self.cuerpo[i:i + 1000].encode() for i in range(0, len(self.cuerpo), 1000)]
+
+        for codificacion, descomprimir in (('gzip', gzip.decompress), ('br', brotli.decompress)):
+            with self.subTest(codificacion=codificacion):
+                request = RequestFactory().get('/api/ferreteria/productos/', HTTP_ACCEPT_ENCODING=codificacion)
+                response = CompresionMiddleware(
+                    lambda request: StreamingHttpResponse(iter(bloques), content_type='application/json')
+                )(request)
+
+                self.assertEqual(response['Content-Encoding'], codificacion)
+                comprimidos = list(response.streaming_content)
+                # Un bloque comprimido por cada bloque original, más el cierre del compresor
+                self.assertEqual(len(comprimidos), len(bloques) + 1)
+                self.assertEqual(descomprimir(b''.join(comprimidos)).decode(), self.cuerpo)
@@ -4,6 +4,9 @@ URL configuration for framasa_backend project.
 from django.contrib import admin
 from django.urls import path, include
 
+from framasa_backend.conexiones import MetricasConexionesView
+from productos.views import ValuacionView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('authentication.urls')),
@@ -11,5 +14,14 @@ urlpatterns = [
     path('api/bloquera/', include('bloquera.urls')),
     path('api/piedrinera/', include('piedrinera.urls')),
     path('api/planillas/', include('planillas.urls')),
+    path('api/alertas/', include('productos.urls')),
+    path('api/valuacion/', ValuacionView.as_view(), name='valuacion-inventario'),
+    path('api/precios/', include('productos.urls_precios')),
+    # Inventario de las tres unidades (sugerencias de reorden desde el kardex)
+    path('api/inventario/', include('productos.urls_inventario')),
+    # Variantes asíncronas (ASGI) de los endpoints de lectura
+    path('api/async/', include('framasa_backend.urls_async')),
+    # Monitoreo
+    path('api/admin/conexiones/', MetricasConexionesView.as_view(), name='metricas-conexiones'),
 ]
 
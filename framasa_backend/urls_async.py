@@ -0,0 +1,49 @@
+"""
+Rutas de las vistas asíncronas de solo lectura (/api/async/)
+
+Mismos filtros, permisos y formato que los endpoints síncronos equivalentes;
+pensadas para ejecutarse con un servidor ASGI (uvicorn).
+"""
+from django.urls import path
+
+from bloquera.estadisticas import productos_bloquera_stats
+from bloquera.serializers import ProductosBloqueraStatsSerializer
+from bloquera.views import ProductoBloqueraViewSet
+from ferreteria.estadisticas import productos_stats
+from ferreteria.serializers import ProductosStatsSerializer
+from ferreteria.views import ProductoViewSet
+from piedrinera.estadisticas import agregados_stats
+from piedrinera.serializers import AgregadosStatsSerializer
+from piedrinera.views import AgregadoPiedrineraViewSet, CamionViewSet
+from planillas.estadisticas import empleados_stats
+from planillas.serializers import EmpleadosStatsSerializer
+from planillas.views import EmpleadoViewSet
+
+from .vistas_async import vista_detalle, vista_lista, vista_stats, vista_stats_combinadas
+
+CATALOGOS = (
+    ('ferreteria/productos', ProductoViewSet, productos_stats, ProductosStatsSerializer),
+    ('bloquera/productos', ProductoBloqueraViewSet, productos_bloquera_stats, ProductosBloqueraStatsSerializer),
+    ('piedrinera/productos', AgregadoPiedrineraViewSet, agregados_stats, AgregadosStatsSerializer),
+    ('piedrinera/camiones', CamionViewSet, None, None),
+    ('planillas/empleados', EmpleadoViewSet, empleados_stats, EmpleadosStatsSerializer),
+)
+
+urlpatterns = [
+    # Estadísticas de las cuatro unidades consultadas en paralelo
+    path('stats/', vista_stats_combinadas(ProductoViewSet, {
+        'ferreteria': (productos_stats, ProductosStatsSerializer),
+        'bloquera': (productos_bloquera_stats, ProductosBloqueraStatsSerializer),
+        'piedrinera': (agregados_stats, AgregadosStatsSerializer),
+        'planillas': (empleados_stats, EmpleadosStatsSerializer),
+    })),
+]
+
+for prefijo, viewset_class, motor, stats_serializer in CATALOGOS:
+    if motor is not None:
+        # Antes que <pk>/ para que 'stats' no se tome como id
+        urlpatterns.append(path(f'{prefijo}/stats/', vista_stats(viewset_class, motor, stats_serializer)))
+    urlpatterns += [
+        path(f'{prefijo}/', vista_lista(viewset_class)),
+        path(f'{prefijo}/<str:pk>/', vista_detalle(viewset_class)),
+    ]
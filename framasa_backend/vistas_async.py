@@ -0,0 +1,171 @@
+"""
+Vistas asíncronas (ASGI) de solo lectura para los catálogos
+
+Reutilizan los ViewSets síncronos para autenticación, permisos y filtros
+(get_queryset/filter_queryset construyen el queryset sin tocar la base de
+datos) y ejecutan las consultas con el ORM asíncrono de Django (aget,
+aaggregate y lectura por bloques), de modo que
+una consulta lenta no bloquea al worker mientras espera a la base de datos.
+
+Las respuestas tienen el mismo formato que los endpoints síncronos.
+Se publican bajo /api/async/ (ver framasa_backend/urls.py).
+"""
+import asyncio
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from rest_framework.exceptions import NotFound
+
+from framasa_backend.renderers import dumps
+
+CHUNK_SIZE_ASYNC = 2000
+
+
+def _respuesta_json(data, status=200):
+    return HttpResponse(dumps(data), content_type='application/json', status=status)
+
+
+async def aiterar(queryset, chunk_size=CHUNK_SIZE_ASYNC):
+    """
+    Igual que queryset.aiterator(chunk_size): lee por bloques en el hilo síncrono
+
+    En Django 5.0.1 aiterator() sobre values_list() ejecuta la consulta en el
+    hilo del event loop (SynchronousOnlyOperation); iterator() es un
+    generador, así que crearlo aquí no toca la base de datos.
+    """
+    generador = queryset.iterator(chunk_size=chunk_size)
+
+    def siguiente_bloque():
+        return list(islice(generador, chunk_size))
+
+    while True:
+        bloque = await sync_to_async(siguiente_bloque)()
+        for fila in bloque:
+            yield fila
+        if len(bloque) < chunk_size:
+            break
+
+
+def _preparar_viewset(viewset_class, request, action, **kwargs):
+    """
+    Instancia el ViewSet y ejecuta initial() (autenticación, permisos y
+    throttling de DRF). Devuelve (viewset, None) o (None, respuesta de error)
+    """
+    viewset = viewset_class(action_map={'get': action}, args=(), kwargs=kwargs, format_kwarg=None)
+    drf_request = viewset.initialize_request(request, **kwargs)
+    viewset.request = drf_request
+    viewset.headers = viewset.default_response_headers
+    try:
+        viewset.initial(drf_request)
+    except Exception as exc:
+        return None, _respuesta_error(viewset, exc)
+    return viewset, None
+
+
+def _respuesta_error(viewset, exc):
+    """Respuesta de error de DRF (401, 403, 404...) para una excepción del ViewSet"""
+    response = viewset.finalize_response(viewset.request, viewset.handle_exception(exc))
+    return response.render()
+
+
+async def preparar_viewset(viewset_class, request, action, **kwargs):
+    # La autenticación puede consultar la base de datos o la caché (código síncrono)
+    return await sync_to_async(_preparar_viewset)(viewset_class, request, action, **kwargs)
+
+
+def vista_lista(viewset_class):
+    """
+    GET asíncrono equivalente al list() del ViewSet (listado sin paginar)
+
+    Usa la ruta rápida del serializer de listado (SerializacionRapidaMixin)
+    cuando el ViewSet la ofrece.
+    """
+    async def vista(request):
+        viewset, error = await preparar_viewset(viewset_class, request, 'list')
+        if error is not None:
+            return error
+
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        serializer_class = viewset.get_serializer_class()
+        if not hasattr(serializer_class, 'valores'):
+            # Serializer completo (p. ej. con ?fields=): se serializa en el hilo síncrono
+            serializer = viewset.get_serializer(queryset, many=True)
+            return _respuesta_json(await sync_to_async(lambda: serializer.data)())
+        fila_a_dict = serializer_class.fila_a_dict
+        filas = [
+            fila_a_dict(fila)
+            async for fila in aiterar(serializer_class.valores(queryset))
+        ]
+        return _respuesta_json(filas)
+
+    return vista
+
+
+def vista_detalle(viewset_class):
+    """
+    GET asíncrono equivalente al retrieve() del ViewSet
+
+    Igual que get_object(): busca en filter_queryset(get_queryset()) por
+    lookup_field y verifica los permisos de objeto antes de serializar.
+    """
+    async def vista(request, pk):
+        viewset, error = await preparar_viewset(viewset_class, request, 'retrieve', pk=pk)
+        if error is not None:
+            return error
+
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        try:
+            instance = await queryset.aget(**{viewset.lookup_field: pk})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, DjangoValidationError):
+            return _respuesta_error(viewset, NotFound())
+
+        def serializar():
+            try:
+                viewset.check_object_permissions(viewset.request, instance)
+            except Exception as exc:
+                return _respuesta_error(viewset, exc)
+            return _respuesta_json(viewset.get_serializer(instance).data)
+
+        # Los permisos de objeto y los campos relacionados pueden consultar la base de datos
+        return await sync_to_async(serializar)()
+
+    return vista
+
+
+def vista_stats(viewset_class, motor, serializer_class):
+    """GET asíncrono de las estadísticas de un catálogo (MotorEstadisticas)"""
+    async def vista(request):
+        _, error = await preparar_viewset(viewset_class, request, 'stats')
+        if error is not None:
+            return error
+        return _respuesta_json(serializer_class(await motor.aobtener()).data)
+
+    return vista
+
+
+def vista_stats_combinadas(viewset_class, secciones):
+    """
+    GET asíncrono con las estadísticas de varias unidades de negocio
+
+    Args:
+        viewset_class: ViewSet cuyos permisos se aplican
+        secciones: dict {nombre: (motor, serializer_class)}
+
+    Las consultas de cada unidad se ejecutan en paralelo con asyncio.gather.
+    """
+    async def vista(request):
+        _, error = await preparar_viewset(viewset_class, request, 'stats')
+        if error is not None:
+            return error
+
+        resultados = await asyncio.gather(
+            *(motor.aobtener(paralelo=True) for motor, _ in secciones.values())
+        )
+        return _respuesta_json({
+            nombre: serializer_class(stats).data
+            for (nombre, (_, serializer_class)), stats in zip(secciones.items(), resultados)
+        })
+
+    return vista
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PiedrineraConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'piedrinera'
+
+    def ready(self):
+        # Invalidar la caché de estadísticas cuando cambian los datos
+        from .estadisticas import agregados_stats
+        agregados_stats.conectar_senales()
@@ -0,0 +1,12 @@
+from django.db.models import Count, Q
+from framasa_backend.stats import MotorEstadisticas
+from .models import AgregadoPiedrinera
+
+
+agregados_stats = MotorEstadisticas(AgregadoPiedrinera, {
+    'total_agregados': Count('id'),
+    'agregados_activos': Count('id', filter=Q(activo=True)),
+    'agregados_inactivos': Count('id', filter=Q(activo=False)),
+    # Agregados con stock bajo (columna generada stock_actual_m3 <= stock_minimo_m3)
+    'agregados_stock_bajo': Count('id', filter=Q(stock_bajo=True)),
+})
@@ -0,0 +1,19 @@
+"""
+Índices GIN pg_trgm para la búsqueda por texto (?search=)
+Solo se crean en PostgreSQL; en otros motores la migración no hace nada
+"""
+from django.db import migrations
+
+from framasa_backend.migraciones import CrearIndicesTrigram
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('piedrinera', '0001_initial'),
+    ]
+
+    operations = [
+        CrearIndicesTrigram('agregados_piedrinera', ['codigo', 'nombre', 'tipo', 'proveedor']),
+        CrearIndicesTrigram('camiones', ['placa', 'marca', 'modelo']),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('piedrinera', '0002_indices_trigram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agregadopiedrinera',
+            index=models.Index(fields=['updated_at'], name='idx_agregados_updated_at'),
+        ),
+        migrations.AddIndex(
+            model_name='camion',
+            index=models.Index(fields=['updated_at'], name='idx_camiones_updated_at'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('piedrinera', '0003_agregadopiedrinera_idx_agregados_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agregadopiedrinera',
+            name='stock_bajo',
+            field=models.GeneratedField(db_column='stock_bajo', db_persist=True, expression=models.ExpressionWrapper(models.Q(('stock_actual_m3__lte', models.F('stock_minimo_m3'))), output_field=models.BooleanField()), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='agregadopiedrinera',
+            index=models.Index(condition=models.Q(('activo', True), ('stock_bajo', True)), fields=['codigo'], name='idx_agregados_stock_bajo'),
+        ),
+    ]
@@ -43,6 +43,16 @@ class AgregadoPiedrinera(models.Model):
         validators=[MinValueValidator(0)],
         db_column='stock_minimo_m3'
     )
+    # Columna generada (STORED): la base de datos la recalcula en cada cambio de stock,
+    # también en update() con F() y bulk_create(), y sirve al índice parcial de alertas
+    stock_bajo = models.GeneratedField(
+        expression=models.ExpressionWrapper(
+            models.Q(stock_actual_m3__lte=models.F('stock_minimo_m3')), output_field=models.BooleanField()
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+        db_column='stock_bajo'
+    )
     
     ubicacion = models.CharField(max_length=100, blank=True, null=True, db_column='ubicacion')
     humedad_porcentaje = models.DecimalField(
@@ -70,6 +80,12 @@ class AgregadoPiedrinera(models.Model):
             models.Index(fields=['nombre'], name='idx_agregados_nombre'),
             models.Index(fields=['tipo'], name='idx_agregados_tipo'),
             models.Index(fields=['proveedor'], name='idx_agregados_proveedor'),
+            models.Index(fields=['updated_at'], name='idx_agregados_updated_at'),
+            # Índice parcial: solo contiene los agregados activos con stock bajo
+            models.Index(
+                fields=['codigo'], name='idx_agregados_stock_bajo',
+                condition=models.Q(stock_bajo=True, activo=True),
+            ),
         ]
         constraints = [
             models.CheckConstraint(
@@ -147,6 +163,7 @@ class Camion(models.Model):
             models.Index(fields=['marca', 'modelo'], name='idx_camiones_marca_modelo'),
             models.Index(fields=['estado_actual'], name='idx_camiones_estado'),
             models.Index(fields=['fecha_proximo_mantenimiento'], name='idx_camiones_prox_mant'),
+            models.Index(fields=['updated_at'], name='idx_camiones_updated_at'),
         ]
         constraints = [
             models.CheckConstraint(
@@ -1,10 +1,12 @@
 from rest_framework import serializers
+from framasa_backend.serializers import CamposDinamicosMixin, SerializacionRapidaMixin, fecha_iso
 from .models import AgregadoPiedrinera, Camion
 
 
-class AgregadoPiedrineraSerializer(serializers.ModelSerializer):
+class AgregadoPiedrineraSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer para agregados de piedrinera con información completa
+    Admite ?fields= y ?format_style=camel|snake|both (CamposDinamicosMixin)
     """
     # Campos calculados
     tiene_stock_bajo = serializers.BooleanField(read_only=True)
@@ -23,12 +25,32 @@ class AgregadoPiedrineraSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'created_at', 'updated_at')
 
+    campos_comunes = (
+        'id', 'codigo', 'nombre', 'descripcion', 'tipo', 'granulometria',
+        'ubicacion', 'calidad', 'proveedor', 'activo',
+    )
+    campos_snake = (
+        'precio_venta_m3', 'costo_produccion_m3', 'stock_actual_m3', 'stock_minimo_m3',
+        'humedad_porcentaje', 'fecha_ultima_entrada', 'tiene_stock_bajo',
+    )
+    campos_camel = {
+        'precioVentaPorMetroCubico': 'precio_venta_m3',
+        'costoProduccionPorMetroCubico': 'costo_produccion_m3',
+        'stockActualMetrosCubicos': 'stock_actual_m3',
+        'stockMinimoMetrosCubicos': 'stock_minimo_m3',
+        'humedadPorcentaje': 'humedad_porcentaje',
+        'fechaUltimaEntrada': 'fecha_ultima_entrada',
+        'fechaCreacion': 'created_at',
+        'ultimaActualizacion': 'updated_at',
+    }
+    columnas_extra = {'tiene_stock_bajo': ('stock_actual_m3', 'stock_minimo_m3')}
+
     def to_representation(self, instance):
         """
         Personalizar la representación para que coincida con el formato esperado por el frontend
         """
         data = super().to_representation(instance)
-        return {
+        return self.proyectar({
             'id': str(data.get('id', '')),
             'codigo': data.get('codigo', ''),
             'nombre': data.get('nombre', ''),
@@ -56,13 +78,19 @@ class AgregadoPiedrineraSerializer(serializers.ModelSerializer):
             'fechaUltimaEntrada': data.get('fecha_ultima_entrada', ''),
             'fechaCreacion': data.get('created_at', ''),
             'ultimaActualizacion': data.get('updated_at', ''),
-        }
+        })
 
 
-class AgregadoPiedrineraListSerializer(serializers.ModelSerializer):
+class AgregadoPiedrineraListSerializer(SerializacionRapidaMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar agregados
     """
+    campos_valores = (
+        'id', 'codigo', 'nombre', 'tipo', 'granulometria',
+        'precio_venta_m3', 'stock_actual_m3', 'stock_minimo_m3',
+        'activo', 'ubicacion', 'calidad', 'proveedor'
+    )
+
     class Meta:
         model = AgregadoPiedrinera
         fields = (
@@ -88,6 +116,25 @@ class AgregadoPiedrineraListSerializer(serializers.ModelSerializer):
             'proveedor': data.get('proveedor', ''),
         }
 
+    @staticmethod
+    def fila_a_dict(fila):
+        (id, codigo, nombre, tipo, granulometria, precio_venta_m3, stock_actual_m3,
+         stock_minimo_m3, activo, ubicacion, calidad, proveedor) = fila
+        return {
+            'id': str(id),
+            'codigo': codigo,
+            'nombre': nombre,
+            'tipo': tipo,
+            'granulometria': granulometria,
+            'precioVenta': float(precio_venta_m3),
+            'stock': float(stock_actual_m3),
+            'stockMinimo': float(stock_minimo_m3),
+            'activo': activo,
+            'ubicacion': ubicacion,
+            'calidad': calidad,
+            'proveedor': proveedor,
+        }
+
 
 class AgregadosStatsSerializer(serializers.Serializer):
     """
@@ -99,9 +146,10 @@ class AgregadosStatsSerializer(serializers.Serializer):
     agregados_stock_bajo = serializers.IntegerField()
 
 
-class CamionSerializer(serializers.ModelSerializer):
+class CamionSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer para camiones con información completa
+    Admite ?fields= y ?format_style=camel|snake|both (CamposDinamicosMixin)
     """
     class Meta:
         model = Camion
@@ -116,12 +164,30 @@ class CamionSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'created_at', 'updated_at')
 
+    campos_comunes = ('id', 'placa', 'marca', 'modelo', 'kilometraje', 'observaciones', 'activo')
+    campos_snake = (
+        'capacidad_m3', 'estado_actual', 'fecha_ultimo_mantenimiento', 'fecha_proximo_mantenimiento',
+        'horas_operacion', 'consumo_l_100km', 'seguro_vigente', 'revision_tecnica_vigente',
+        'documentacion_vigente', 'created_at', 'updated_at',
+    )
+    campos_camel = {
+        'capacidadMetrosCubicos': 'capacidad_m3',
+        'estado': 'estado_actual',
+        'ultimoMantenimiento': 'fecha_ultimo_mantenimiento',
+        'proximoMantenimiento': 'fecha_proximo_mantenimiento',
+        'horasOperacion': 'horas_operacion',
+        'consumoCombustible': 'consumo_l_100km',
+        'seguroVigente': 'seguro_vigente',
+        'revisionTecnicaVigente': 'revision_tecnica_vigente',
+        'documentacionVigente': 'documentacion_vigente',
+    }
+
     def to_representation(self, instance):
         """
         Personalizar la representación para que coincida con el formato esperado por el frontend
         """
         data = super().to_representation(instance)
-        return {
+        return self.proyectar({
             'id': str(data.get('id', '')),
             'placa': data.get('placa', ''),
             'marca': data.get('marca', ''),
@@ -150,13 +216,21 @@ class CamionSerializer(serializers.ModelSerializer):
             'seguroVigente': data.get('seguro_vigente', True),
             'revisionTecnicaVigente': data.get('revision_tecnica_vigente', True),
             'documentacionVigente': data.get('documentacion_vigente', True),
-        }
+        })
 
 
-class CamionListSerializer(serializers.ModelSerializer):
+class CamionListSerializer(SerializacionRapidaMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar camiones
     """
+    campos_valores = (
+        'id', 'placa', 'marca', 'modelo',
+        'capacidad_m3', 'estado_actual',
+        'fecha_proximo_mantenimiento',
+        'seguro_vigente', 'revision_tecnica_vigente', 'documentacion_vigente',
+        'activo'
+    )
+
     class Meta:
         model = Camion
         fields = (
@@ -183,3 +257,20 @@ class CamionListSerializer(serializers.ModelSerializer):
             'activo': data.get('activo', True),
         }
 
+    @staticmethod
+    def fila_a_dict(fila):
+        (id, placa, marca, modelo, capacidad_m3, estado_actual, fecha_proximo_mantenimiento,
+         seguro_vigente, revision_tecnica_vigente, documentacion_vigente, activo) = fila
+        return {
+            'id': str(id),
+            'placa': placa,
+            'marca': marca,
+            'modelo': modelo,
+            'capacidadMetrosCubicos': float(capacidad_m3),
+            'estado': estado_actual,
+            'proximoMantenimiento': fecha_iso(fecha_proximo_mantenimiento),
+            'seguroVigente': seguro_vigente,
+            'revisionTecnicaVigente': revision_tecnica_vigente,
+            'documentacionVigente': documentacion_vigente,
+            'activo': activo,
+        }
@@ -1,9 +1,12 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, F
+from framasa_backend.mixins import (
+    ExportacionMixin, ListaRapidaMixin, ProyeccionCamposMixin, SincronizacionMixin, ValidacionCondicionalMixin
+)
+from framasa_backend.search import aplicar_busqueda, ordenar_por_relevancia
 from .models import AgregadoPiedrinera, Camion
+from .estadisticas import agregados_stats
 from .serializers import (
     AgregadoPiedrineraSerializer,
     AgregadoPiedrineraListSerializer,
@@ -13,17 +16,35 @@ from .serializers import (
 )
 
 
-class AgregadoPiedrineraViewSet(viewsets.ModelViewSet):
+class AgregadoPiedrineraViewSet(ValidacionCondicionalMixin, SincronizacionMixin, ExportacionMixin,
+                                ListaRapidaMixin, ProyeccionCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para agregados de piedrinera con filtros y estadísticas
     Permite GET (listar), POST (crear), GET/{id} (detalle), PUT/{id} (actualizar), DELETE/{id} (eliminar)
     """
     queryset = AgregadoPiedrinera.objects.all()
-    permission_classes = [IsAuthenticated]
     pagination_class = None  # Deshabilitar paginación, el frontend la maneja
+    campos_busqueda = ('codigo', 'nombre', 'tipo', 'proveedor')
+    nombre_exportacion = 'agregados'
+    columnas_exportacion = (
+        ('codigo', 'Código'),
+        ('nombre', 'Nombre'),
+        ('tipo', 'Tipo'),
+        ('granulometria', 'Granulometría'),
+        ('precio_venta_m3', 'Precio venta m³'),
+        ('costo_produccion_m3', 'Costo producción m³'),
+        ('stock_actual_m3', 'Stock actual m³'),
+        ('stock_minimo_m3', 'Stock mínimo m³'),
+        ('ubicacion', 'Ubicación'),
+        ('calidad', 'Calidad'),
+        ('proveedor', 'Proveedor'),
+        ('fecha_ultima_entrada', 'Última entrada'),
+        ('activo', 'Activo'),
+    )
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        # Con ?fields= / ?format_style= el listado usa el serializer completo proyectado
+        if self.action == 'sync' or (self.action == 'list' and not self.proyeccion_solicitada()):
             return AgregadoPiedrineraListSerializer
         return AgregadoPiedrineraSerializer
 
@@ -40,12 +61,7 @@ class AgregadoPiedrineraViewSet(viewsets.ModelViewSet):
         # Búsqueda por texto
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(codigo__icontains=search) |
-                Q(nombre__icontains=search) |
-                Q(tipo__icontains=search) |
-                Q(proveedor__icontains=search)
-            )
+            queryset = aplicar_busqueda(queryset, search, self.campos_busqueda)
 
         # Filtro por estado
         estado = self.request.query_params.get('estado', 'todos')
@@ -62,11 +78,11 @@ class AgregadoPiedrineraViewSet(viewsets.ModelViewSet):
         # Filtro por stock mínimo
         stock_minimo = self.request.query_params.get('stockMinimo', 'todos')
         if stock_minimo == 'bajo':
-            queryset = queryset.filter(stock_actual_m3__lte=F('stock_minimo_m3'))
+            queryset = queryset.filter(stock_bajo=True)
         elif stock_minimo == 'suficiente':
-            queryset = queryset.filter(stock_actual_m3__gt=F('stock_minimo_m3'))
+            queryset = queryset.filter(stock_bajo=False)
 
-        return queryset.order_by('codigo')
+        return ordenar_por_relevancia(queryset, 'codigo')
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -74,39 +90,42 @@ class AgregadoPiedrineraViewSet(viewsets.ModelViewSet):
         Endpoint para obtener estadísticas de agregados
         Calcula estadísticas sobre TODOS los agregados, sin filtros
         """
-        base_queryset = AgregadoPiedrinera.objects.all()
-
-        total_agregados = base_queryset.count()
-        agregados_activos = base_queryset.filter(activo=True).count()
-        agregados_inactivos = base_queryset.filter(activo=False).count()
-        
-        # Agregados con stock bajo (stock_actual_m3 <= stock_minimo_m3)
-        agregados_stock_bajo = base_queryset.filter(
-            stock_actual_m3__lte=F('stock_minimo_m3')
-        ).count()
-
-        stats = {
-            'total_agregados': total_agregados,
-            'agregados_activos': agregados_activos,
-            'agregados_inactivos': agregados_inactivos,
-            'agregados_stock_bajo': agregados_stock_bajo,
-        }
+        # Una sola consulta agregada, cacheada por unos segundos
+        stats = agregados_stats.obtener()
 
         serializer = AgregadosStatsSerializer(stats)
         return Response(serializer.data)
 
 
-class CamionViewSet(viewsets.ModelViewSet):
+class CamionViewSet(ValidacionCondicionalMixin, SincronizacionMixin, ExportacionMixin, ListaRapidaMixin,
+                    ProyeccionCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para camiones con filtros
     Permite GET (listar), POST (crear), GET/{id} (detalle), PUT/{id} (actualizar), DELETE/{id} (eliminar)
     """
     queryset = Camion.objects.all()
-    permission_classes = [IsAuthenticated]
     pagination_class = None  # Deshabilitar paginación, el frontend la maneja
+    campos_busqueda = ('placa', 'marca', 'modelo')
+    nombre_exportacion = 'camiones'
+    columnas_exportacion = (
+        ('placa', 'Placa'),
+        ('marca', 'Marca'),
+        ('modelo', 'Modelo'),
+        ('capacidad_m3', 'Capacidad m³'),
+        ('estado_actual', 'Estado'),
+        ('fecha_ultimo_mantenimiento', 'Último mantenimiento'),
+        ('fecha_proximo_mantenimiento', 'Próximo mantenimiento'),
+        ('kilometraje', 'Kilometraje'),
+        ('horas_operacion', 'Horas de operación'),
+        ('seguro_vigente', 'Seguro vigente'),
+        ('revision_tecnica_vigente', 'Revisión técnica vigente'),
+        ('documentacion_vigente', 'Documentación vigente'),
+        ('activo', 'Activo'),
+    )
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        # Con ?fields= / ?format_style= el listado usa el serializer completo proyectado
+        if self.action == 'sync' or (self.action == 'list' and not self.proyeccion_solicitada()):
             return CamionListSerializer
         return CamionSerializer
 
@@ -122,11 +141,7 @@ class CamionViewSet(viewsets.ModelViewSet):
         # Búsqueda por texto
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(placa__icontains=search) |
-                Q(marca__icontains=search) |
-                Q(modelo__icontains=search)
-            )
+            queryset = aplicar_busqueda(queryset, search, self.campos_busqueda)
 
         # Filtro por estado
         estado = self.request.query_params.get('estado', 'todos')
@@ -140,4 +155,4 @@ class CamionViewSet(viewsets.ModelViewSet):
         elif activo == 'inactivo':
             queryset = queryset.filter(activo=False)
 
-        return queryset.order_by('placa')
+        return ordenar_por_relevancia(queryset, 'placa')
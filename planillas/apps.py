@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PlanillasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'planillas'
+
+    def ready(self):
+        # Invalidar la caché de estadísticas cuando cambian los datos
+        from .estadisticas import empleados_stats
+        empleados_stats.conectar_senales()
@@ -0,0 +1,10 @@
+from django.db.models import Count, Q
+from framasa_backend.stats import MotorEstadisticas
+from .models import Empleado
+
+
+empleados_stats = MotorEstadisticas(Empleado, {
+    'total_empleados': Count('id'),
+    'empleados_activos': Count('id', filter=Q(activo=True)),
+    'empleados_inactivos': Count('id', filter=Q(activo=False)),
+})
@@ -46,6 +46,7 @@ class Empleado(models.Model):
             models.Index(fields=['nombres', 'apellidos'], name='idx_empleados_nombre'),
             models.Index(fields=['puesto'], name='idx_empleados_puesto'),
             models.Index(fields=['activo'], name='idx_empleados_activo'),
+            models.Index(fields=['updated_at'], name='idx_empleados_updated_at'),
         ]
 
     def __str__(self):
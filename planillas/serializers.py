@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from framasa_backend.serializers import SerializacionRapidaMixin
 from .models import Empleado
 
 
@@ -74,12 +75,17 @@ class EmpleadoSerializer(serializers.ModelSerializer):
         }
 
 
-class EmpleadoListSerializer(serializers.ModelSerializer):
+class EmpleadoListSerializer(SerializacionRapidaMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar empleados
     """
     nombre_completo = serializers.CharField(read_only=True)
 
+    campos_valores = (
+        'id', 'codigo_empleado', 'nombres', 'apellidos',
+        'dpi', 'puesto', 'salario_base_q', 'fecha_contratacion', 'activo'
+    )
+
     class Meta:
         model = Empleado
         fields = (
@@ -102,6 +108,22 @@ class EmpleadoListSerializer(serializers.ModelSerializer):
             'activo': data.get('activo', True),
         }
 
+    @staticmethod
+    def fila_a_dict(fila):
+        id, codigo, nombres, apellidos, dpi, puesto, salario, fecha_contratacion, activo = fila
+        return {
+            'id': str(id),
+            'codigo': codigo,
+            'nombres': nombres,
+            'apellidos': apellidos,
+            'nombreCompleto': f"{nombres} {apellidos}",
+            'cedula': dpi,
+            'cargo': puesto,
+            'salario': float(salario),
+            'fechaIngreso': fecha_contratacion,
+            'activo': activo,
+        }
+
 
 class EmpleadosStatsSerializer(serializers.Serializer):
     """
@@ -1,3 +1,63 @@
+import csv
+import datetime
+import io
+
 from django.test import TestCase
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from authentication.models import Usuario
+from .models import Empleado
+
+
+class ExportacionEmpleadosTests(TestCase):
+    """GET /api/planillas/empleados/export/ (ExportacionMixin)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user('admin', password='x', rol='admin')
+        Empleado.objects.create(
+            codigo_empleado='E1', nombres='Ana', apellidos='Pérez', puesto='Operador',
+            salario_base_q='3500.50', fecha_contratacion=datetime.date(2020, 1, 1), nit='=HYPERLINK("x")',
+        )
+        Empleado.objects.create(
+            codigo_empleado='E2', nombres='José', apellidos='López', puesto='Piloto',
+            salario_base_q='4200.00', fecha_contratacion=datetime.date(2021, 6, 30), activo=False,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def test_csv_en_streaming_con_los_filtros_del_listado(self):
+        response = self.client.get('/api/planillas/empleados/export/?formato=csv&estado=activo')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="empleados_', response['Content-Disposition'])
+        contenido = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(contenido.startswith('\ufeff'))
+        filas = list(csv.reader(io.StringIO(contenido.lstrip('\ufeff'))))
+        self.assertEqual(filas[0][:3], ['Código', 'Nombres', 'Apellidos'])
+        self.assertEqual(len(filas), 2)
+        empleado = dict(zip(filas[0], filas[1]))
+        self.assertEqual(
+            (empleado['Código'], empleado['Salario base (Q)'], empleado['Fecha contratación'], empleado['Activo']),
+            ('E1', '3500.50', '2020-01-01', 'Sí'),
+        )
+        # Los textos que Excel ejecutaría como fórmula se exportan como texto
+        self.assertEqual(empleado['NIT'], '\'=HYPERLINK("x")')
+
+    def test_xlsx(self):
+        response = self.client.get('/api/planillas/empleados/export/?formato=xlsx')
+
+        self.assertEqual(response.status_code, 200)
+        hoja = load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        filas = list(hoja.iter_rows(values_only=True))
+        self.assertEqual([fila[0] for fila in filas], ['Código', 'E1', 'E2'])
+        self.assertEqual(filas[2][-4:], (4200.0, datetime.datetime(2021, 6, 30), None, 'No'))
+
+    def test_formato_invalido_devuelve_400(self):
+        response = self.client.get('/api/planillas/empleados/export/?formato=pdf')
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 400)
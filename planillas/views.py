@@ -1,9 +1,12 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from framasa_backend.mixins import (
+    ExportacionMixin, ListaRapidaMixin, SincronizacionMixin, ValidacionCondicionalMixin
+)
+from framasa_backend.search import aplicar_busqueda, ordenar_por_relevancia
 from .models import Empleado
+from .estadisticas import empleados_stats
 from .serializers import (
     EmpleadoSerializer,
     EmpleadoListSerializer,
@@ -11,17 +14,36 @@ from .serializers import (
 )
 
 
-class EmpleadoViewSet(viewsets.ModelViewSet):
+class EmpleadoViewSet(ValidacionCondicionalMixin, SincronizacionMixin, ExportacionMixin, ListaRapidaMixin,
+                      viewsets.ModelViewSet):
     """
     ViewSet para empleados con filtros y estadísticas
     Permite GET (listar), POST (crear), GET/{id} (detalle), PUT/{id} (actualizar), DELETE/{id} (eliminar)
     """
     queryset = Empleado.objects.all()
-    permission_classes = [IsAuthenticated]
     pagination_class = None  # Deshabilitar paginación, el frontend la maneja
+    campos_busqueda = ('codigo_empleado', 'nombres', 'apellidos', 'dpi', 'puesto')
+    nombre_exportacion = 'empleados'
+    columnas_exportacion = (
+        ('codigo_empleado', 'Código'),
+        ('nombres', 'Nombres'),
+        ('apellidos', 'Apellidos'),
+        ('dpi', 'DPI'),
+        ('nit', 'NIT'),
+        ('telefono', 'Teléfono'),
+        ('email', 'Email'),
+        ('puesto', 'Puesto'),
+        ('area_trabajo', 'Área de trabajo'),
+        ('turno', 'Turno'),
+        ('tipo_contrato', 'Tipo de contrato'),
+        ('salario_base_q', 'Salario base (Q)'),
+        ('fecha_contratacion', 'Fecha contratación'),
+        ('fecha_baja', 'Fecha baja'),
+        ('activo', 'Activo'),
+    )
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ('list', 'sync'):
             return EmpleadoListSerializer
         return EmpleadoSerializer
 
@@ -37,13 +59,7 @@ class EmpleadoViewSet(viewsets.ModelViewSet):
         # Búsqueda por texto
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(codigo_empleado__icontains=search) |
-                Q(nombres__icontains=search) |
-                Q(apellidos__icontains=search) |
-                Q(dpi__icontains=search) |
-                Q(puesto__icontains=search)
-            )
+            queryset = aplicar_busqueda(queryset, search, self.campos_busqueda)
 
         # Filtro por estado
         estado = self.request.query_params.get('estado', 'todos')
@@ -57,7 +73,7 @@ class EmpleadoViewSet(viewsets.ModelViewSet):
         if cargo != 'todos':
             queryset = queryset.filter(puesto=cargo)
 
-        return queryset.order_by('codigo_empleado')
+        return ordenar_por_relevancia(queryset, 'codigo_empleado')
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -65,17 +81,8 @@ class EmpleadoViewSet(viewsets.ModelViewSet):
         Endpoint para obtener estadísticas de empleados
         Calcula estadísticas sobre TODOS los empleados, sin filtros
         """
-        base_queryset = Empleado.objects.all()
-
-        total_empleados = base_queryset.count()
-        empleados_activos = base_queryset.filter(activo=True).count()
-        empleados_inactivos = base_queryset.filter(activo=False).count()
-
-        stats = {
-            'total_empleados': total_empleados,
-            'empleados_activos': empleados_activos,
-            'empleados_inactivos': empleados_inactivos,
-        }
+        # Una sola consulta agregada, cacheada por unos segundos
+        stats = empleados_stats.obtener()
 
         serializer = EmpleadosStatsSerializer(stats)
         return Response(serializer.data)
@@ -1,3 +1,27 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import HistorialPrecio, SugerenciaReorden, ValuacionDiaria
+
+
+@admin.register(SugerenciaReorden)
+class SugerenciaReordenAdmin(admin.ModelAdmin):
+    list_display = ('unidad', 'codigo', 'nombre', 'stock_actual', 'stock_minimo', 'punto_reorden',
+                    'cantidad_pedido', 'calculado_en')
+    list_filter = ('unidad',)
+    search_fields = ('codigo', 'nombre')
+
+
+@admin.register(ValuacionDiaria)
+class ValuacionDiariaAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'unidad', 'grupo', 'productos', 'existencias', 'valor', 'valor_venta')
+    list_filter = ('unidad', 'fecha')
+    search_fields = ('grupo',)
+    date_hierarchy = 'fecha'
+
+
+@admin.register(HistorialPrecio)
+class HistorialPrecioAdmin(admin.ModelAdmin):
+    list_display = ('unidad', 'producto_id', 'precio', 'vigente_desde')
+    list_filter = ('unidad',)
+    search_fields = ('producto_id',)
+    readonly_fields = ('unidad', 'producto_id', 'precio', 'vigente_desde')
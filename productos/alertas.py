@@ -0,0 +1,92 @@
+"""
+Alertas de stock bajo de todas las unidades de negocio
+
+Cada unidad se consulta con filter(activo=True, stock_bajo=True), que
+coincide con el índice parcial de su tabla, por lo que solo se leen las filas
+en alerta. El resultado combinado se guarda en caché y se invalida con las
+señales de los modelos (y explícitamente tras los update() de inventario).
+"""
+import hashlib
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+from bloquera.models import ProductoBloquera
+from ferreteria.models import Producto
+from piedrinera.models import AgregadoPiedrinera
+from framasa_backend.renderers import dumps
+
+CLAVE_CACHE = 'alertas:stock-bajo'
+
+# (unidad, modelo, campo de stock actual, campo de stock mínimo)
+UNIDADES = (
+    ('ferreteria', Producto, 'stock_actual', 'stock_minimo'),
+    ('bloquera', ProductoBloquera, 'stock_actual', 'stock_minimo'),
+    ('piedrinera', AgregadoPiedrinera, 'stock_actual_m3', 'stock_minimo_m3'),
+)
+NOMBRES_UNIDADES = tuple(unidad for unidad, *_ in UNIDADES)
+
+
+def _numero(valor):
+    return float(valor) if isinstance(valor, Decimal) else valor
+
+
+def severidad(actual, minimo):
+    """
+    Proporción del mínimo que falta (0 = en el mínimo, 1 = sin existencias)
+    Con mínimo 0 solo un stock negativo se considera faltante.
+    """
+    if minimo > 0:
+        return round(float((minimo - actual) / minimo), 4)
+    return 1.0 if actual < 0 else 0.0
+
+
+def calcular_alertas():
+    """Alertas de todas las unidades ordenadas por severidad (mayor primero)"""
+    alertas = []
+    for unidad, modelo, campo_actual, campo_minimo in UNIDADES:
+        filas = modelo.objects.filter(activo=True, stock_bajo=True).order_by().values_list(
+            'id', 'codigo', 'nombre', campo_actual, campo_minimo
+        )
+        for id, codigo, nombre, actual, minimo in filas:
+            alertas.append({
+                'unidad': unidad,
+                'id': str(id),
+                'codigo': codigo,
+                'nombre': nombre,
+                'stock_actual': _numero(actual),
+                'stock_minimo': _numero(minimo),
+                'faltante': _numero(minimo - actual),
+                'severidad': severidad(actual, minimo),
+            })
+    alertas.sort(key=lambda alerta: (-alerta['severidad'], alerta['unidad'], alerta['codigo']))
+    return alertas
+
+
+def obtener_alertas():
+    """
+    Devuelve (alertas, etag) desde caché o los calcula
+
+    El ETag se calcula una sola vez por versión de los datos, así los
+    sondeos repetidos se responden con 304 sin serializar nada.
+    """
+    entrada = cache.get(CLAVE_CACHE)
+    if entrada is None:
+        alertas = calcular_alertas()
+        entrada = (alertas, hashlib.md5(dumps(alertas)).hexdigest())
+        cache.set(CLAVE_CACHE, entrada, getattr(settings, 'ALERTAS_CACHE_TIMEOUT', 15))
+    return entrada
+
+
+def invalidar(**kwargs):
+    """Elimina las alertas cacheadas (receptor de señales)"""
+    cache.delete(CLAVE_CACHE)
+
+
+def conectar_senales():
+    for unidad, modelo, *_ in UNIDADES:
+        uid = f'{CLAVE_CACHE}:{unidad}'
+        post_save.connect(invalidar, sender=modelo, weak=False, dispatch_uid=uid)
+        post_delete.connect(invalidar, sender=modelo, weak=False, dispatch_uid=uid)
@@ -2,5 +2,16 @@ from django.apps import AppConfig
 
 
 class ProductosConfig(AppConfig):
+    """
+    Funcionalidad transversal a los productos de todas las unidades de negocio
+    (alertas de stock bajo, pronóstico de reorden, valuación e historial de precios)
+    """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'productos'
+
+    def ready(self):
+        from . import alertas, precios
+        # Invalidar la caché de alertas cuando cambian los productos
+        alertas.conectar_senales()
+        # Registrar cada cambio de precio en el historial
+        precios.conectar_senales()
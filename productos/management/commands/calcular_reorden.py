@@ -0,0 +1,84 @@
+"""
+Comando de Django para calcular las sugerencias de reorden desde el kardex
+Uso: python manage.py calcular_reorden [--dias 730] [--tiempo-entrega 7] [--nivel-servicio 0.95]
+
+Pensado para ejecutarse cada noche (cron). Lee las salidas diarias de los
+productos por bloques, calcula con NumPy la demanda (promedio móvil y
+suavizado exponencial), su desviación, el punto de reorden y la cantidad de
+pedido (productos/pronostico.py) y reemplaza la tabla sugerencias_reorden.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from productos import pronostico
+
+
+class Command(BaseCommand):
+    help = 'Calcula punto de reorden y cantidad de pedido sugeridos a partir de la demanda histórica'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--unidad',
+            choices=sorted(pronostico.FUENTES),
+            action='append',
+            help='Unidad a calcular; se puede repetir (por defecto todas las que tienen kardex)',
+        )
+        parser.add_argument(
+            '--dias', type=int, default=pronostico.PARAMETROS['dias'],
+            help='Días de historia hasta ayer (por defecto %(default)s)',
+        )
+        parser.add_argument(
+            '--ventana', type=int, default=pronostico.PARAMETROS['ventana'],
+            help='Días del promedio móvil (por defecto %(default)s)',
+        )
+        parser.add_argument(
+            '--alfa', type=float, default=pronostico.PARAMETROS['alfa'],
+            help='Factor del suavizado exponencial, entre 0 y 1 (por defecto %(default)s)',
+        )
+        parser.add_argument(
+            '--tiempo-entrega', type=int, default=pronostico.PARAMETROS['tiempo_entrega'],
+            help='Días entre el pedido y la recepción (por defecto %(default)s)',
+        )
+        parser.add_argument(
+            '--nivel-servicio', type=float, default=pronostico.PARAMETROS['nivel_servicio'],
+            help='Probabilidad de no quedar sin stock durante la entrega (por defecto %(default)s)',
+        )
+        parser.add_argument(
+            '--costo-pedido', type=float, default=pronostico.PARAMETROS['costo_pedido'],
+            help='Costo fijo de colocar un pedido, para el EOQ (por defecto %(default)s)',
+        )
+        parser.add_argument(
+            '--tasa-mantenimiento', type=float, default=pronostico.PARAMETROS['tasa_mantenimiento'],
+            help='Costo anual de mantener inventario como fracción del costo (por defecto %(default)s)',
+        )
+        parser.add_argument(
+            '--bloque', type=int, default=10000,
+            help='Productos por bloque de cálculo (por defecto %(default)s)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Calcular sin guardar las sugerencias',
+        )
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1 or options['ventana'] < 1 or options['tiempo_entrega'] < 0:
+            raise CommandError('--dias y --ventana deben ser mayores que 0 y --tiempo-entrega no negativo')
+        if not 0 < options['alfa'] <= 1:
+            raise CommandError('--alfa debe estar entre 0 y 1')
+        if not 0 < options['nivel_servicio'] < 1:
+            raise CommandError('--nivel-servicio debe estar entre 0 y 1')
+
+        parametros = {clave: options[clave] for clave in pronostico.PARAMETROS}
+        for unidad in options['unidad'] or sorted(pronostico.FUENTES):
+            inicio = time.perf_counter()
+            sugerencias = pronostico.pronosticar(unidad, bloque=options['bloque'], **parametros)
+            calculo = time.perf_counter() - inicio
+            if not options['dry_run']:
+                pronostico.guardar(unidad, sugerencias)
+            reordenar = sum(1 for sugerencia in sugerencias if sugerencia.debe_reordenar)
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {unidad}: {len(sugerencias)} sugerencias, {reordenar} en punto de reorden '
+                f'(cálculo {calculo:.1f} s, total {time.perf_counter() - inicio:.1f} s)'
+            ))
@@ -0,0 +1,30 @@
+"""
+Comando de Django para registrar la instantánea diaria de valuación del inventario
+Uso: python manage.py registrar_valuacion [--unidad ferreteria]
+
+Pensado para ejecutarse una vez al día al cierre (cron). Calcula la valuación
+actual con una consulta agrupada por unidad y la guarda en valuaciones_diarias
+con la fecha de hoy; si ya existía la de hoy, la reemplaza.
+"""
+from django.core.management.base import BaseCommand
+
+from productos import valuacion
+
+
+class Command(BaseCommand):
+    help = 'Guarda la valuación actual del inventario como instantánea del día'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--unidad',
+            choices=valuacion.NOMBRES_UNIDADES,
+            action='append',
+            help='Unidad a registrar; se puede repetir (por defecto todas)',
+        )
+
+    def handle(self, *args, **options):
+        unidades = options['unidad'] or valuacion.NOMBRES_UNIDADES
+        grupos = valuacion.registrar_instantanea(unidades=unidades)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Instantánea de valuación registrada: {len(unidades)} unidades, {grupos} grupos'
+        ))
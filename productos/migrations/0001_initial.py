@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-17 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SugerenciaReorden',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unidad', models.CharField(max_length=20)),
+                ('producto_id', models.BigIntegerField()),
+                ('codigo', models.CharField(max_length=30)),
+                ('nombre', models.CharField(max_length=150)),
+                ('stock_actual', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('stock_minimo', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('demanda_promedio', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('demanda_suavizada', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('desviacion_demanda', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('dias_historia', models.IntegerField()),
+                ('stock_seguridad', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('punto_reorden', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('cantidad_pedido', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('calculado_en', models.DateTimeField(db_column='calculado_en')),
+            ],
+            options={
+                'verbose_name': 'Sugerencia de Reorden',
+                'verbose_name_plural': 'Sugerencias de Reorden',
+                'db_table': 'sugerencias_reorden',
+                'ordering': ['unidad', 'codigo'],
+                'indexes': [models.Index(fields=['unidad', 'codigo'], name='sugerencias_unidad_13a373_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sugerenciareorden',
+            constraint=models.UniqueConstraint(fields=('unidad', 'producto_id'), name='uq_sugerencia_unidad_producto'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValuacionDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('unidad', models.CharField(max_length=20)),
+                ('grupo', models.CharField(max_length=100)),
+                ('productos', models.IntegerField(default=0)),
+                ('existencias', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('valor', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('valor_venta', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='created_at')),
+            ],
+            options={
+                'verbose_name': 'Valuación Diaria',
+                'verbose_name_plural': 'Valuaciones Diarias',
+                'db_table': 'valuaciones_diarias',
+                'ordering': ['-fecha', 'unidad', 'grupo'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='valuaciondiaria',
+            constraint=models.UniqueConstraint(fields=('fecha', 'unidad', 'grupo'), name='uq_valuacion_fecha_unidad_grupo'),
+        ),
+    ]
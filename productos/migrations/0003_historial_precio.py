@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0002_valuacion_diaria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistorialPrecio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unidad', models.CharField(max_length=20)),
+                ('producto_id', models.BigIntegerField()),
+                ('precio', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('vigente_desde', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Historial de Precio',
+                'verbose_name_plural': 'Historial de Precios',
+                'db_table': 'historial_precios',
+                'ordering': ['unidad', 'producto_id', '-vigente_desde'],
+                'indexes': [models.Index(fields=['unidad', 'producto_id', 'vigente_desde'], name='idx_historial_precio_vigencia')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+"""
+Registra el precio actual de todos los productos como primera fila del
+historial de precios
+
+Se toma updated_at como inicio de vigencia: el precio actual no puede haber
+cambiado después de la última modificación del producto, mientras que antes
+de esa fecha no se conoce. Las consultas a fechas anteriores no devuelven precio.
+"""
+from django.db import migrations
+
+# (unidad, app, modelo, campo de precio de venta)
+UNIDADES = (
+    ('ferreteria', 'ferreteria', 'Producto', 'precio_venta'),
+    ('bloquera', 'bloquera', 'ProductoBloquera', 'precio_unitario'),
+    ('piedrinera', 'piedrinera', 'AgregadoPiedrinera', 'precio_venta_m3'),
+)
+
+
+def registrar_precios_actuales(apps, schema_editor):
+    HistorialPrecio = apps.get_model('productos', 'HistorialPrecio')
+    db_alias = schema_editor.connection.alias
+    for unidad, app, nombre_modelo, campo in UNIDADES:
+        modelo = apps.get_model(app, nombre_modelo)
+        filas = modelo.objects.using(db_alias).values_list('id', campo, 'updated_at').iterator(chunk_size=5000)
+        lote = []
+        for producto_id, precio, updated_at in filas:
+            lote.append(HistorialPrecio(
+                unidad=unidad, producto_id=producto_id, precio=precio, vigente_desde=updated_at
+            ))
+            if len(lote) >= 5000:
+                HistorialPrecio.objects.using(db_alias).bulk_create(lote)
+                lote = []
+        HistorialPrecio.objects.using(db_alias).bulk_create(lote)
+
+
+def eliminar_historial(apps, schema_editor):
+    HistorialPrecio = apps.get_model('productos', 'HistorialPrecio')
+    HistorialPrecio.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0003_historial_precio'),
+        ('ferreteria', '0006_stock_bajo'),
+        ('bloquera', '0004_stock_bajo'),
+        ('piedrinera', '0004_stock_bajo'),
+    ]
+
+    operations = [
+        migrations.RunPython(registrar_precios_actuales, eliminar_historial),
+    ]
@@ -1,3 +1,106 @@
 from django.db import models
 
-# Create your models here.
+
+class SugerenciaReorden(models.Model):
+    """
+    Punto de reorden y cantidad de pedido sugeridos por el pronóstico de demanda
+    (comando calcular_reorden). Cada ejecución reemplaza las sugerencias de la
+    unidad; stock_minimo es el mínimo capturado a mano, para compararlo.
+    """
+    unidad = models.CharField(max_length=20)
+    producto_id = models.BigIntegerField()
+    codigo = models.CharField(max_length=30)
+    nombre = models.CharField(max_length=150)
+
+    stock_actual = models.DecimalField(max_digits=12, decimal_places=2)
+    stock_minimo = models.DecimalField(max_digits=12, decimal_places=2)
+
+    demanda_promedio = models.DecimalField(max_digits=14, decimal_places=4)
+    demanda_suavizada = models.DecimalField(max_digits=14, decimal_places=4)
+    desviacion_demanda = models.DecimalField(max_digits=14, decimal_places=4)
+    dias_historia = models.IntegerField()
+
+    stock_seguridad = models.DecimalField(max_digits=12, decimal_places=2)
+    punto_reorden = models.DecimalField(max_digits=12, decimal_places=2)
+    cantidad_pedido = models.DecimalField(max_digits=12, decimal_places=2)
+
+    calculado_en = models.DateTimeField(db_column='calculado_en')
+
+    class Meta:
+        db_table = 'sugerencias_reorden'
+        verbose_name = 'Sugerencia de Reorden'
+        verbose_name_plural = 'Sugerencias de Reorden'
+        ordering = ['unidad', 'codigo']
+        constraints = [
+            models.UniqueConstraint(fields=['unidad', 'producto_id'], name='uq_sugerencia_unidad_producto'),
+        ]
+        indexes = [
+            models.Index(fields=['unidad', 'codigo']),
+        ]
+
+    def __str__(self):
+        return f"{self.unidad} {self.codigo}: reorden en {self.punto_reorden}"
+
+    @property
+    def debe_reordenar(self):
+        """Verifica si el stock actual ya alcanzó el punto de reorden sugerido"""
+        return self.stock_actual <= self.punto_reorden
+
+
+class ValuacionDiaria(models.Model):
+    """
+    Instantánea diaria de la valuación del inventario por unidad y grupo
+    (categoría, tipo_bloque o tipo), registrada con el comando registrar_valuacion.
+    Las consultas históricas de valuación leen solo esta tabla.
+    """
+    fecha = models.DateField()
+    unidad = models.CharField(max_length=20)
+    grupo = models.CharField(max_length=100)
+
+    productos = models.IntegerField(default=0)
+    existencias = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    valor = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    valor_venta = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_column='created_at')
+
+    class Meta:
+        db_table = 'valuaciones_diarias'
+        verbose_name = 'Valuación Diaria'
+        verbose_name_plural = 'Valuaciones Diarias'
+        ordering = ['-fecha', 'unidad', 'grupo']
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'unidad', 'grupo'], name='uq_valuacion_fecha_unidad_grupo'),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} {self.unidad} {self.grupo}: {self.valor}"
+
+    @property
+    def margen(self):
+        return self.valor_venta - self.valor
+
+
+class HistorialPrecio(models.Model):
+    """
+    Historial de precios de venta de ferretería, bloquera y piedrinera
+
+    Solo se agregan filas: una por cada cambio de precio, vigente desde
+    vigente_desde hasta la siguiente fila del mismo producto (ver productos/precios.py).
+    """
+    unidad = models.CharField(max_length=20)
+    producto_id = models.BigIntegerField()
+    precio = models.DecimalField(max_digits=12, decimal_places=2)
+    vigente_desde = models.DateTimeField()
+
+    class Meta:
+        db_table = 'historial_precios'
+        verbose_name = 'Historial de Precio'
+        verbose_name_plural = 'Historial de Precios'
+        ordering = ['unidad', 'producto_id', '-vigente_desde']
+        indexes = [
+            models.Index(fields=['unidad', 'producto_id', 'vigente_desde'], name='idx_historial_precio_vigencia'),
+        ]
+
+    def __str__(self):
+        return f"{self.unidad} {self.producto_id}: {self.precio} desde {self.vigente_desde}"
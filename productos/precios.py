@@ -0,0 +1,129 @@
+"""
+Historial de precios de venta de todas las unidades de negocio
+
+Cada cambio de precio agrega una fila (unidad, producto_id, precio,
+vigente_desde) a historial_precios; nunca se actualizan ni borran filas. El
+precio vigente en un momento es el de la última fila con vigente_desde <=
+momento.
+
+Captura:
+- save() de los modelos (ViewSets, admin): pre_save lee el precio anterior y
+  post_save registra la fila si el producto es nuevo o el precio cambió
+- importación masiva de ferretería (bulk_create no dispara señales): el
+  importador llama a registrar() con los cambios del lote
+
+La consulta a una fecha resuelve un lote de códigos en una sola consulta con
+una subconsulta correlacionada por producto (ORDER BY vigente_desde DESC
+LIMIT 1) que usa el índice (unidad, producto_id, vigente_desde).
+"""
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+
+from bloquera.models import ProductoBloquera
+from ferreteria.models import Producto
+from piedrinera.models import AgregadoPiedrinera
+from .models import HistorialPrecio
+
+# (unidad, modelo, campo de precio de venta)
+UNIDADES = (
+    ('ferreteria', Producto, 'precio_venta'),
+    ('bloquera', ProductoBloquera, 'precio_unitario'),
+    ('piedrinera', AgregadoPiedrinera, 'precio_venta_m3'),
+)
+NOMBRES_UNIDADES = tuple(unidad for unidad, *_ in UNIDADES)
+_POR_UNIDAD = {unidad: (modelo, campo) for unidad, modelo, campo in UNIDADES}
+_POR_MODELO = {modelo: (unidad, campo) for unidad, modelo, campo in UNIDADES}
+
+MAX_CODIGOS = 1000
+
+
+def registrar(unidad, cambios, momento=None):
+    """
+    Agrega filas al historial
+
+    Args:
+        cambios: iterable de (producto_id, precio)
+        momento: inicio de vigencia de los precios (por defecto ahora)
+    """
+    momento = momento or timezone.now()
+    HistorialPrecio.objects.bulk_create(
+        [
+            HistorialPrecio(unidad=unidad, producto_id=producto_id, precio=precio, vigente_desde=momento)
+            for producto_id, precio in cambios
+        ],
+        batch_size=1000,
+    )
+
+
+def _guardar_precio_anterior(sender, instance, raw=False, update_fields=None, **kwargs):
+    """pre_save: recuerda el precio guardado antes de este save()"""
+    _, campo = _POR_MODELO[sender]
+    instance._precio_anterior = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and campo not in update_fields:
+        instance._precio_anterior = getattr(instance, campo)
+        return
+    instance._precio_anterior = sender.objects.filter(pk=instance.pk).values_list(campo, flat=True).first()
+
+
+def _registrar_cambio(sender, instance, created, raw=False, **kwargs):
+    """post_save: agrega una fila si el producto es nuevo o cambió su precio"""
+    if raw:
+        return
+    unidad, campo = _POR_MODELO[sender]
+    precio = getattr(instance, campo)
+    if created or getattr(instance, '_precio_anterior', None) != precio:
+        registrar(unidad, [(instance.pk, precio)])
+
+
+def conectar_senales():
+    for unidad, modelo, _ in UNIDADES:
+        uid = f'historial-precios:{unidad}'
+        pre_save.connect(_guardar_precio_anterior, sender=modelo, weak=False, dispatch_uid=uid)
+        post_save.connect(_registrar_cambio, sender=modelo, weak=False, dispatch_uid=uid)
+
+
+def precios_en(unidad, codigos, momento):
+    """
+    Precio vigente de cada código en un momento (una sola consulta)
+
+    Returns:
+        dict {codigo: (precio, vigente_desde)}; los códigos que no existen no
+        aparecen y los que no tenían precio registrado en ese momento tienen
+        (None, None)
+    """
+    modelo, _ = _POR_UNIDAD[unidad]
+    vigente = HistorialPrecio.objects.filter(
+        unidad=unidad, producto_id=OuterRef('pk'), vigente_desde__lte=momento
+    ).order_by('-vigente_desde', '-id')[:1]
+    filas = (
+        modelo.objects
+        .filter(codigo__in=codigos)
+        .annotate(
+            precio_en=Subquery(vigente.values('precio')),
+            vigente_desde_en=Subquery(vigente.values('vigente_desde')),
+        )
+        .values_list('codigo', 'precio_en', 'vigente_desde_en')
+        .order_by()
+    )
+    return {codigo: (precio, desde) for codigo, precio, desde in filas}
+
+
+def historial(unidad, codigo):
+    """
+    Cambios de precio de un producto, del más reciente al más antiguo
+
+    Returns:
+        lista de (precio, vigente_desde) o None si el código no existe
+    """
+    modelo, _ = _POR_UNIDAD[unidad]
+    producto_id = modelo.objects.filter(codigo=codigo).values_list('id', flat=True).first()
+    if producto_id is None:
+        return None
+    return list(
+        HistorialPrecio.objects.filter(unidad=unidad, producto_id=producto_id)
+        .order_by('-vigente_desde', '-id')
+        .values_list('precio', 'vigente_desde')
+    )
@@ -0,0 +1,252 @@
+"""
+Pronóstico de demanda y punto de reorden sugerido
+
+La aritmética se hace con NumPy sobre un bloque de productos a la vez: la
+matriz de demanda tiene una fila por producto y una columna por día, y cada
+estadística es una reducción por eje o un producto matriz-vector, sin bucles
+de Python por producto ni por día.
+
+- demanda diaria: salidas del kardex (las entradas y los ajustes no son demanda)
+- promedio móvil de los últimos `ventana` días
+- suavizado exponencial simple (SES) con factor `alfa`; el nivel final se
+  obtiene en forma cerrada como suma ponderada de la historia
+- varianza diaria desde que existe el producto (los días previos no cuentan)
+- stock de seguridad = z * desviación * raíz(tiempo de entrega)
+- punto de reorden = demanda SES * tiempo de entrega + stock de seguridad
+- cantidad de pedido = EOQ, raíz(2 * demanda anual * costo por pedido / costo
+  de mantener una unidad un año); sin costo unitario se pide la demanda de un
+  tiempo de entrega
+
+Solo ferretería registra movimientos (MovimientoInventario); bloquera y
+piedrinera se agregarán a FUENTES cuando tengan kardex.
+"""
+import math
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from statistics import NormalDist
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ferreteria.models import MovimientoInventario, Producto
+from .models import SugerenciaReorden
+
+PARAMETROS = {
+    'dias': 730,
+    'ventana': 28,
+    'alfa': 0.1,
+    'tiempo_entrega': 7,
+    'nivel_servicio': 0.95,
+    'costo_pedido': 50.0,
+    'tasa_mantenimiento': 0.25,
+}
+
+
+def calcular(demanda, inicio, costo_unitario, enteros=True, ventana=28, alfa=0.1,
+             tiempo_entrega=7, nivel_servicio=0.95, costo_pedido=50.0, tasa_mantenimiento=0.25):
+    """
+    Estadísticas de demanda y sugerencia de reorden para un bloque de productos
+
+    Args:
+        demanda: matriz (productos x días) con la demanda diaria, el último día al final
+        inicio: índice del primer día de historia de cada producto (días sin el
+            producto = columnas anteriores, que deben estar en cero)
+        costo_unitario: costo de cada producto
+        enteros: redondear punto de reorden y cantidad hacia arriba a enteros
+
+    Returns:
+        dict de arreglos (uno por producto): promedio_movil, demanda_suavizada,
+        desviacion, dias_historia, stock_seguridad, punto_reorden, cantidad_pedido
+    """
+    demanda = np.asarray(demanda, dtype=np.float64)
+    total_dias = demanda.shape[1]
+    inicio = np.minimum(np.asarray(inicio, dtype=np.int64), total_dias)
+    dias = total_dias - inicio
+
+    ventana_efectiva = np.minimum(ventana, dias)
+    promedio_movil = demanda[:, total_dias - min(ventana, total_dias):].sum(axis=1) / np.maximum(ventana_efectiva, 1)
+
+    suma = demanda.sum(axis=1)
+    suma_cuadrados = np.einsum('ij,ij->i', demanda, demanda)
+    media = suma / np.maximum(dias, 1)
+    varianza = np.where(
+        dias > 1, (suma_cuadrados - dias * media * media) / np.maximum(dias - 1, 1), 0.0
+    )
+    desviacion = np.sqrt(np.maximum(varianza, 0.0))
+
+    # SES con nivel inicial = primer día del producto (s):
+    #   nivel = sum_{t>s} alfa (1-alfa)^(T-1-t) x_t + (1-alfa)^(T-1-s) x_s
+    # Los pesos alfa (1-alfa)^(T-1-t) sirven para todas las filas (antes de s hay
+    # ceros); solo el día s lleva un peso distinto, que se corrige aparte.
+    decaimiento = (1.0 - alfa) ** np.arange(total_dias - 1, -1, -1, dtype=np.float64)
+    nivel = demanda @ (alfa * decaimiento)
+    con_historia = inicio < total_dias
+    filas = np.flatnonzero(con_historia)
+    primer_dia = demanda[filas, inicio[filas]]
+    nivel[filas] += (1.0 - alfa) ** (total_dias - inicio[filas]) * primer_dia
+
+    z = NormalDist().inv_cdf(nivel_servicio)
+    stock_seguridad = z * desviacion * math.sqrt(tiempo_entrega)
+    punto_reorden = nivel * tiempo_entrega + stock_seguridad
+
+    costo_mantener = np.asarray(costo_unitario, dtype=np.float64) * tasa_mantenimiento
+    demanda_anual = nivel * 365
+    cantidad_pedido = np.where(
+        costo_mantener > 0,
+        np.sqrt(2 * demanda_anual * costo_pedido / np.where(costo_mantener > 0, costo_mantener, 1.0)),
+        nivel * tiempo_entrega,
+    )
+
+    if enteros:
+        # Tolerancia para que 3.0000000001 por error de redondeo no suba a 4
+        stock_seguridad = np.ceil(stock_seguridad - 1e-9)
+        punto_reorden = np.ceil(punto_reorden - 1e-9)
+        cantidad_pedido = np.ceil(cantidad_pedido - 1e-9)
+
+    return {
+        'promedio_movil': promedio_movil,
+        'demanda_suavizada': nivel,
+        'desviacion': desviacion,
+        'dias_historia': dias,
+        'stock_seguridad': np.maximum(stock_seguridad, 0.0),
+        'punto_reorden': np.maximum(punto_reorden, 0.0),
+        'cantidad_pedido': np.maximum(cantidad_pedido, 0.0),
+    }
+
+
+def matriz_demanda(ids, filas, fecha_inicio, dias):
+    """
+    Construye la matriz de demanda desde filas (producto_id, fecha, cantidad)
+
+    Las filas se consumen una sola vez hacia un arreglo estructurado; las
+    fechas se traducen a columnas con un diccionario, que es mucho más rápido
+    que convertir cada date a datetime64.
+
+    Args:
+        ids: IDs de los productos del bloque, ordenados (una fila de la matriz cada uno)
+        filas: iterable de tuplas (producto_id, date, demanda del día); las de
+            productos o fechas fuera del bloque se ignoran
+    """
+    demanda = np.zeros((len(ids), dias), dtype=np.float64)
+    columnas = {fecha_inicio + timedelta(days=dia): dia for dia in range(dias)}
+    datos = np.fromiter(
+        ((producto_id, columnas.get(fecha, -1), cantidad) for producto_id, fecha, cantidad in filas),
+        dtype=[('producto', np.int64), ('dia', np.int64), ('cantidad', np.float64)],
+    )
+    if not len(datos) or not len(ids):
+        return demanda
+    indices = np.searchsorted(ids, datos['producto'])
+    validos = (
+        (datos['dia'] >= 0)
+        & (indices < len(ids)) & (ids[np.minimum(indices, len(ids) - 1)] == datos['producto'])
+    )
+    np.add.at(demanda, (indices[validos], datos['dia'][validos]), datos['cantidad'][validos])
+    return demanda
+
+
+def salidas_ferreteria(id_desde, id_hasta, fecha_inicio, fecha_fin):
+    """Salidas diarias del kardex de ferretería para un rango de productos"""
+    desde = timezone.make_aware(datetime.combine(fecha_inicio, time.min))
+    hasta = timezone.make_aware(datetime.combine(fecha_fin + timedelta(days=1), time.min))
+    return (
+        MovimientoInventario.objects
+        .filter(
+            tipo=MovimientoInventario.TIPO_SALIDA,
+            producto_id__gte=id_desde, producto_id__lte=id_hasta,
+            created_at__gte=desde, created_at__lt=hasta,
+        )
+        .annotate(dia=TruncDate('created_at'))
+        .values('producto_id', 'dia')
+        # Las salidas se guardan con signo negativo
+        .annotate(total=Sum('cantidad') * -1)
+        .values_list('producto_id', 'dia', 'total')
+        .order_by()
+        .iterator(chunk_size=20000)
+    )
+
+
+# unidad -> (modelo de producto, campo de stock actual, campo de stock mínimo,
+#            cantidades enteras, función que devuelve las salidas diarias)
+FUENTES = {
+    'ferreteria': (Producto, 'stock_actual', 'stock_minimo', True, salidas_ferreteria),
+}
+
+
+def _decimal(valor, decimales=2):
+    return Decimal(repr(round(float(valor), decimales)))
+
+
+def pronosticar(unidad, bloque=10000, fecha_fin=None, **parametros):
+    """
+    Calcula las sugerencias de reorden de los productos activos de una unidad
+
+    Recorre los productos por bloques de IDs consecutivos: una consulta
+    agregada por bloque y una pasada de calcular() sobre su matriz.
+
+    Args:
+        fecha_fin: último día de historia (por defecto ayer, el último día completo)
+
+    Returns:
+        lista de SugerenciaReorden sin guardar
+    """
+    modelo, campo_actual, campo_minimo, enteros, salidas = FUENTES[unidad]
+    parametros = {**PARAMETROS, **parametros}
+    dias = parametros.pop('dias')
+    fecha_fin = fecha_fin or timezone.localdate() - timedelta(days=1)
+    fecha_inicio = fecha_fin - timedelta(days=dias - 1)
+    ahora = timezone.now()
+
+    productos = list(
+        modelo.objects.filter(activo=True).order_by('id').values_list(
+            'id', 'codigo', 'nombre', campo_actual, campo_minimo, 'costo_unitario', 'created_at'
+        )
+    )
+    sugerencias = []
+    for desde in range(0, len(productos), bloque):
+        lote = productos[desde:desde + bloque]
+        ids = np.fromiter((fila[0] for fila in lote), dtype=np.int64, count=len(lote))
+        demanda = matriz_demanda(ids, salidas(int(ids[0]), int(ids[-1]), fecha_inicio, fecha_fin), fecha_inicio, dias)
+        # La historia empieza el día en que se creó el producto
+        inicio = np.fromiter(
+            ((timezone.localdate(fila[6]) - fecha_inicio).days for fila in lote), dtype=np.int64, count=len(lote)
+        )
+        resultado = calcular(
+            demanda,
+            np.clip(inicio, 0, dias),
+            np.fromiter((fila[5] or 0 for fila in lote), dtype=np.float64, count=len(lote)),
+            enteros=enteros,
+            **parametros,
+        )
+        columnas = [resultado[clave].tolist() for clave in (
+            'promedio_movil', 'demanda_suavizada', 'desviacion', 'dias_historia',
+            'stock_seguridad', 'punto_reorden', 'cantidad_pedido',
+        )]
+        for (id, codigo, nombre, actual, minimo, _, _), valores in zip(lote, zip(*columnas)):
+            promedio, suavizada, desviacion, dias_historia, seguridad, punto, cantidad = valores
+            sugerencias.append(SugerenciaReorden(
+                unidad=unidad,
+                producto_id=id,
+                codigo=codigo,
+                nombre=nombre,
+                stock_actual=actual,
+                stock_minimo=minimo,
+                demanda_promedio=_decimal(promedio, 4),
+                demanda_suavizada=_decimal(suavizada, 4),
+                desviacion_demanda=_decimal(desviacion, 4),
+                dias_historia=dias_historia,
+                stock_seguridad=_decimal(seguridad),
+                punto_reorden=_decimal(punto),
+                cantidad_pedido=_decimal(cantidad),
+                calculado_en=ahora,
+            ))
+    return sugerencias
+
+
+def guardar(unidad, sugerencias, batch_size=5000):
+    """Reemplaza las sugerencias de la unidad en una sola transacción"""
+    with transaction.atomic():
+        SugerenciaReorden.objects.filter(unidad=unidad).delete()
+        SugerenciaReorden.objects.bulk_create(sugerencias, batch_size=batch_size)
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from .models import SugerenciaReorden
+
+
+class SugerenciaReordenSerializer(serializers.ModelSerializer):
+    """
+    Serializer de solo lectura para las sugerencias de reorden
+    """
+    debe_reordenar = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = SugerenciaReorden
+        fields = (
+            'id', 'unidad', 'producto_id', 'codigo', 'nombre', 'stock_actual', 'stock_minimo',
+            'demanda_promedio', 'demanda_suavizada', 'desviacion_demanda', 'dias_historia',
+            'stock_seguridad', 'punto_reorden', 'cantidad_pedido', 'debe_reordenar', 'calculado_en',
+        )
+        read_only_fields = fields
@@ -1,3 +1,292 @@
+import math
+from io import StringIO
+from statistics import NormalDist
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import Usuario
+from bloquera.models import ProductoBloquera
+from ferreteria.importacion import ImportadorProductos
+from ferreteria.inventario import aplicar_movimientos
+from ferreteria.models import Producto, CategoriaProducto, UnidadMedida
+from piedrinera.models import AgregadoPiedrinera
+from . import precios, pronostico, valuacion
+from .models import HistorialPrecio, SugerenciaReorden
+
+
+def reorden_por_producto(serie, costo, ventana, alfa, tiempo_entrega, z, costo_pedido, tasa):
+    """
+    Versión de referencia sin NumPy: un producto a la vez
+
+    Returns:
+        (punto de reorden, cantidad de pedido, promedio móvil) de la serie
+        diaria desde el primer día del producto
+    """
+    if not serie:
+        return 0, 0, 0.0
+    nivel = serie[0]
+    for valor in serie[1:]:
+        nivel = alfa * valor + (1 - alfa) * nivel
+    media = sum(serie) / len(serie)
+    varianza = sum((valor - media) ** 2 for valor in serie) / (len(serie) - 1) if len(serie) > 1 else 0.0
+    promedio_movil = sum(serie[-ventana:]) / min(ventana, len(serie))
+    punto = nivel * tiempo_entrega + z * math.sqrt(varianza) * math.sqrt(tiempo_entrega)
+    mantener = costo * tasa
+    cantidad = math.sqrt(2 * nivel * 365 * costo_pedido / mantener) if mantener > 0 else nivel * tiempo_entrega
+    return math.ceil(punto - 1e-9), math.ceil(cantidad - 1e-9), promedio_movil
+
+
+class CalcularReordenTests(TestCase):
+    parametros = {clave: valor for clave, valor in pronostico.PARAMETROS.items() if clave != 'dias'}
+
+    def test_coincide_con_la_referencia_por_producto(self):
+        rng = np.random.default_rng(0)
+        productos, dias = 200, 120
+        # Incluye un producto sin historia (creado después del último día) y uno sin costo
+        inicio = np.append(rng.integers(0, dias, productos - 1), dias)
+        demanda = rng.poisson(3.0, (productos, dias)) * (rng.random((productos, dias)) < 0.4)
+        demanda[np.arange(dias) < inicio[:, None]] = 0
+        costos = rng.uniform(1, 500, productos)
+        costos[0] = 0
+
+        resultado = pronostico.calcular(demanda, inicio, costos, **self.parametros)
+
+        z = NormalDist().inv_cdf(self.parametros['nivel_servicio'])
+        for i in range(productos):
+            punto, cantidad, promedio = reorden_por_producto(
+                demanda[i, inicio[i]:].tolist(), costos[i], self.parametros['ventana'], self.parametros['alfa'],
+                self.parametros['tiempo_entrega'], z, self.parametros['costo_pedido'],
+                self.parametros['tasa_mantenimiento'],
+            )
+            with self.subTest(producto=i):
+                self.assertEqual(resultado['punto_reorden'][i], punto)
+                self.assertEqual(resultado['cantidad_pedido'][i], cantidad)
+                self.assertAlmostEqual(resultado['promedio_movil'][i], promedio)
+                self.assertEqual(resultado['dias_historia'][i], dias - inicio[i])
+
+
+class HistorialPreciosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = CategoriaProducto.objects.create(nombre='Tubería')
+        cls.unidad = UnidadMedida.objects.create(nombre='Unidad', abreviatura='u')
+        cls.usuario = Usuario.objects.create_user('admin', password='x', rol='admin')
+
+    def setUp(self):
+        self.producto = Producto.objects.create(
+            codigo='T001', nombre='Tubo', categoria=self.categoria, unidad_medida=self.unidad,
+            precio_venta='12.50', costo_unitario='10.00', stock_actual=5, stock_minimo=1,
+        )
+        self.antes_del_cambio = timezone.now()
+
+    def historial(self):
+        return [float(precio) for precio, _ in precios.historial('ferreteria', 'T001')]
+
+    def test_crear_registra_el_precio_inicial(self):
+        self.assertEqual(self.historial(), [12.5])
+
+    def test_put_registra_el_cambio_de_precio(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+        datos = {
+            'codigo': 'T001', 'nombre': 'Tubo', 'categoria_id': self.categoria.pk,
+            'unidad_medida_id': self.unidad.pk, 'costo_unitario': '10.00', 'stock_minimo': 1,
+        }
+
+        response = client.put(f'/api/ferreteria/productos/{self.producto.pk}/', {**datos, 'precio_venta': '15.00'})
+        self.assertEqual(response.status_code, 200)
+        # Guardar sin cambiar el precio no agrega filas
+        client.put(f'/api/ferreteria/productos/{self.producto.pk}/', {**datos, 'precio_venta': '15.00', 'nombre': 'X'})
+
+        self.assertEqual(self.historial(), [15.0, 12.5])
+        anterior, _ = precios.precios_en('ferreteria', ['T001'], self.antes_del_cambio)['T001']
+        self.assertEqual(float(anterior), 12.5)
+
+    def test_importacion_registra_el_cambio_de_precio(self):
+        ImportadorProductos().importar([
+            ['codigo', 'nombre', 'categoria', 'unidad_medida', 'precio_venta'],
+            ['T001', 'Tubo', 'Tubería', 'u', '18.00'],
+            ['N001', 'Nuevo', 'Tubería', 'u', '4.00'],
+        ])
+
+        self.assertEqual(self.historial(), [18.0, 12.5])
+        nuevo = Producto.objects.get(codigo='N001')
+        self.assertEqual(
+            list(HistorialPrecio.objects.filter(producto_id=nuevo.pk).values_list('precio', flat=True)), [4]
+        )
+        vigentes = precios.precios_en('ferreteria', ['T001', 'N001', 'NOEXISTE'], self.antes_del_cambio)
+        self.assertEqual(float(vigentes['T001'][0]), 12.5)
+        self.assertEqual(vigentes['N001'], (None, None))
+        self.assertNotIn('NOEXISTE', vigentes)
+
+    def test_post_con_cuerpo_que_no_es_objeto_devuelve_400(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+
+        response = client.post('/api/precios/en-fecha/', ['T001'], format='json')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ValuacionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = CategoriaProducto.objects.create(nombre='Tubería')
+        unidad = UnidadMedida.objects.create(nombre='Unidad', abreviatura='u')
+        cls.producto = Producto.objects.create(
+            codigo='T001', nombre='Tubo', categoria=categoria, unidad_medida=unidad,
+            precio_venta='12.50', costo_unitario='10.00', stock_actual=4, stock_minimo=1,
+        )
+        cls.usuarios = {rol: Usuario.objects.create_user(rol, password='x', rol=rol) for rol in ('gerente', 'vendedor')}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuarios['gerente'])
+
+    def valuacion(self, parametros=''):
+        response = self.client.get(f'/api/valuacion/?unidad=ferreteria{parametros}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_solo_admin_y_gerente(self):
+        self.client.force_authenticate(self.usuarios['vendedor'])
+
+        self.assertEqual(self.client.get('/api/valuacion/').status_code, 403)
+
+    def test_instantanea_coincide_con_la_valuacion_actual_del_dia(self):
+        call_command('registrar_valuacion', stdout=StringIO())
+        hoy = timezone.localdate().isoformat()
+
+        actual = self.valuacion()
+        instantanea = self.valuacion(f'&fecha={hoy}')
+
+        self.assertEqual((actual.pop('origen'), instantanea.pop('origen')), ('actual', 'instantanea'))
+        self.assertEqual(instantanea, actual)
+        self.assertEqual(actual['total']['valor'], 40.0)
+        self.assertEqual(actual['unidades']['ferreteria']['grupos'][0]['margen'], 10.0)
+
+    def test_la_instantanea_no_cambia_con_el_inventario(self):
+        call_command('registrar_valuacion', '--unidad', 'ferreteria', stdout=StringIO())
+        hoy = timezone.localdate()
+        Producto.objects.filter(pk=self.producto.pk).update(stock_actual=10)
+
+        self.assertEqual(self.valuacion()['total']['valor'], 100.0)
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(valuacion.valuacion_en(hoy, ['ferreteria'])['total']['valor'], 40.0)
+        # Las consultas históricas leen solo valuaciones_diarias
+        self.assertEqual(len(consultas), 1)
+        self.assertIn('FROM "valuaciones_diarias"', consultas[0]['sql'])
+        self.assertNotIn('JOIN', consultas[0]['sql'])
+        dias = self.valuacion(f'&desde={hoy.isoformat()}')['dias']
+        self.assertEqual([(dia['fecha'], dia['total']['valor']) for dia in dias], [(hoy.isoformat(), 40.0)])
+
+    def test_fecha_sin_instantanea_devuelve_404(self):
+        response = self.client.get('/api/valuacion/?fecha=2020-01-01')
+
+        self.assertEqual(response.status_code, 404)
+
+
+class SugerenciaReordenViewSetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user('vendedor', password='x', rol='vendedor')
+        for producto_id, (unidad, codigo, stock) in enumerate(
+            [('ferreteria', 'T001', 3), ('ferreteria', 'T002', 20), ('bloquera', 'B001', 1)], start=1
+        ):
+            SugerenciaReorden.objects.create(
+                unidad=unidad, producto_id=producto_id, codigo=codigo, nombre=codigo, stock_actual=stock,
+                stock_minimo=1, demanda_promedio=1, demanda_suavizada=1, desviacion_demanda=0, dias_historia=30,
+                stock_seguridad=0, punto_reorden=5, cantidad_pedido=10, calculado_en=timezone.now(),
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def codigos(self, parametros=''):
+        response = self.client.get(f'/api/inventario/reorden/{parametros}')
+        self.assertEqual(response.status_code, 200)
+        return [fila['codigo'] for fila in response.data['results']]
+
+    def test_filtros(self):
+        self.assertEqual(self.codigos(), ['B001', 'T001', 'T002'])
+        self.assertEqual(self.codigos('?unidad=ferreteria&reordenar=true'), ['T001'])
+        self.assertEqual(self.client.get('/api/inventario/reorden/?unidad=x').status_code, 400)
+
+
+class AlertasStockBajoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = CategoriaProducto.objects.create(nombre='Tubería')
+        unidad = UnidadMedida.objects.create(nombre='Unidad', abreviatura='u')
+        datos = {'categoria': categoria, 'unidad_medida': unidad, 'precio_venta': '1.00', 'costo_unitario': '1.00'}
+        cls.tubo = Producto.objects.create(codigo='T001', nombre='Tubo', stock_actual=1, stock_minimo=4, **datos)
+        Producto.objects.create(codigo='T002', nombre='Codo', stock_actual=4, stock_minimo=4, **datos)
+        Producto.objects.create(codigo='T003', nombre='Llave', stock_actual=9, stock_minimo=4, **datos)
+        Producto.objects.create(
+            codigo='T004', nombre='Inactivo', stock_actual=0, stock_minimo=4, activo=False, **datos
+        )
+        ProductoBloquera.objects.create(
+            codigo='B1', nombre='Block', tipo_bloque='pómez', stock_actual=0, stock_minimo=5,
+        )
+        AgregadoPiedrinera.objects.create(
+            codigo='A1', nombre='Arena', tipo='arena', stock_actual_m3='2.5', stock_minimo_m3='5',
+        )
+        cls.usuario = Usuario.objects.create_user('vendedor', password='x', rol='vendedor')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def alertas(self, parametros=''):
+        response = self.client.get(f'/api/alertas/stock-bajo/{parametros}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_ordenadas_por_severidad(self):
+        datos = self.alertas()
+
+        self.assertEqual(
+            [(alerta['unidad'], alerta['codigo'], alerta['severidad']) for alerta in datos['alertas']],
+            [('bloquera', 'B1', 1.0), ('ferreteria', 'T001', 0.75), ('piedrinera', 'A1', 0.5),
+             ('ferreteria', 'T002', 0.0)],
+        )
+        self.assertEqual(datos['por_unidad'], {'ferreteria': 2, 'bloquera': 1, 'piedrinera': 1})
+
+    def test_limite_y_unidad(self):
+        datos = self.alertas('?limite=1')
+        self.assertEqual((datos['total'], [alerta['codigo'] for alerta in datos['alertas']]), (4, ['B1']))
+
+        self.assertEqual(self.alertas('?limite=0')['alertas'], [])
+
+        datos = self.alertas('?unidad=ferreteria,piedrinera&limite=10')
+        self.assertEqual([alerta['codigo'] for alerta in datos['alertas']], ['T001', 'A1', 'T002'])
+        self.assertEqual(datos['por_unidad'], {'ferreteria': 2, 'piedrinera': 1})
+
+    def test_parametros_invalidos_devuelven_400(self):
+        for parametros in ('?limite=-1', '?limite=abc', '?unidad=planillas'):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.client.get(f'/api/alertas/stock-bajo/{parametros}').status_code, 400)
+
+    def test_etag_y_cambios_de_stock(self):
+        etag = self.client.get('/api/alertas/stock-bajo/')['ETag']
+        self.assertEqual(self.client.get('/api/alertas/stock-bajo/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Los movimientos de inventario usan update(); la caché se invalida igual
+        aplicar_movimientos([{'producto_id': self.tubo.pk, 'tipo': 'entrada', 'cantidad': 10}])
 
-# Create your tests here.
+        response = self.client.get('/api/alertas/stock-bajo/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('T001', [alerta['codigo'] for alerta in response.data['alertas']])
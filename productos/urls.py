@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('stock-bajo/', views.stock_bajo_view, name='alertas-stock-bajo'),
+]
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('en-fecha/', views.precios_en_fecha_view, name='precios-en-fecha'),
+    path('historial/', views.historial_precios_view, name='historial-precios'),
+]
@@ -0,0 +1,195 @@
+"""
+Valuación del inventario de todas las unidades de negocio
+
+- valor: existencias * costo (costo_unitario, costo_produccion o costo_produccion_m3)
+- valor de venta: existencias * precio de venta
+- margen potencial: valor de venta - valor
+
+La valuación actual se calcula en la base de datos con una consulta agrupada
+por unidad (categoría, tipo_bloque o tipo). Solo cuentan los productos
+activos con existencias positivas.
+
+Las instantáneas diarias (comando registrar_valuacion) guardan esos mismos
+grupos en valuaciones_diarias; las consultas históricas leen solo esa tabla y
+nunca las tablas de productos.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from bloquera.models import ProductoBloquera
+from ferreteria.models import Producto
+from piedrinera.models import AgregadoPiedrinera
+from .models import ValuacionDiaria
+
+# (unidad, modelo, campo de agrupación, campo de existencias, campo de costo, campo de precio)
+UNIDADES = (
+    ('ferreteria', Producto, 'categoria__nombre', 'stock_actual', 'costo_unitario', 'precio_venta'),
+    ('bloquera', ProductoBloquera, 'tipo_bloque', 'stock_actual', 'costo_produccion', 'precio_unitario'),
+    ('piedrinera', AgregadoPiedrinera, 'tipo', 'stock_actual_m3', 'costo_produccion_m3', 'precio_venta_m3'),
+)
+NOMBRES_UNIDADES = tuple(unidad for unidad, *_ in UNIDADES)
+AGRUPADO_POR = {
+    'ferreteria': 'categoria',
+    'bloquera': 'tipo_bloque',
+    'piedrinera': 'tipo',
+}
+
+_MONTO = DecimalField(max_digits=20, decimal_places=4)
+
+
+def _producto(campo_a, campo_b):
+    return ExpressionWrapper(F(campo_a) * F(campo_b), output_field=_MONTO)
+
+
+def _monto(valor):
+    return float(round(Decimal(valor or 0), 2))
+
+
+def consultar_grupos(unidad):
+    """
+    Valor, valor de venta y existencias por grupo de una unidad (una consulta)
+
+    Returns:
+        lista de dicts con grupo, productos, existencias, valor y valor_venta (Decimal)
+    """
+    _, modelo, campo_grupo, campo_stock, campo_costo, campo_precio = next(
+        fila for fila in UNIDADES if fila[0] == unidad
+    )
+    return list(
+        modelo.objects
+        .filter(activo=True, **{f'{campo_stock}__gt': 0})
+        .values(grupo=F(campo_grupo))
+        .annotate(
+            productos=Count('id'),
+            existencias=Sum(campo_stock),
+            valor=Sum(_producto(campo_stock, campo_costo)),
+            valor_venta=Sum(_producto(campo_stock, campo_precio)),
+        )
+        .order_by('grupo')
+    )
+
+
+def _totales(filas):
+    totales = {'productos': 0, 'valor': 0.0, 'valor_venta': 0.0}
+    for fila in filas:
+        totales['productos'] += fila['productos']
+        totales['valor'] += fila['valor']
+        totales['valor_venta'] += fila['valor_venta']
+    return _con_margen(totales)
+
+
+def _con_margen(fila):
+    fila['valor'] = round(fila['valor'], 2)
+    fila['valor_venta'] = round(fila['valor_venta'], 2)
+    fila['margen'] = round(fila['valor_venta'] - fila['valor'], 2)
+    fila['margen_porcentaje'] = (
+        round(fila['margen'] * 100 / fila['valor_venta'], 2) if fila['valor_venta'] else 0.0
+    )
+    return fila
+
+
+def formatear(grupos_por_unidad):
+    """
+    Arma la respuesta de valuación desde {unidad: filas por grupo}
+
+    Las filas pueden venir de consultar_grupos() o de ValuacionDiaria; los
+    totales por unidad y general se suman aquí, sin otra consulta.
+    """
+    unidades = {}
+    for unidad, filas in grupos_por_unidad.items():
+        grupos = [
+            _con_margen({
+                'grupo': fila['grupo'],
+                'productos': fila['productos'],
+                'existencias': _monto(fila['existencias']),
+                'valor': _monto(fila['valor']),
+                'valor_venta': _monto(fila['valor_venta']),
+            })
+            for fila in filas
+        ]
+        unidades[unidad] = {'agrupado_por': AGRUPADO_POR[unidad], **_totales(grupos), 'grupos': grupos}
+    return {'total': _totales(unidades.values()), 'unidades': unidades}
+
+
+def valuacion_actual(unidades=NOMBRES_UNIDADES):
+    """Valuación calculada sobre las tablas de productos (una consulta por unidad)"""
+    return formatear({unidad: consultar_grupos(unidad) for unidad in unidades})
+
+
+def valuacion_en(fecha, unidades=NOMBRES_UNIDADES):
+    """
+    Valuación guardada en la instantánea de una fecha
+
+    Returns:
+        la respuesta de formatear() o None si no hay instantánea de esa fecha
+    """
+    filas = list(
+        ValuacionDiaria.objects.filter(fecha=fecha, unidad__in=unidades).values(
+            'unidad', 'grupo', 'productos', 'existencias', 'valor', 'valor_venta'
+        )
+    )
+    if not filas:
+        return None
+    grupos_por_unidad = {unidad: [] for unidad in unidades}
+    for fila in filas:
+        grupos_por_unidad[fila['unidad']].append(fila)
+    return formatear(grupos_por_unidad)
+
+
+def serie(desde, hasta, unidades=NOMBRES_UNIDADES):
+    """
+    Valor y margen por día y unidad entre dos fechas, desde las instantáneas
+    (una consulta agrupada sobre valuaciones_diarias)
+    """
+    filas = (
+        ValuacionDiaria.objects
+        .filter(fecha__gte=desde, fecha__lte=hasta, unidad__in=unidades)
+        .values('fecha', 'unidad')
+        .annotate(productos=Sum('productos'), valor=Sum('valor'), valor_venta=Sum('valor_venta'))
+        .order_by('fecha', 'unidad')
+    )
+    dias = {}
+    for fila in filas:
+        dia = dias.setdefault(fila['fecha'], {})
+        dia[fila['unidad']] = _con_margen({
+            'productos': fila['productos'],
+            'valor': _monto(fila['valor']),
+            'valor_venta': _monto(fila['valor_venta']),
+        })
+    return [
+        {'fecha': fecha.isoformat(), 'total': _totales(por_unidad.values()), 'unidades': por_unidad}
+        for fecha, por_unidad in dias.items()
+    ]
+
+
+def registrar_instantanea(fecha=None, unidades=NOMBRES_UNIDADES):
+    """
+    Guarda la valuación actual como la instantánea de la fecha (por defecto hoy)
+
+    Reemplaza la instantánea existente de esa fecha, de modo que el comando
+    se puede repetir el mismo día. Las demás fechas no se tocan.
+
+    Returns:
+        cantidad de filas (grupos) guardadas
+    """
+    fecha = fecha or timezone.localdate()
+    filas = [
+        ValuacionDiaria(
+            fecha=fecha,
+            unidad=unidad,
+            grupo=fila['grupo'],
+            productos=fila['productos'],
+            existencias=round(Decimal(fila['existencias']), 2),
+            valor=round(Decimal(fila['valor']), 2),
+            valor_venta=round(Decimal(fila['valor_venta']), 2),
+        )
+        for unidad in unidades
+        for fila in consultar_grupos(unidad)
+    ]
+    with transaction.atomic():
+        ValuacionDiaria.objects.filter(fecha=fecha, unidad__in=unidades).delete()
+        ValuacionDiaria.objects.bulk_create(filas)
+    return len(filas)
@@ -1,3 +1,268 @@
-from django.shortcuts import render
+import hashlib
+from datetime import datetime, time
 
-# Create your views here.
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import status, viewsets
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import precios, valuacion
+from .alertas import NOMBRES_UNIDADES, obtener_alertas
+from .models import SugerenciaReorden
+from .serializers import SugerenciaReordenSerializer
+
+
+@api_view(['GET'])
+def stock_bajo_view(request):
+    """
+    Alertas de stock bajo de ferretería, bloquera y piedrinera, ordenadas por
+    severidad (proporción del stock mínimo que falta)
+
+    Parámetros opcionales:
+    - unidad: una o varias unidades separadas por coma (por defecto todas)
+    - limite: cantidad máxima de alertas
+
+    Responde 304 si el cliente envía el ETag de la última respuesta (If-None-Match).
+    """
+    unidades = request.query_params.get('unidad')
+    unidades = [unidad.strip() for unidad in unidades.split(',')] if unidades else list(NOMBRES_UNIDADES)
+    invalidas = [unidad for unidad in unidades if unidad not in NOMBRES_UNIDADES]
+    if invalidas:
+        return Response(
+            {'error': f'Unidad inválida: {", ".join(invalidas)}. Opciones: {", ".join(NOMBRES_UNIDADES)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limite = int(request.query_params['limite']) if 'limite' in request.query_params else None
+    except ValueError:
+        return Response({'error': 'limite debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
+    if limite is not None and limite < 0:
+        return Response({'error': 'limite no puede ser negativo'}, status=status.HTTP_400_BAD_REQUEST)
+
+    alertas, version = obtener_alertas()
+    etag = '"%s"' % hashlib.md5(f'{version}:{",".join(unidades)}:{limite}'.encode()).hexdigest()
+    no_modificado = get_conditional_response(request, etag=etag)
+    if no_modificado is not None:
+        return no_modificado
+
+    if len(unidades) < len(NOMBRES_UNIDADES):
+        alertas = [alerta for alerta in alertas if alerta['unidad'] in unidades]
+    por_unidad = {unidad: 0 for unidad in unidades}
+    for alerta in alertas:
+        por_unidad[alerta['unidad']] += 1
+
+    response = Response({
+        'total': len(alertas),
+        'por_unidad': por_unidad,
+        'alertas': alertas[:limite] if limite is not None else alertas,
+    })
+    response['ETag'] = etag
+    return response
+
+
+def _fecha_param(request, nombre):
+    """Lee un parámetro YYYY-MM-DD; lanza ValidationError si no es una fecha válida"""
+    valor = request.query_params.get(nombre)
+    if not valor:
+        return None
+    try:
+        fecha = parse_date(valor)
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        raise ValidationError({nombre: 'Fecha inválida, use el formato YYYY-MM-DD'})
+    return fecha
+
+
+class ValuacionView(APIView):
+    """
+    Valuación del inventario (costo, valor de venta y margen potencial) por
+    unidad y grupo: categoría en ferretería, tipo_bloque en bloquera y tipo en
+    piedrinera
+
+    Parámetros opcionales:
+    - unidad: una o varias unidades separadas por coma (por defecto todas)
+    - fecha: valuación registrada en la instantánea de ese día (YYYY-MM-DD)
+    - desde / hasta: serie diaria de las instantáneas entre ambas fechas
+
+    Sin fecha ni rango se calcula sobre los productos actuales. Las consultas
+    por fecha o rango leen solo la tabla de instantáneas diarias.
+
+    Expone costos y márgenes: solo para los roles admin y gerente.
+    """
+    roles_permitidos = ('admin', 'gerente')
+
+    def get(self, request):
+        unidades = request.query_params.get('unidad')
+        unidades = (
+            [unidad.strip() for unidad in unidades.split(',')] if unidades else list(valuacion.NOMBRES_UNIDADES)
+        )
+        invalidas = [unidad for unidad in unidades if unidad not in valuacion.NOMBRES_UNIDADES]
+        if invalidas:
+            return Response(
+                {'error': f'Unidad inválida: {", ".join(invalidas)}. '
+                          f'Opciones: {", ".join(valuacion.NOMBRES_UNIDADES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fecha = _fecha_param(request, 'fecha')
+        desde = _fecha_param(request, 'desde')
+        hasta = _fecha_param(request, 'hasta')
+
+        if desde or hasta:
+            hasta = hasta or timezone.localdate()
+            if desde is None or desde > hasta:
+                return Response(
+                    {'error': 'Indique desde (y opcionalmente hasta) con desde <= hasta'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            dias = valuacion.serie(desde, hasta, unidades)
+            return Response({'desde': desde, 'hasta': hasta, 'origen': 'instantaneas', 'dias': dias})
+
+        if fecha:
+            resultado = valuacion.valuacion_en(fecha, unidades)
+            if resultado is None:
+                return Response(
+                    {'error': f'No hay instantánea de valuación para {fecha.isoformat()}'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response({'fecha': fecha, 'origen': 'instantanea', **resultado})
+
+        return Response(
+            {'fecha': timezone.localdate(), 'origen': 'actual', **valuacion.valuacion_actual(unidades)}
+        )
+
+
+def _unidad_precios(valor):
+    if valor not in precios.NOMBRES_UNIDADES:
+        raise ValidationError(
+            {'unidad': f'Requerida, una de: {", ".join(precios.NOMBRES_UNIDADES)}'}
+        )
+    return valor
+
+
+def _momento(valor):
+    """
+    Fecha (YYYY-MM-DD, precio al final de ese día) o fecha y hora ISO 8601;
+    sin valor, el momento actual
+    """
+    if not valor:
+        return timezone.now()
+    try:
+        momento = parse_datetime(valor)
+        if momento is None:
+            fecha = parse_date(valor)
+            momento = datetime.combine(fecha, time.max) if fecha else None
+    except ValueError:
+        momento = None
+    if momento is None:
+        raise ValidationError({'fecha': 'Use YYYY-MM-DD o fecha y hora ISO 8601'})
+    return timezone.make_aware(momento) if timezone.is_naive(momento) else momento
+
+
+@api_view(['GET', 'POST'])
+def precios_en_fecha_view(request):
+    """
+    Precio de venta vigente de un lote de productos en una fecha, resuelto en
+    una sola consulta
+
+    GET ?unidad=ferreteria&codigos=A1,A2&fecha=2024-05-31
+    POST {"unidad": "ferreteria", "codigos": ["A1", "A2"], "fecha": "2024-05-31T10:00:00"}
+    (POST para lotes grandes de códigos, hasta MAX_CODIGOS)
+
+    Los códigos sin precio registrado a esa fecha devuelven precio null y los
+    que no existen se listan en no_encontrados.
+    """
+    datos = request.data if request.method == 'POST' else request.query_params
+    if not isinstance(datos, dict):
+        raise ValidationError({'error': 'El cuerpo debe ser un objeto con unidad, codigos y fecha'})
+    unidad = _unidad_precios(datos.get('unidad'))
+    codigos = datos.get('codigos') or []
+    if isinstance(codigos, str):
+        codigos = codigos.split(',')
+    if not isinstance(codigos, list):
+        raise ValidationError({'codigos': 'Debe ser una lista de códigos'})
+    codigos = list(dict.fromkeys(str(codigo).strip() for codigo in codigos if str(codigo).strip()))
+    if not codigos:
+        raise ValidationError({'codigos': 'Indique al menos un código'})
+    if len(codigos) > precios.MAX_CODIGOS:
+        raise ValidationError({'codigos': f'Máximo {precios.MAX_CODIGOS} códigos por consulta'})
+    momento = _momento(datos.get('fecha'))
+
+    vigentes = precios.precios_en(unidad, codigos, momento)
+    return Response({
+        'unidad': unidad,
+        'fecha': momento,
+        'precios': [
+            {
+                'codigo': codigo,
+                'precio': float(vigentes[codigo][0]) if vigentes[codigo][0] is not None else None,
+                'vigente_desde': vigentes[codigo][1],
+            }
+            for codigo in codigos if codigo in vigentes
+        ],
+        'no_encontrados': [codigo for codigo in codigos if codigo not in vigentes],
+    })
+
+
+@api_view(['GET'])
+def historial_precios_view(request):
+    """
+    Cambios de precio de un producto, del más reciente al más antiguo
+    Parámetros requeridos: unidad y codigo
+    """
+    unidad = _unidad_precios(request.query_params.get('unidad'))
+    codigo = request.query_params.get('codigo')
+    if not codigo:
+        raise ValidationError({'codigo': 'Es requerido'})
+    cambios = precios.historial(unidad, codigo)
+    if cambios is None:
+        return Response({'error': 'Producto no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        'unidad': unidad,
+        'codigo': codigo,
+        'historial': [
+            {'precio': float(precio), 'vigente_desde': vigente_desde}
+            for precio, vigente_desde in cambios
+        ],
+    })
+
+
+class SugerenciaReordenViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet de solo lectura para las sugerencias de reorden
+    Se recalculan con el comando calcular_reorden
+    """
+    queryset = SugerenciaReorden.objects.all()
+    serializer_class = SugerenciaReordenSerializer
+
+    def get_queryset(self):
+        """
+        Filtros opcionales:
+        - unidad: 'ferreteria', 'bloquera' o 'piedrinera'
+        - codigo: prefijo del código
+        - reordenar: 'true' para solo los productos con stock <= punto de reorden
+        """
+        queryset = self.queryset
+
+        unidad = self.request.query_params.get('unidad')
+        if unidad:
+            if unidad not in NOMBRES_UNIDADES:
+                raise ValidationError(
+                    {'unidad': f'Unidad inválida. Opciones: {", ".join(NOMBRES_UNIDADES)}'}
+                )
+            queryset = queryset.filter(unidad=unidad)
+
+        codigo = self.request.query_params.get('codigo')
+        if codigo:
+            queryset = queryset.filter(codigo__startswith=codigo)
+
+        if self.request.query_params.get('reordenar') == 'true':
+            queryset = queryset.filter(stock_actual__lte=F('punto_reorden'))
+
+        return queryset